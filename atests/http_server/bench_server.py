@@ -0,0 +1,79 @@
+"""
+High throughput runner for the acceptance tests http server.
+
+The Flask development server used by the acceptance tests closes every
+connection after the response, this runner serves the same app with waitress:
+a pool of worker threads and HTTP/1.1 keep-alive, so that benchmarks and
+concurrency features can be exercised offline at realistic rates:
+
+    cd atests
+    python -m http_server.bench_server --port 5011 --threads 32
+
+Keep-alive can be disabled per request passing ``keepalive=0`` in the query string.
+"""
+
+import argparse
+import threading
+
+from waitress.server import create_server
+
+from .core import app
+
+DEFAULT_THREADS = 32
+
+
+def build_server(host="127.0.0.1", port=0, threads=DEFAULT_THREADS):
+    """Returns a waitress server, not started yet, ``port=0`` picks a free port."""
+    return create_server(
+        app,
+        host=host,
+        port=port,
+        threads=threads,
+        connection_limit=1000,
+        channel_timeout=120,
+        ident="bench_server",
+    )
+
+
+class BackgroundServer(object):
+    """Runs the server in a daemon thread, to be used as a context manager."""
+
+    def __init__(self, host="127.0.0.1", port=0, threads=DEFAULT_THREADS):
+        self.server = build_server(host, port, threads)
+        self.url = "http://%s:%s" % (host, self.server.effective_port)
+        self.thread = threading.Thread(target=self.server.run)
+        self.thread.daemon = True
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.close()
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="High throughput local http test server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5011)
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=DEFAULT_THREADS,
+        help="worker threads (default %s)" % DEFAULT_THREADS,
+    )
+    args = parser.parse_args(argv)
+
+    server = build_server(args.host, args.port, args.threads)
+    print("Serving on http://%s:%s" % (args.host, server.effective_port))
+    try:
+        server.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
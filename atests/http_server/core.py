@@ -1,13 +1,33 @@
 # This code is part of httpbin project source code https://github.com/postmanlabs/httpbin
 # See AUTHORS and LICENSE for more information
 
-from flask import Flask, Response, jsonify as flask_jsonify, request
+import base64
+import hashlib
+import itertools
+import json
+import time
+import zlib
+
+from flask import Flask, Response, jsonify as flask_jsonify, redirect, request, url_for
 from flask_httpauth import HTTPBasicAuth, HTTPDigestAuth
 
 from .structures import CaseInsensitiveDict
-from .helpers import get_dict, status_code
+from .helpers import (
+    generate_bytes,
+    get_dict,
+    get_request_range,
+    parse_multi_value_header,
+    status_code,
+)
 from .utils import weighted_choice
 
+DEFAULT_STATUS_MIX = "200:90,404:4,500:3,503:3"
+
+OAUTH_CLIENTS = {"client": "secret"}
+oauth_token_numbers = itertools.count(1)
+oauth_tokens = set()
+job_polls = {}
+
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'test-secret-key-for-digest-auth'
@@ -24,6 +44,14 @@ def jsonify(*args, **kwargs):
     return response
 
 
+@app.after_request
+def keep_alive_control(response):
+    """Closes the connection after the response when ``keepalive=0`` is passed in the query string."""
+    if request.args.get("keepalive", "").lower() in ("0", "false", "no"):
+        response.headers["Connection"] = "close"
+    return response
+
+
 @app.route("/")
 def index():
     return "Flask Http Test Server"
@@ -286,3 +314,472 @@ def digest_auth_endpoint(qop, user, passwd, algorithm='MD5'):
         description: Unsuccessful authentication.
     """
     return jsonify(authenticated=True, user=digest_auth.current_user())
+
+
+@app.route("/bytes/<int:n>")
+def view_bytes(n):
+    """Returns n pseudo random bytes, always the same for the same seed, with range support.
+    ---
+    tags:
+      - Dynamic data
+    parameters:
+      - in: path
+        name: n
+        type: int
+      - in: query
+        name: seed
+        type: int
+      - in: query
+        name: chunk_size
+        type: int
+    produces:
+      - application/octet-stream
+    responses:
+      200:
+        description: Bytes.
+      206:
+        description: Partial bytes of the requested range.
+      416:
+        description: Range not satisfiable.
+    """
+    seed = request.args.get("seed", 0, type=int)
+    chunk_size = max(1, request.args.get("chunk_size", 64 * 1024, type=int))
+    headers = {
+        "ETag": '"bytes-%d-%d"' % (n, seed),
+        "Accept-Ranges": "bytes",
+    }
+
+    status = 200
+    first_byte_pos, last_byte_pos = 0, n - 1
+    if "range" in request.headers:
+        first_byte_pos, last_byte_pos = get_request_range(request.headers, n)
+        last_byte_pos = min(last_byte_pos, n - 1)
+        if first_byte_pos > last_byte_pos or first_byte_pos >= n:
+            headers["Content-Range"] = "bytes */%d" % n
+            return Response(status=416, headers=headers)
+        headers["Content-Range"] = "bytes %d-%d/%d" % (first_byte_pos, last_byte_pos, n)
+        status = 206
+
+    headers["Content-Length"] = str(last_byte_pos - first_byte_pos + 1)
+    return Response(
+        generate_bytes(seed, first_byte_pos, last_byte_pos, chunk_size),
+        status=status,
+        headers=headers,
+        mimetype="application/octet-stream",
+    )
+
+
+@app.route("/stream/<int:n>")
+def stream_n_messages(n):
+    """Streams n JSON lines, without Content-Length (chunked transfer encoding).
+    ---
+    tags:
+      - Dynamic data
+    parameters:
+      - in: path
+        name: n
+        type: int
+    produces:
+      - application/json
+    responses:
+      200:
+        description: Streamed JSON lines.
+    """
+    response = get_dict("url", "args", "headers", "origin")
+
+    def generate_stream():
+        for i in range(n):
+            response["id"] = i
+            yield json.dumps(response) + "\n"
+
+    return Response(generate_stream(), mimetype="application/json")
+
+
+@app.route("/delay/<int:ms>", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
+def delay_response(ms):
+    """Returns a delayed response, delay is in milliseconds (max 60 seconds).
+    ---
+    tags:
+      - Dynamic data
+    parameters:
+      - in: path
+        name: ms
+        type: int
+    produces:
+      - application/json
+    responses:
+      200:
+        description: A delayed response.
+    """
+    time.sleep(min(ms, 60000) / 1000.0)
+    return jsonify(get_dict("url", "args", "form", "data", "origin", "headers", "files"))
+
+
+@app.route("/drip")
+def drip():
+    """Drips numbytes bytes over a duration (seconds) after an optional initial delay (seconds).
+    ---
+    tags:
+      - Dynamic data
+    parameters:
+      - in: query
+        name: numbytes
+        type: int
+      - in: query
+        name: duration
+        type: float
+      - in: query
+        name: delay
+        type: float
+      - in: query
+        name: code
+        type: int
+    produces:
+      - application/octet-stream
+    responses:
+      200:
+        description: A dripped response.
+    """
+    numbytes = min(request.args.get("numbytes", 10, type=int), 10 * 1024 * 1024)
+    duration = request.args.get("duration", 2, type=float)
+    delay = request.args.get("delay", 0, type=float)
+    code = request.args.get("code", 200, type=int)
+
+    if numbytes <= 0:
+        return Response("number of bytes must be positive", status=400)
+
+    pause = duration / numbytes
+
+    def generate_bytes():
+        for i in range(numbytes):
+            yield b"*"
+            time.sleep(pause)
+
+    time.sleep(delay)
+    return Response(
+        generate_bytes(),
+        status=code,
+        headers={"Content-Length": str(numbytes)},
+        mimetype="application/octet-stream",
+    )
+
+
+@app.route("/json/<int:size>")
+def view_json(size):
+    """Returns a JSON array of size items, generated while streaming the response.
+    ---
+    tags:
+      - Dynamic data
+    parameters:
+      - in: path
+        name: size
+        type: int
+    produces:
+      - application/json
+    responses:
+      200:
+        description: A JSON array.
+    """
+
+    def generate_items():
+        yield "["
+        for i in range(size):
+            item = json.dumps({"id": i, "name": "item-%d" % i, "even": i % 2 == 0, "tags": ["a", "b"]})
+            yield item if i == 0 else "," + item
+        yield "]"
+
+    return Response(generate_items(), mimetype="application/json")
+
+
+@app.route("/status-mix", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD"])
+def view_status_mix():
+    """Returns a random status code out of a weighted mix of codes (code:weight comma separated).
+    ---
+    tags:
+      - Status codes
+    parameters:
+      - in: query
+        name: codes
+        type: string
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Success
+      500:
+        description: Server Errors
+    """
+    return view_status_code(request.args.get("codes", DEFAULT_STATUS_MIX))
+
+
+@app.route("/cookies")
+def view_cookies():
+    """Returns cookie data.
+    ---
+    tags:
+      - Cookies
+    produces:
+      - application/json
+    responses:
+      200:
+        description: Set cookies.
+    """
+    return jsonify(cookies=dict(request.cookies.items()))
+
+
+@app.route("/cookies/set")
+def set_cookies():
+    """Sets cookie(s) as provided by the query string and redirects to cookie list.
+    ---
+    tags:
+      - Cookies
+    parameters:
+      - in: query
+        name: freeform
+        explode: true
+        allowEmptyValue: true
+        schema:
+          type: object
+          additionalProperties:
+            type: string
+        style: form
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Redirect to cookie list
+    """
+    response = redirect(url_for("view_cookies"))
+    for key, value in request.args.items():
+        response.set_cookie(key=key, value=value)
+    return response
+
+
+@app.route("/cache", methods=("GET",))
+def cache():
+    """Returns a 304 if an If-Modified-Since header or If-None-Match is present. Returns the same as a GET otherwise.
+    ---
+    tags:
+      - Response inspection
+    produces:
+      - application/json
+    responses:
+      200:
+        description: Cached response
+      304:
+        description: Modified
+    """
+    is_conditional = request.headers.get("If-Modified-Since") or request.headers.get("If-None-Match")
+
+    if is_conditional is None:
+        response = jsonify(get_dict("url", "args", "headers"))
+        response.headers["Last-Modified"] = "Wed, 21 Oct 2015 07:28:00 GMT"
+        response.headers["ETag"] = '"%s"' % hashlib.md5(response.data).hexdigest()
+        return response
+    else:
+        return status_code(304)
+
+
+@app.route("/cache/<int:value>")
+def cache_control(value):
+    """Sets a Cache-Control header for n seconds.
+    ---
+    tags:
+      - Response inspection
+    parameters:
+      - in: path
+        name: value
+        type: integer
+    produces:
+      - application/json
+    responses:
+      200:
+        description: Cache control set
+    """
+    response = jsonify(get_dict("url", "args", "headers"))
+    response.headers["Cache-Control"] = "public, max-age={0}".format(value)
+    return response
+
+
+@app.route("/etag/<etag>", methods=("GET",))
+def etag(etag):
+    """Assumes the resource has the given etag and responds to If-None-Match and If-Match headers appropriately.
+    ---
+    tags:
+      - Response inspection
+    parameters:
+      - in: header
+        name: If-None-Match
+      - in: header
+        name: If-Match
+    produces:
+      - application/json
+    responses:
+      200:
+        description: Normal response
+      412:
+        description: match
+    """
+    if_none_match = parse_multi_value_header(request.headers.get("If-None-Match"))
+    if_match = parse_multi_value_header(request.headers.get("If-Match"))
+
+    if if_none_match:
+        if etag in if_none_match or "*" in if_none_match:
+            response = status_code(304)
+            response.headers["ETag"] = etag
+            return response
+    elif if_match:
+        if etag not in if_match and "*" not in if_match:
+            return status_code(412)
+
+    # Special cases don't apply, return normal response
+    response = jsonify(get_dict("url", "args", "headers"))
+    response.headers["ETag"] = etag
+    return response
+
+
+@app.route("/decompress", methods=["POST", "PUT", "PATCH"])
+def view_decompress():
+    """Decodes a gzip or deflate compressed request body and returns its sizes and content.
+    ---
+    tags:
+      - Request inspection
+    produces:
+      - application/json
+    responses:
+      200:
+        description: The compressed and decoded request body.
+      400:
+        description: Unsupported Content-Encoding.
+    """
+    body = request.get_data()
+    encoding = request.headers.get("Content-Encoding", "identity").lower()
+    if encoding == "gzip":
+        decoded = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    elif encoding == "deflate":
+        decoded = zlib.decompress(body)
+    elif encoding == "identity":
+        decoded = body
+    else:
+        return Response("unsupported Content-Encoding %s" % encoding, status=400)
+
+    try:
+        data = json.loads(decoded)
+    except ValueError:
+        data = None
+    return jsonify(
+        encoding=encoding,
+        headers=dict(request.headers.items()),
+        compressed_size=len(body),
+        size=len(decoded),
+        sha256=hashlib.sha256(decoded).hexdigest(),
+        json=data,
+        data=decoded.decode("utf-8", "replace") if data is None and len(decoded) <= 1024 else None,
+    )
+
+
+def oauth_client_credentials():
+    authorization = request.headers.get("Authorization", "")
+    if authorization.startswith("Basic "):
+        client_id, _, client_secret = base64.b64decode(authorization[6:]).decode("utf-8").partition(":")
+        return client_id, client_secret
+    return request.form.get("client_id"), request.form.get("client_secret")
+
+
+@app.route("/oauth/token", methods=["POST"])
+def oauth_token():
+    """Issues the access tokens of the OAuth 2.0 client credentials grant, numbered in order.
+    ---
+    tags:
+      - Auth
+    parameters:
+      - in: formData
+        name: expires_in
+        type: integer
+    produces:
+      - application/json
+    responses:
+      200:
+        description: Access token.
+      400:
+        description: Unsupported grant type.
+      401:
+        description: Invalid client credentials.
+    """
+    client_id, client_secret = oauth_client_credentials()
+    if request.form.get("grant_type") != "client_credentials":
+        return jsonify(error="unsupported_grant_type"), 400
+    if client_id not in OAUTH_CLIENTS or OAUTH_CLIENTS[client_id] != client_secret:
+        return jsonify(error="invalid_client"), 401
+    token = "%s-token-%s" % (client_id, next(oauth_token_numbers))
+    oauth_tokens.add(token)
+    return jsonify(
+        access_token=token,
+        token_type="bearer",
+        expires_in=int(request.form.get("expires_in", 3600)),
+        scope=request.form.get("scope"),
+    )
+
+
+@app.route("/oauth/protected")
+def oauth_protected():
+    """Returns the access token of the request when it is valid, 401 otherwise.
+    ---
+    tags:
+      - Auth
+    produces:
+      - application/json
+    responses:
+      200:
+        description: Successful authentication.
+      401:
+        description: Unsuccessful authentication.
+    """
+    authorization = request.headers.get("Authorization", "")
+    token = authorization[len("Bearer "):] if authorization.startswith("Bearer ") else None
+    if token not in oauth_tokens:
+        response = jsonify(error="invalid_token")
+        response.status_code = 401
+        response.headers["WWW-Authenticate"] = 'Bearer error="invalid_token"'
+        return response
+    return jsonify(authenticated=True, token=token)
+
+
+@app.route("/oauth/revoke", methods=["POST"])
+def oauth_revoke():
+    """Revokes all the issued access tokens.
+    ---
+    tags:
+      - Auth
+    responses:
+      204:
+        description: Tokens revoked.
+    """
+    oauth_tokens.clear()
+    return status_code(204)
+
+
+@app.route("/jobs/<name>/<int:ready_after>")
+def job(name, ready_after):
+    """Returns the state of a job, running until it has been requested ready_after times, then done.
+    Each state has its own ETag and If-None-Match headers are answered with 304 Not Modified.
+    ---
+    tags:
+      - Response inspection
+    produces:
+      - application/json
+    responses:
+      200:
+        description: State of the job.
+      304:
+        description: The job state did not change.
+    """
+    polls = job_polls[name] = job_polls.get(name, 0) + 1
+    state = "done" if polls >= ready_after else "running"
+    etag = "%s-%s" % (name, state)
+    if etag in parse_multi_value_header(request.headers.get("If-None-Match")):
+        response = status_code(304)
+    else:
+        response = jsonify(name=name, state=state, polls=polls)
+    response.headers["ETag"] = '"%s"' % etag
+    return response
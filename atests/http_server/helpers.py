@@ -9,6 +9,7 @@ This module provides helper functions for httpbin.
 
 import json
 import base64
+import random
 import re
 import time
 import os
@@ -36,6 +37,10 @@ ASCII_ART = r"""
 
 REDIRECT_LOCATION = '/redirect/1'
 
+PATTERN_SIZE = 64 * 1024
+
+_patterns = {}
+
 ENV_HEADERS = (
     'X-Varnish',
     'X-Request-Start',
@@ -314,6 +319,26 @@ def get_request_range(request_headers, upper_bound):
     return first_byte_pos, last_byte_pos
 
 
+def get_pattern(seed):
+    """Returns a block of pseudo random bytes, always the same for the same seed."""
+    if seed not in _patterns:
+        rng = random.Random(seed)
+        _patterns[seed] = rng.getrandbits(8 * PATTERN_SIZE).to_bytes(PATTERN_SIZE, 'little')
+    return _patterns[seed]
+
+
+def generate_bytes(seed, first_byte_pos, last_byte_pos, chunk_size):
+    """Yields the bytes between the given positions of an endless repetition of the
+    seed pattern, so that any range of a large body can be served without holding it in memory."""
+    pattern = get_pattern(seed)
+    position = first_byte_pos
+    while position <= last_byte_pos:
+        offset = position % PATTERN_SIZE
+        size = min(chunk_size, PATTERN_SIZE - offset, last_byte_pos - position + 1)
+        yield pattern[offset:offset + size]
+        position += size
+
+
 def parse_multi_value_header(header_str):
     """Break apart an HTTP header string that is potentially a quoted,
     comma separated list as used in entity headers in RFC2616."""
@@ -0,0 +1,3 @@
+@echo off
+cd /d "%~dp0.."
+python -m http_server.bench_server --port 5011 %*
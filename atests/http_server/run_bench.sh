@@ -0,0 +1,3 @@
+#!/usr/bin/env bash
+cd "$(dirname "$0")/.." || exit 1
+python -m http_server.bench_server --port 5011 "$@"
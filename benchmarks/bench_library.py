@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+"""
+Benchmarks for the RequestsLibrary hot paths.
+
+All the benchmarks run offline, the network ones against the acceptance tests
+http server served by the high throughput runner in a background thread.
+Results are stored as JSON so that different releases can be compared:
+
+    python benchmarks/bench_library.py --output before.json
+    python benchmarks/bench_library.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "atests"))
+
+import requests  # noqa: E402
+import robot  # noqa: E402
+from requests.structures import CaseInsensitiveDict  # noqa: E402
+
+from http_server.bench_server import BackgroundServer  # noqa: E402
+from RequestsLibrary import RequestsLibrary, log, utils  # noqa: E402
+from RequestsLibrary.version import VERSION  # noqa: E402
+
+BODY_SIZES = (1024, 100 * 1024, 1024 * 1024)
+BODY_ENCODINGS = {
+    "json-utf8": ("application/json; charset=utf-8", "utf-8"),
+    "text-latin1": ("text/plain; charset=iso-8859-1", "iso-8859-1"),
+    "binary-no-charset": ("application/octet-stream", None),
+}
+
+
+def measure(func, number, repeat=5):
+    """Returns the per call timings, in microseconds, of the best ``repeat`` runs."""
+    timings = timeit.Timer(func).repeat(repeat=repeat, number=number)
+    per_call = [t / number * 1e6 for t in timings]
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_us": min(per_call),
+        "median_us": statistics.median(per_call),
+        "ops_per_sec": number / min(timings),
+    }
+
+
+def build_response(size, content_type, encoding):
+    if encoding:
+        content = ("x" * size).encode(encoding)
+    else:
+        content = os.urandom(size)
+    response = requests.Response()
+    response._content = content
+    response.status_code = 200
+    response.reason = "OK"
+    response.url = "http://127.0.0.1/bench"
+    response.headers = CaseInsensitiveDict({"Content-Type": content_type})
+    response.encoding = encoding
+    response.request = requests.Request("GET", response.url).prepare()
+    return response
+
+
+def bench_per_call_overhead(server, number):
+    session = requests.Session()
+    library = RequestsLibrary()
+    library.create_session("bench", server.url, max_retries=0)
+    url = server.url + "/anything"
+
+    raw = measure(lambda: session.get(url), number)
+    wrapped = measure(lambda: library.get_on_session("bench", "/anything"), number)
+    wrapped["overhead_us"] = wrapped["median_us"] - raw["median_us"]
+    return {"raw_requests_get": raw, "get_on_session": wrapped}
+
+
+def bench_log_response(number):
+    results = {}
+    for name, (content_type, encoding) in BODY_ENCODINGS.items():
+        for size in BODY_SIZES:
+            response = build_response(size, content_type, encoding)
+            results["%s-%s" % (name, size)] = measure(
+                lambda: log.log_response(response), max(1, number // (size // 1024))
+            )
+    return results
+
+
+def bench_merge_url(number):
+    library = RequestsLibrary()
+    session = requests.Session()
+    session.url = "http://127.0.0.1:5000/api/v1"
+    return {
+        "session": measure(lambda: library._merge_url(session, "/items/1"), number),
+        "sessionless": measure(lambda: library._merge_url(None, "http://127.0.0.1/items/1"), number),
+    }
+
+
+def bench_merge_headers(number):
+    session = requests.Session()
+    session.headers.update({"Authorization": "Bearer token", "X-Tenant": "bench"})
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    return {"merge_headers": measure(lambda: utils.merge_headers(session, headers), number)}
+
+
+def bench_format_data(number):
+    session = requests.Session()
+    json_headers = {"Content-Type": "application/json"}
+    form_headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    data = {"key-%s" % i: "value-%s" % i for i in range(50)}
+    json_string = json.dumps(data)
+    return {
+        "dict-as-json": measure(
+            lambda: utils.format_data_according_to_header(session, data, json_headers), number
+        ),
+        "json-string": measure(
+            lambda: utils.format_data_according_to_header(session, json_string, json_headers), number
+        ),
+        "dict-as-form": measure(
+            lambda: utils.format_data_according_to_header(session, data, form_headers), number
+        ),
+    }
+
+
+def bench_json_backends(number):
+    document = [{"id": i, "name": "item-%s" % i, "tags": ["a", "b"], "ok": True} for i in range(10000)]
+    serialized = json.dumps(document).encode("utf-8")
+    results = {}
+    try:
+        for backend in utils.JSON_BACKENDS[:2]:
+            if utils.set_json_backend(backend) != backend:
+                continue
+            results[backend] = {
+                "loads": measure(lambda: utils.json_loads(serialized), number),
+                "dumps": measure(lambda: utils.json_dumps(document, as_bytes=True), number),
+            }
+    finally:
+        utils.set_json_backend("json")
+    return results
+
+
+def bench_session_creation(server, number):
+    library = RequestsLibrary()
+
+    def create():
+        library.create_session("bench", server.url)
+
+    result = measure(create, number)
+    library.delete_all_sessions()
+    return {"create_session": result}
+
+
+def bench_parallel_throughput(server, total_requests, workers):
+    library = RequestsLibrary()
+    library.create_session("bench", server.url, max_retries=0)
+    results = {}
+    for worker_count in workers:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            list(
+                executor.map(
+                    lambda _: library.get_on_session("bench", "/anything"),
+                    range(total_requests),
+                )
+            )
+        elapsed = time.perf_counter() - start
+        results["workers-%s" % worker_count] = {
+            "requests": total_requests,
+            "seconds": elapsed,
+            "requests_per_sec": total_requests / elapsed,
+        }
+    return results
+
+
+def run(args):
+    results = {
+        "merge_url": bench_merge_url(args.number * 10),
+        "merge_headers": bench_merge_headers(args.number * 10),
+        "format_data_according_to_header": bench_format_data(args.number * 10),
+        "log_response": bench_log_response(args.number),
+        "json_backends": bench_json_backends(max(1, args.number // 10)),
+    }
+    with BackgroundServer() as server:
+        results["per_call_overhead"] = bench_per_call_overhead(server, args.number)
+        results["session_creation"] = bench_session_creation(server, args.number)
+        results["parallel_throughput"] = bench_parallel_throughput(
+            server, args.number * 4, args.workers
+        )
+    return {
+        "meta": {
+            "library": VERSION,
+            "requests": requests.__version__,
+            "robotframework": robot.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def flatten(results, prefix=""):
+    for name, value in results.items():
+        key = "%s.%s" % (prefix, name) if prefix else name
+        if "min_us" in value:
+            yield key, value["min_us"], "us"
+        elif "requests_per_sec" in value:
+            yield key, value["requests_per_sec"], "req/s"
+        else:
+            for item in flatten(value, key):
+                yield item
+
+
+def compare(current, baseline, threshold):
+    """Prints the differences with a baseline and returns the number of regressions."""
+    previous = {key: value for key, value, _ in flatten(baseline["results"])}
+    regressions = 0
+    print("%-60s %17s %17s %9s" % ("benchmark", "baseline", "current", "change"))
+    for key, value, unit in flatten(current["results"]):
+        if key not in previous:
+            continue
+        change = (value - previous[key]) / previous[key] * 100
+        # for throughput a lower value is worse, for timings a higher one
+        worse = -change if unit == "req/s" else change
+        marker = ""
+        if worse > threshold:
+            regressions += 1
+            marker = " <-- regression"
+        print(
+            "%-60s %11.2f %-5s %11.2f %-5s %+8.1f%%%s"
+            % (key, previous[key], unit, value, unit, change, marker)
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="JSON file where results are stored")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="percentage above which a slowdown is reported as a regression (default 10)",
+    )
+    parser.add_argument(
+        "--number", type=int, default=200, help="base number of iterations (default 200)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 4, 8],
+        help="worker threads for the parallel throughput benchmark (default 1 4 8)",
+    )
+    args = parser.parse_args(argv)
+
+    current = run(args)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(current, file, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(current, indent=2, sort_keys=True))
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        return 1 if compare(current, baseline, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,43 @@
+import tempfile
+
 import requests
 import robot
+from requests.auth import HTTPBasicAuth
+from requests.hooks import dispatch_hook
+from requests.models import RequestEncodingMixin
+from requests.structures import CaseInsensitiveDict
+from robot.api import logger
 from robot.api.deco import keyword
 from robot.libraries.BuiltIn import BuiltIn
+from robot.utils import is_truthy
 
 from RequestsLibrary import log
 from RequestsLibrary.compat import urljoin
+from RequestsLibrary.compression import CompressedStream, compress_bytes, parse_compression
+from RequestsLibrary.exceptions import InvalidResponse, ResponseTooLarge
+from RequestsLibrary.memo import ResponseMemo
+from RequestsLibrary.multipart import StreamingMultipartEncoder
+from RequestsLibrary.profiler import LibraryProfiler
+from RequestsLibrary.responses import LibraryResponse, LimitedStream, retain_response
+from RequestsLibrary.streaming import CHUNK_SIZE
 from RequestsLibrary.utils import (
+    get_json_path_value,
+    is_fast_json_backend,
     is_list_or_tuple,
+    is_string_type,
     is_file_descriptor,
+    json_dumps,
+    merge_headers,
+    parse_byte_size,
     warn_if_equal_symbol_in_url_session_less,
 )
 
 
+def _skip_auth(request):
+    # replaces the session auth of prepared requests
+    return request
+
+
 class RequestsKeywords(object):
 
     def __init__(self):
@@ -22,8 +48,17 @@ class RequestsKeywords(object):
         self.timeout = None
         self.cookies = None
         self.last_response = None
+        self._response_retention = "full"
+        self._profiler = LibraryProfiler()
+        self._cassette = None
+        self._memo = ResponseMemo()
 
     def _common_request(self, method, session, uri, **kwargs):
+        with self._profiler.profile_request(method):
+            return self._send_request(method, session, uri, **kwargs)
+
+    def _send_request(self, method, session, uri, log_body=True, quiet=False, **kwargs):
+        profiler = self._profiler
 
         if session:
             request_function = getattr(session, "request")
@@ -32,28 +67,124 @@ class RequestsKeywords(object):
 
         self._capture_output()
 
-        resp = request_function(
-            method,
-            self._merge_url(session, uri),
-            timeout=self._get_timeout(kwargs.pop("timeout", None)),
-            cookies=kwargs.pop("cookies", self.cookies),
-            **kwargs
-        )
-
-        log.log_request(resp)
-        self._print_debug()
-
-        log.log_response(resp)
-
-        self.last_response = resp
+        with profiler.measure("merge_url"):
+            url = self._merge_url(session, uri)
 
+        # the original descriptors are closed at the end, even if the body is encoded by the library
         files = kwargs.get("files", {}) or {}
         data = kwargs.get("data", []) or []
 
-        self._close_file_descriptors(files, data)
+        compression = parse_compression(
+            kwargs.pop("compress_request", getattr(session, "compress_request", None))
+        )
+        stream_files = is_truthy(kwargs.pop("stream_files", False))
+        # multipart bodies can only be compressed once encoded by the library
+        if (stream_files or compression) and kwargs.get("files"):
+            with profiler.measure("encode_multipart"):
+                self._stream_multipart_body(kwargs)
+
+        if is_fast_json_backend() or compression:
+            with profiler.measure("serialize_json"):
+                self._serialize_json_body(session, kwargs)
+
+        if compression:
+            with profiler.measure("compress_request"):
+                self._compress_body(session, kwargs, compression)
+
+        max_response_bytes = parse_byte_size(
+            kwargs.pop("max_response_bytes", getattr(session, "max_response_bytes", None)),
+            "max_response_bytes",
+        )
+        spill_threshold = parse_byte_size(
+            kwargs.pop("spill_threshold", getattr(session, "spill_threshold", None)),
+            "spill_threshold",
+        )
+        streamed = kwargs.get("stream", False)
+        read_body = max_response_bytes is not None or (
+            spill_threshold is not None and not streamed
+        )
+        if read_body:
+            kwargs["stream"] = True
+
+        cassette = self._cassette
+        try:
+            with profiler.measure("request"):
+                if cassette is not None and cassette.replaying:
+                    kwargs.pop("timeout", None)
+                    resp = cassette.play(
+                        self._prepare_request(session, method, url, kwargs.pop("cookies", self.cookies), kwargs)
+                    )
+                    # only the hooks of the request, the ones of the session auth expect a real connection
+                    resp = dispatch_hook("response", kwargs.get("hooks"), resp)
+                else:
+                    resp = request_function(
+                        method,
+                        url,
+                        timeout=self._get_timeout(kwargs.pop("timeout", None)),
+                        cookies=kwargs.pop("cookies", self.cookies),
+                        **kwargs
+                    )
+                resp = LibraryResponse.wrap(resp)
+                if read_body:
+                    self._read_body(
+                        resp, max_response_bytes, spill_threshold, read_body=not streamed
+                    )
+        finally:
+            with profiler.measure("close_files"):
+                self._close_file_descriptors(files, data)
+
+        if cassette is not None and cassette.recording:
+            # streamed and spilled bodies would have to be loaded in memory as a whole
+            if streamed or resp.spilled:
+                logger.warn(
+                    "Not recording the response of %s %s in the cassette, its body is %s"
+                    % (method.upper(), resp.url, "streamed" if streamed else "spilled to a temporary file")
+                )
+            else:
+                with profiler.measure("record"):
+                    cassette.record(resp)
+
+        # quiet requests, like the attempts of a poll, are logged by their keyword
+        if not quiet:
+            with profiler.measure("log_request"):
+                log.log_request(resp)
+        with profiler.measure("print_debug"):
+            self._print_debug()
+
+        if not quiet:
+            with profiler.measure("log_response"):
+                # streamed bodies are left to the caller, reading them here would load them as a whole
+                log.log_response(resp, log_body and not streamed)
+
+        self.last_response = retain_response(resp, self._response_retention)
 
         return resp
 
+    @staticmethod
+    def _prepare_request(session, method, url, cookies, kwargs):
+        """
+        Helper method that prepares the request that would be sent, without sending it.
+
+        Only the plain credentials of the session auth are applied, other auth handlers,
+        like the OAuth2 one fetching its token, could need the network.
+        """
+        auth = kwargs.get("auth")
+        if auth is None and session is not None and not isinstance(session.auth, (tuple, HTTPBasicAuth)):
+            auth = _skip_auth
+        request = requests.Request(
+            method=method.upper(),
+            url=url,
+            headers=kwargs.get("headers"),
+            files=kwargs.get("files"),
+            data=kwargs.get("data"),
+            json=kwargs.get("json"),
+            params=kwargs.get("params"),
+            auth=auth,
+            cookies=cookies,
+            hooks=kwargs.get("hooks"),
+        )
+        return (session or requests.Session()).prepare_request(request)
+
     @staticmethod
     def _close_file_descriptors(files, data):
         """
@@ -72,6 +203,112 @@ class RequestsKeywords(object):
         for file_descriptor in files_descriptor_to_close:
             file_descriptor.close()
     
+    @staticmethod
+    def _read_body(resp, limit=None, spill_threshold=None, read_body=True):
+        """
+        Helper method that reads the body of a streamed response.
+
+        It fails, closing the connection, as soon as more than ``limit`` bytes are received
+        and writes the body to a temporary file once it is bigger than ``spill_threshold``.
+        The body of responses requested with ``stream`` is left to the caller: it fails
+        the same way, while it is read, once more than ``limit`` bytes are received.
+        """
+        message = "Response body of %s %s exceeds max_response_bytes=%s" % (
+            resp.request.method,
+            resp.url,
+            limit,
+        )
+        length = resp.headers.get("Content-Length", "")
+        if limit is not None and length.isdigit() and int(length) > limit:
+            resp.close()
+            raise ResponseTooLarge("%s (Content-Length: %s)" % (message, length))
+        if not read_body:
+            if resp.raw is not None and not resp._content_consumed:
+                resp.raw = LimitedStream(resp.raw, limit, message)
+            return
+
+        chunks = []
+        size = 0
+        file = None
+        try:
+            for chunk in resp.iter_content(CHUNK_SIZE):
+                size += len(chunk)
+                if limit is not None and size > limit:
+                    resp.close()
+                    raise ResponseTooLarge(message)
+                if file is not None:
+                    file.write(chunk)
+                    continue
+                chunks.append(chunk)
+                if spill_threshold is not None and size > spill_threshold:
+                    file = tempfile.TemporaryFile(prefix="robot-requests-")
+                    file.writelines(chunks)
+                    chunks = []
+        except BaseException:
+            if file is not None:
+                file.close()
+            raise
+        if file is None:
+            resp._content = b"".join(chunks)
+        else:
+            resp.spill(file)
+
+    @staticmethod
+    def _stream_multipart_body(kwargs):
+        """
+        Helper method that replaces ``files`` and ``data`` with a multipart body
+        reading the files only while the request is sent.
+        """
+        encoder = StreamingMultipartEncoder(kwargs.pop("data", None), kwargs.pop("files"))
+        headers = CaseInsensitiveDict(kwargs.get("headers") or {})
+        headers["Content-Type"] = encoder.content_type
+        kwargs["headers"] = headers
+        kwargs["data"] = encoder
+
+    @staticmethod
+    def _compress_body(session, kwargs, compression):
+        """
+        Helper method that compresses the ``data`` body and sets its ``Content-Encoding``.
+        File descriptors and other streams are compressed while they are sent.
+        """
+        data = kwargs.get("data")
+        if data is None or (isinstance(data, (str, bytes)) and not data):
+            return
+        headers = CaseInsensitiveDict(kwargs.get("headers") or {})
+        if isinstance(data, (dict, list, tuple)):
+            data = RequestEncodingMixin._encode_params(data)
+            merged_headers = merge_headers(session, headers) if session else headers
+            if "Content-Type" not in merged_headers:
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if is_string_type(data):
+            data = data.encode("utf-8")
+        if isinstance(data, (bytes, bytearray)):
+            data = compress_bytes(bytes(data), compression)
+        else:
+            data = CompressedStream(data, compression)
+        headers["Content-Encoding"] = compression
+        kwargs["headers"] = headers
+        kwargs["data"] = data
+
+    @staticmethod
+    def _serialize_json_body(session, kwargs):
+        """
+        Helper method that serializes the ``json`` body with the selected JSON backend
+        instead of letting requests do it with the standard json module.
+        Like in requests ``data`` has priority and ``json`` is ignored when both are passed.
+        """
+        if kwargs.get("json") is None or kwargs.get("data"):
+            return
+        kwargs["data"] = json_dumps(kwargs.pop("json"), as_bytes=True)
+        headers = kwargs.get("headers")
+        merged_headers = (
+            merge_headers(session, headers) if session else CaseInsensitiveDict(headers or {})
+        )
+        if "Content-Type" not in merged_headers:
+            headers = CaseInsensitiveDict(headers or {})
+            headers["Content-Type"] = "application/json"
+            kwargs["headers"] = headers
+
     @staticmethod
     def _merge_url(session, uri):
         """
@@ -135,7 +372,7 @@ class RequestsKeywords(object):
         |        [...]
         """
         if response is None:
-            response = self.last_response
+            response = self._get_retained_response()
         self._check_status(expected_status, response, msg)
 
     @keyword("Request Should Be Successful")
@@ -151,9 +388,16 @@ class RequestsKeywords(object):
         For a more versatile assert keyword see `Status Should Be`.
         """
         if not response:
-            response = self.last_response
+            response = self._get_retained_response()
         self._check_status(None, response, msg=None)
 
+    def _get_retained_response(self):
+        if self.last_response is None and self._response_retention == "none":
+            raise InvalidResponse(
+                "The last response is not retained with response_retention=none, pass the response explicitly"
+            )
+        return self.last_response
+
     @staticmethod
     @keyword("Get File For Streaming Upload")
     def get_file_for_streaming_upload(path):
@@ -165,13 +409,94 @@ class RequestsKeywords(object):
 
         File descriptor is binary mode and read only. Requests keywords will automatically close the file,
         if used outside this library it's up to the caller to close it.
+
+        File descriptors passed in ``files`` for a multipart upload are streamed only with ``stream_files=${True}``,
+        otherwise the whole multipart body is built in memory before being sent.
         """
         return open(path, "rb")
 
+    @keyword("Get JSON Value")
+    def get_json_value(self, response, path):
+        """
+        Returns the value found at ``path`` in the JSON body of the ``response``.
+
+        ``path`` is a simple JSONPath expression: keys separated by dots or in brackets
+        (``$.user.name``, ``$['user']['first name']``), list indexes (``$.items[0]``, ``$.items[-1]``)
+        and ``*`` wildcards (``$.items[*].id``), in which case the list of all the matching values is returned.
+        The keyword fails if nothing is found at the given path.
+
+        The body of responses returned by the requests keywords is parsed only once, following
+        `Get JSON Value` and ``${response.json()}`` calls reuse the same parsed object, so they are
+        cheap even with large JSON bodies. Be aware that modifying the returned value modifies it
+        also for the next calls.
+
+        |   ${resp}=    GET On Session    jsonplaceholder    /posts
+        |   ${title}=   Get JSON Value    ${resp}    $[0].title
+        |   ${ids}=     Get JSON Value    ${resp}    $[*].id
+        """
+        return get_json_path_value(response.json(), path)
+
+    @keyword("Response Body Should Contain")
+    def response_body_should_contain(self, response, expected, msg=None):
+        """
+        Fails if the body of the ``response`` does not contain ``expected``.
+
+        ``expected`` can be bytes or a string, strings are encoded with the response encoding,
+        UTF-8 if not known. The body is searched without decoding it, for responses spilled
+        to a temporary file (see the ``spill_threshold`` session option) directly in the
+        memory mapped file, so the body is never loaded in memory.
+
+        The default error message can be overridden with ``msg``.
+
+        |   ${resp}=    GET On Session    alias    /export    spill_threshold=1048576
+        |   Response Body Should Contain    ${resp}    "status": "complete"
+        """
+        if not isinstance(expected, bytes):
+            expected = str(expected).encode(response.encoding or "utf-8")
+        body = response.body_view if isinstance(response, LibraryResponse) else response.content
+        if body is None or body.find(expected) == -1:
+            raise AssertionError(
+                msg or "Response body of %s does not contain %r" % (response.url, expected)
+            )
+
+    @keyword("Start Library Profiling")
+    def start_library_profiling(self, cprofile_dir=None):
+        """
+        Starts measuring the time spent inside RequestsLibrary itself, split from the network wait.
+
+        Every request keyword is split in phases (url merging, request logging, response logging,
+        status check, etc.) and the time spent in each of them is collected until
+        `Stop Library Profiling` is called. The ``request`` phase is the time spent inside
+        the requests library, network wait included, all the others are library overhead.
+
+        If ``cprofile_dir`` is given, each request is also profiled with ``cProfile`` and its stats
+        are dumped to a separate ``.prof`` file in that directory, ready to be inspected
+        with ``pstats`` or ``snakeviz``.
+
+        Profiling can also be enabled for the whole execution with the ``profile`` library import option.
+        """
+        self._profiler.start(cprofile_dir)
+
+    @keyword("Stop Library Profiling")
+    def stop_library_profiling(self):
+        """
+        Stops the library profiling, logs a summary and returns the collected stats as a dictionary.
+
+        The dictionary contains the number of ``requests``, the ``network_ms`` and ``library_overhead_ms``
+        totals and the ``phases`` details with ``calls``, ``total_ms`` and ``mean_ms`` for each phase.
+        """
+        stats = self._profiler.get_stats()
+        self._profiler.stop()
+        self._profiler.log_stats(stats)
+        return stats
+
     @keyword("Last response")
     def get_last_response(self) -> requests.Response:
         """
         Returns the response from the last request.
+
+        Depending on the ``response_retention`` library import option it is the full response,
+        a snapshot without body (``headers-only``) or ``None`` (``none``).
         """
         return self.last_response
 
@@ -207,6 +532,10 @@ class RequestsKeywords(object):
         | ``verify``  | Either a boolean, in which case it controls whether we verify the server's TLS certificate, or a string, in which case it must be a path to a CA bundle to use. Defaults to ``${True}``. Warning: if a session has been created with ``verify=${False}`` any other requests will not verify the SSL certificate. |
         | ``stream`` | if ``${False}``, the response content will be immediately downloaded. |
         | ``cert`` | if String, path to ssl client cert file (.pem). If Tuple, ('cert', 'key') pair. |
+        | ``max_response_bytes`` | Maximum size in bytes of the response body, the request fails as soon as it is exceeded. Overrides the session ``max_response_bytes``. |
+        | ``compress_request`` | Compresses the ``data`` or ``json`` body with ``gzip``, ``deflate`` or ``zstd`` (requires the ``zstandard`` module) and sets the ``Content-Encoding`` header. File descriptors, like the ones of `Get File For Streaming Upload`, are compressed while they are sent. Overrides the session ``compress_request``, ``${None}`` disables it. |
+        | ``stream_files`` | if ``${True}``, the multipart body of ``files`` (and ``data`` fields) is encoded while it is sent, reading the files in chunks instead of building the whole body in memory. Upload progress and throughput are logged. |
+        | ``spill_threshold`` | Size in bytes above which the response body is written to a temporary file instead of being kept in memory. Overrides the session ``spill_threshold``. |
 
         For more updated and complete information verify the official Requests api documentation:
         https://requests.readthedocs.io/en/latest/api/
@@ -1,6 +1,29 @@
+import time
+
+import requests
+from robot.api import logger
 from robot.api.deco import keyword
 
-from RequestsLibrary.utils import warn_if_equal_symbol_in_url_on_session
+from RequestsLibrary import log
+from RequestsLibrary.downloads import (
+    RANGE_REQUEST_ARGUMENTS,
+    download_ranges_to_file,
+    download_to_file,
+    parse_hash_algorithms,
+    supports_ranges,
+)
+from RequestsLibrary.memo import parse_ttl
+from RequestsLibrary.polling import (
+    DEFAULT_POLL_BACKOFF,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_POLL_MAX_INTERVAL,
+    DEFAULT_POLL_TIMEOUT,
+    PollBackoff,
+    PollCondition,
+)
+from RequestsLibrary.responses import retain_response
+from RequestsLibrary.streaming import CHUNK_SIZE, iter_json_items
+from RequestsLibrary.utils import merge_headers, warn_if_equal_symbol_in_url_on_session
 
 from .SessionKeywords import SessionKeywords
 
@@ -28,12 +51,46 @@ class RequestsOnSessionKeywords(SessionKeywords):
 
         Other optional requests arguments can be passed using ``**kwargs``
         see the `GET` keyword for the complete list.
+
+        With ``cache_ttl`` successful responses are memoized for that number of seconds,
+        even when the server sends no caching headers: requests with the same session alias,
+        url, ``params`` and headers get the same response without being sent again.
+        Memoized responses are shared by all the suites using the library, the least recently
+        used are evicted beyond 256 of them and `Clear Memoized Responses` removes them all.
+
+        |   ${flags}=    GET On Session    alias    /feature-flags    cache_ttl=300
         """
         session = self._cache.switch(alias)
-        response = self._common_request("GET", session, url, params=params, **kwargs)
+        ttl = parse_ttl(kwargs.pop("cache_ttl", None))
+        if ttl is None or kwargs.get("stream"):
+            response = self._common_request("GET", session, url, params=params, **kwargs)
+        else:
+            response = self._memoized_get(alias, session, url, params, ttl, kwargs)
         self._check_status(expected_status, response, msg)
         return response
 
+    def _memoized_get(self, alias, session, url, params, ttl, kwargs):
+        if isinstance(params, dict):
+            params = sorted(params.items())
+        prepared_url = requests.Request("GET", self._merge_url(session, url), params=params).prepare().url
+        key = self._memo.key(alias, prepared_url, merge_headers(session, kwargs.get("headers")))
+        response, remaining = self._memo.get(key)
+        if response is not None:
+            logger.info("Memoized response of GET %s, expiring in %.1f s" % (prepared_url, remaining))
+            self.last_response = retain_response(response, self._response_retention)
+            return response
+        response = self._common_request("GET", session, url, params=params, **kwargs)
+        if response.ok:
+            self._memo.set(key, response, ttl)
+        return response
+
+    @keyword("Clear Memoized Responses")
+    def clear_memoized_responses(self):
+        """
+        Removes all the responses memoized by `GET On Session` with ``cache_ttl``.
+        """
+        self._memo.clear()
+
     @keyword("POST On Session")
     @warn_if_equal_symbol_in_url_on_session
     def post_on_session(
@@ -249,3 +306,241 @@ class RequestsOnSessionKeywords(SessionKeywords):
         response = self._common_request("TRACE", session, url, **kwargs)
         self._check_status(expected_status, response, msg)
         return response
+
+    @keyword("Poll On Session Until")
+    @warn_if_equal_symbol_in_url_on_session
+    def poll_on_session_until(
+        self,
+        alias,
+        url,
+        status=None,
+        json_path=None,
+        expected_value=None,
+        poll_timeout=DEFAULT_POLL_TIMEOUT,
+        poll_interval=DEFAULT_POLL_INTERVAL,
+        max_poll_interval=DEFAULT_POLL_MAX_INTERVAL,
+        backoff=DEFAULT_POLL_BACKOFF,
+        params=None,
+        **kwargs
+    ):
+        """
+        Sends GET requests on a previously created HTTP Session until the response meets a condition,
+        returning that response. It fails when the condition is still not met after ``poll_timeout``.
+
+        The condition is met by a response with one of the ``status`` codes, a single one
+        or a comma separated list, and, with a ``json_path``, a JSON body with ``expected_value``
+        at that path. Without ``expected_value`` the path only has to exist and without ``status``
+        the response has to be successful.
+
+        The first request is sent at once, the next ones after ``poll_interval``, multiplied by ``backoff``
+        after each request up to ``max_poll_interval``. Every delay is randomly shortened by up to half,
+        so that tests polling the same server do not send their requests together, and the last one ends
+        at the ``poll_timeout`` deadline. Durations are in Robot Framework time format, like ``30s`` or ``2 min``.
+
+        Once a response has an ``ETag`` it is sent back in the ``If-None-Match`` header of the next requests:
+        a ``304 Not Modified`` response means the resource, thus the condition, did not change.
+
+        The requests are not logged one by one, a summary of the attempts is logged instead, followed
+        by the last request and response.
+
+        |   ${job}=    Poll On Session Until    alias    /jobs/42    json_path=$.state    expected_value=done
+        |   Poll On Session Until    alias    /reports/42    status=200    poll_timeout=2 min    poll_interval=1s
+
+        Other optional requests arguments can be passed using ``**kwargs``
+        see the `GET` keyword for the complete list.
+        """
+        session = self._cache.switch(alias)
+        condition = PollCondition(status, json_path, expected_value)
+        delays = PollBackoff.from_options(poll_timeout, poll_interval, max_poll_interval, backoff)
+        headers = dict(kwargs.pop("headers", None) or {})
+        last = None
+        etag = None
+        attempts = 0
+        not_modified = 0
+        while True:
+            if etag:
+                headers["If-None-Match"] = etag
+            response = self._common_request(
+                "GET", session, url, params=params, headers=headers, quiet=True, **kwargs
+            )
+            attempts += 1
+            if response.status_code == 304 and last is not None:
+                not_modified += 1
+            else:
+                last = response
+                etag = response.headers.get("ETag", etag)
+                if condition.matches(response):
+                    break
+            delay = delays.next_delay()
+            if delay is None:
+                self._log_poll(last, attempts, not_modified, delays.elapsed, "not met")
+                # the failure describes the last full response, not the last attempt
+                self.last_response = retain_response(last, self._response_retention)
+                raise AssertionError(
+                    "Condition %s not met after %s attempts in %.1f seconds, last response: %s"
+                    % (condition, attempts, delays.elapsed, condition.describe(last))
+                )
+            time.sleep(delay)
+        self._log_poll(last, attempts, not_modified, delays.elapsed, "met")
+        self.last_response = retain_response(last, self._response_retention)
+        return last
+
+    @staticmethod
+    def _log_poll(response, attempts, not_modified, elapsed, outcome):
+        logger.info(
+            "Poll of %s: condition %s after %s attempts in %.3f s, %s not modified"
+            % (response.url, outcome, attempts, elapsed, not_modified)
+        )
+        log.log_request(response)
+        log.log_response(response)
+
+    @keyword("Stream JSON Items On Session")
+    @warn_if_equal_symbol_in_url_on_session
+    def stream_json_items_on_session(
+        self, alias, url, path="$", item_keyword=None, params=None, expected_status=None, msg=None, **kwargs
+    ):
+        """
+        Sends a GET request on a previously created HTTP Session and parses the JSON
+        response incrementally, while it is downloaded, returning the number of items
+        of the JSON array found at ``path``.
+
+        This keyword is meant for very large JSON arrays (exports, audit logs, etc.):
+        the body is never loaded in memory as a whole, items are decoded one at a time
+        and the response body is not logged.
+
+        ``path`` is a JSONPath made of keys and indexes pointing to an array (``$``, ``$.data.items``,
+        ``$.pages[0].items``), by default the whole document is expected to be an array.
+
+        ``item_keyword`` is the name of a keyword that is run for each item, with the item as its only
+        argument: it can be used to make assertions on every item or to aggregate data with constant memory.
+
+        |   ${count}=    Stream JSON Items On Session    alias    /export    $.records
+        |   Stream JSON Items On Session    alias    /export    $.records    item_keyword=Record Should Be Valid
+
+        The response, available with `Last response`, has its body already consumed.
+
+        By default this keyword fails if a status code with error values is returned in the response,
+        this behavior can be modified using the ``expected_status`` and ``msg`` parameters,
+        read more about it in `Status Should Be` keyword documentation.
+
+        Other optional requests arguments can be passed using ``**kwargs``
+        see the `GET` keyword for the complete list.
+        """
+        session = self._cache.switch(alias)
+        kwargs["stream"] = True
+        response = self._common_request(
+            "GET", session, url, params=params, log_body=False, **kwargs
+        )
+        count = 0
+        try:
+            self._check_status(expected_status, response, msg)
+            for item in iter_json_items(response.iter_content(CHUNK_SIZE), path):
+                count += 1
+                if item_keyword:
+                    self.builtin.run_keyword(item_keyword, item)
+        finally:
+            response.close()
+        logger.info("Streamed %s JSON items found at %s" % (count, path))
+        return count
+
+    @keyword("Download File On Session")
+    @warn_if_equal_symbol_in_url_on_session
+    def download_file_on_session(
+        self,
+        alias,
+        url,
+        path,
+        hash_algorithms=None,
+        connections=1,
+        params=None,
+        expected_status=None,
+        msg=None,
+        **kwargs
+    ):
+        """
+        Sends a GET request on a previously created HTTP Session and streams the response body
+        to the file ``path``, returning a download result instead of a response.
+
+        The body is written in chunks and never loaded in memory as a whole, so files of any size
+        can be downloaded. Only the response metadata is logged.
+
+        While the body is written its size and hashes are computed. ``hash_algorithms`` is a comma
+        separated list of ``hashlib`` algorithm names, by default ``sha256,md5``,
+        an empty string disables hashing.
+
+        The returned object has the following attributes:
+        ``path``, ``size`` (in bytes), ``hashes`` (a dictionary algorithm: hex digest),
+        ``sha256``, ``md5``, ``status_code``, ``reason``, ``headers`` and ``url``.
+
+        |   ${result}=    Download File On Session    alias    /export    ${OUTPUT DIR}/export.zip
+        |   Should Be Equal    ${result.sha256}    ${EXPECTED SHA256}
+        |   Should Be Equal As Integers    ${result.size}    1048576
+
+        The file is written with a ``.part`` suffix and renamed when complete, missing directories are created.
+
+        With ``connections`` greater than 1, when the server accepts byte ranges (``Accept-Ranges: bytes``)
+        and sends the body length, the body is split in ranges downloaded in parallel over
+        up to ``connections`` connections of the session pool and written at their offset in the file.
+        The completed ranges are recorded next to the ``.part`` file: when a parallel download fails,
+        running the keyword again for the same resource, with the same ``ETag`` or ``Last-Modified``,
+        fetches only the missing ranges. In this mode hashes are computed reading the completed file.
+        Servers that do not accept ranges are downloaded with a single connection.
+
+        |   ${result}=    Download File On Session    alias    /artifacts/image.iso    ${path}    connections=8
+
+        By default this keyword fails if a status code with error values is returned in the response,
+        in that case nothing is written. This behavior can be modified using the ``expected_status``
+        and ``msg`` parameters, read more about it in `Status Should Be` keyword documentation.
+
+        Other optional requests arguments can be passed using ``**kwargs``
+        see the `GET` keyword for the complete list.
+        """
+        session = self._cache.switch(alias)
+        # invalid algorithms fail before anything is sent
+        hash_algorithms = parse_hash_algorithms(hash_algorithms)
+        kwargs["stream"] = True
+        response = self._common_request(
+            "GET", session, url, params=params, log_body=False, **kwargs
+        )
+        try:
+            self._check_status(expected_status, response, msg)
+        except Exception:
+            response.close()
+            raise
+        connections = int(connections)
+        # the range requests are sent directly on the session, they cannot be recorded nor replayed
+        if connections > 1 and self._cassette is None and supports_ranges(response):
+            result = download_ranges_to_file(
+                response,
+                path,
+                self._range_fetcher(session, response, kwargs),
+                connections,
+                hash_algorithms,
+            )
+        else:
+            result = download_to_file(response, path, hash_algorithms)
+        logger.info(
+            "Downloaded %s bytes to %s %s"
+            % (result.size, result.path, " ".join("%s=%s" % item for item in sorted(result.hashes.items())))
+        )
+        return result
+
+    def _range_fetcher(self, session, response, kwargs):
+        # the library options, like max_response_bytes, are not arguments of the session request
+        range_kwargs = {name: value for name, value in kwargs.items() if name in RANGE_REQUEST_ARGUMENTS}
+        # the same timeout and cookies as the requests sent by the keywords
+        range_kwargs["timeout"] = self._get_timeout(kwargs.get("timeout"))
+        range_kwargs["cookies"] = kwargs.get("cookies", self.cookies)
+        base_headers = dict(kwargs.get("headers") or {})
+        etag = response.headers.get("ETag")
+        # a range of a different version of the resource must never be written in the file
+        if etag and not etag.startswith("W/"):
+            base_headers["If-Range"] = etag
+
+        def fetch_range(first, last):
+            headers = dict(base_headers)
+            headers["Range"] = "bytes=%s-%s" % (first, last)
+            logger.debug("Downloading %s range bytes=%s-%s" % (response.url, first, last))
+            return session.request("GET", response.url, headers=headers, **range_kwargs)
+
+        return fetch_range
@@ -1,17 +1,28 @@
 import logging
+import os
 import sys
 
 import requests
 from requests.cookies import merge_cookies
 from requests.models import Response
+from requests.structures import CaseInsensitiveDict
 from requests.sessions import merge_setting
 from robot.api import logger
 from robot.api.deco import keyword
 from robot.utils.asserts import assert_equal
 
 from RequestsLibrary import utils
+from RequestsLibrary.adapters import LibraryHTTPAdapter
+from RequestsLibrary.auth import HandshakeAuth, SharedDigestAuth
+from RequestsLibrary.cache import create_cache
+from RequestsLibrary.circuit import CircuitBreaker, parse_cooldown, parse_threshold
 from RequestsLibrary.compat import RetryAdapter, httplib
+from RequestsLibrary.compression import parse_compression, response_decoders
 from RequestsLibrary.exceptions import InvalidExpectedStatus, InvalidResponse
+from RequestsLibrary.hedging import HEDGE_BUDGET_MIN_HEDGES, HEDGE_BUDGET_RATIO, Hedger, parse_hedge_after
+from RequestsLibrary.oauth2 import OAuth2ClientCredentials
+from RequestsLibrary.retries import LibraryRetry, RetryBudget, RetryStats, parse_retry_budget
+from RequestsLibrary.state import apply_session_state, load_state, save_state, session_state
 from RequestsLibrary.utils import is_string_type
 
 from .RequestsKeywords import RequestsKeywords
@@ -41,6 +52,17 @@ class SessionKeywords(RequestsKeywords):
         disable_warnings,
         retry_status_list,
         retry_method_list,
+        max_response_bytes=None,
+        spill_threshold=None,
+        compress_request=None,
+        expect_continue=None,
+        cache=None,
+        cache_max_bytes=None,
+        cache_dir=None,
+        retry_budget=None,
+        circuit_breaker=None,
+        circuit_breaker_cooldown=None,
+        hedge_after=None,
     ):
 
         logger.debug("Creating session: %s" % alias)
@@ -57,19 +79,45 @@ class SessionKeywords(RequestsKeywords):
         except ValueError as err:
             raise ValueError("Error converting session parameter: %s" % err)
 
+        # same as the requests default retries, without any retry
+        retry = LibraryRetry(total=requests.adapters.DEFAULT_RETRIES, read=False)
         if max_retries > 0:
-            retry = RetryAdapter(
+            retry = LibraryRetry(
                 total=max_retries,
                 backoff_factor=backoff_factor,
                 status_forcelist=retry_status_list,
                 allowed_methods=retry_method_list,
             )
-            http = requests.adapters.HTTPAdapter(max_retries=retry)
-            https = requests.adapters.HTTPAdapter(max_retries=retry)
+        s.retry_stats = retry.stats = RetryStats(parse_retry_budget(retry_budget))
+        expect_continue = utils.parse_byte_size(expect_continue, "expect_continue")
+        s.cache = create_cache(cache, utils.parse_byte_size(cache_max_bytes, "cache_max_bytes"), cache_dir)
+        circuit_breaker = parse_threshold(circuit_breaker)
+        s.circuit_breaker = (
+            CircuitBreaker(circuit_breaker, parse_cooldown(circuit_breaker_cooldown)) if circuit_breaker else None
+        )
+        hedge_after = parse_hedge_after(hedge_after)
+        s.hedger = (
+            Hedger(hedge_after, RetryBudget(HEDGE_BUDGET_RATIO, min_retries=HEDGE_BUDGET_MIN_HEDGES))
+            if hedge_after is not None
+            else None
+        )
+        adapter_options = dict(
+            max_retries=retry,
+            expect_continue=expect_continue,
+            cache=s.cache,
+            circuit_breaker=s.circuit_breaker,
+            hedger=s.hedger,
+        )
+        http = LibraryHTTPAdapter(**adapter_options)
+        https = LibraryHTTPAdapter(**adapter_options)
+
+        # Replace the session's original adapters
+        s.mount("http://", http)
+        s.mount("https://", https)
 
-            # Replace the session's original adapters
-            s.mount("http://", http)
-            s.mount("https://", https)
+        # advertise the br and zstd encodings too when their codecs are installed
+        if "Accept-Encoding" not in CaseInsensitiveDict(headers or {}):
+            s.headers["Accept-Encoding"] = ", ".join(response_decoders())
 
         # Disable requests warnings, useful when you have large number of testcase
         # you will observe drastical changes in Robot log.html and output.xml files size
@@ -101,6 +149,9 @@ class SessionKeywords(RequestsKeywords):
         self.cookies = cookies
 
         s.url = url
+        s.max_response_bytes = utils.parse_byte_size(max_response_bytes, "max_response_bytes")
+        s.spill_threshold = utils.parse_byte_size(spill_threshold, "spill_threshold")
+        s.compress_request = parse_compression(compress_request)
 
         # Enable http verbosity
         if int(debug) >= 1:
@@ -127,6 +178,17 @@ class SessionKeywords(RequestsKeywords):
         disable_warnings=0,
         retry_status_list=[],
         retry_method_list=DEFAULT_RETRY_METHOD_LIST,
+        max_response_bytes=None,
+        spill_threshold=None,
+        compress_request=None,
+        expect_continue=None,
+        cache=None,
+        cache_max_bytes=None,
+        cache_dir=None,
+        retry_budget=None,
+        circuit_breaker=None,
+        circuit_breaker_cooldown=None,
+        hedge_after=None,
     ):
         """Create Session: create a HTTP session to a server
 
@@ -171,6 +233,60 @@ class SessionKeywords(RequestsKeywords):
                               eg. set to [502, 503] to retry requests if those status are returned.
                               Note that max_retries must be greater than 0.
 
+        ``max_response_bytes`` Maximum size in bytes of the response bodies, by default there is no limit.
+                               The body is read in chunks and the connection is closed as soon as the limit
+                               is exceeded, failing the request. It can be overridden per request.
+
+        ``spill_threshold`` Size in bytes above which response bodies are written to a temporary file
+                            instead of being kept in memory, by default bodies are always kept in memory.
+                            The body of spilled responses is accessed through a memory mapped view of the file,
+                            see `Response Body Should Contain`. It can be overridden per request.
+
+        ``compress_request`` Compresses the request bodies with ``gzip``, ``deflate`` or ``zstd``
+                             (requires the ``zstandard`` module) and sets their ``Content-Encoding``,
+                             by default bodies are not compressed. File descriptors are compressed
+                             while they are sent. It can be overridden per request.
+
+        ``expect_continue`` Sends request bodies of at least this number of bytes, and chunked bodies,
+                            with ``Expect: 100-continue``: the body is sent only once the server accepts it,
+                            a server rejecting the request early (e.g. 401 or 413) never receives it.
+                            ``0`` applies it to every request with a body, by default it is disabled.
+                            Single requests can also set the ``Expect: 100-continue`` header themselves.
+
+        ``cache`` Caches the ``GET`` responses following their ``Cache-Control``, ``Expires``, ``ETag``,
+                  ``Last-Modified`` and ``Vary`` headers: ``memory`` for the session only or ``disk``
+                  to share them between test runs. Fresh responses are returned without a request,
+                  stale ones are revalidated. Responses have a ``from_cache`` attribute and the log
+                  tells whether they come from the cache. Responses to requests with an ``Authorization``
+                  header are stored only when marked ``public``, ``s-maxage`` or ``must-revalidate``,
+                  the ones to requests with cookies only when marked ``public``.
+                  By default nothing is cached.
+
+        ``cache_max_bytes`` Size of the cached bodies beyond which the least recently used responses are evicted,
+                            64 MiB by default.
+
+        ``cache_dir`` Directory of the ``disk`` cache, by default ``robotframework-requests-cache-<uid>``
+                      in the temporary directory. It is shared by the sessions and runs using it,
+                      ``private`` responses are not stored there.
+
+        ``retry_budget`` Limits the retries to this ratio of the requests, e.g. ``0.1`` or ``10%``, to avoid
+                         retry storms multiplying the load of a failing server. The ratio applies to the requests
+                         of the last 10 seconds and 10 retries are always allowed. Requests that would exceed
+                         the budget fail like when ``max_retries`` is exhausted. By default retries are not limited.
+                         The retries are counted by request and by endpoint, see `Get Session Statistics`.
+
+        ``circuit_breaker`` Number of consecutive failures of a host after which its requests fail fast with
+                            ``CircuitOpenError``, without connecting nor retrying, for ``circuit_breaker_cooldown``
+                            seconds. A failure is a request without a response after all its ``max_retries``
+                            or with a ``5xx`` response. After the cooldown a single probe request is sent: its success
+                            closes the circuit, its failure opens it again. By default there is no circuit breaker.
+
+        ``circuit_breaker_cooldown`` Seconds during which an open circuit fails fast the requests, 30 by default.
+
+        ``hedge_after`` Seconds after which an idempotent request still without a response is sent again,
+                        on another connection, the first response is returned and the other request is cancelled.
+                        Duplicate requests are limited to 5% of the requests of the last 10 seconds, 10 are
+                        always allowed. By default requests are not hedged, see `Get Session Statistics`.
         """
         auth = requests.auth.HTTPBasicAuth(*auth) if auth else None
 
@@ -195,6 +311,17 @@ class SessionKeywords(RequestsKeywords):
             disable_warnings=disable_warnings,
             retry_status_list=retry_status_list,
             retry_method_list=retry_method_list,
+            max_response_bytes=max_response_bytes,
+            spill_threshold=spill_threshold,
+            compress_request=compress_request,
+            expect_continue=expect_continue,
+            cache=cache,
+            cache_max_bytes=cache_max_bytes,
+            cache_dir=cache_dir,
+            retry_budget=retry_budget,
+            circuit_breaker=circuit_breaker,
+            circuit_breaker_cooldown=circuit_breaker_cooldown,
+            hedge_after=hedge_after,
         )
 
     @keyword("Create Client Cert Session")
@@ -215,6 +342,17 @@ class SessionKeywords(RequestsKeywords):
         disable_warnings=0,
         retry_status_list=[],
         retry_method_list=DEFAULT_RETRY_METHOD_LIST,
+        max_response_bytes=None,
+        spill_threshold=None,
+        compress_request=None,
+        expect_continue=None,
+        cache=None,
+        cache_max_bytes=None,
+        cache_dir=None,
+        retry_budget=None,
+        circuit_breaker=None,
+        circuit_breaker_cooldown=None,
+        hedge_after=None,
     ):
         """Create Session: create a HTTP session to a server
 
@@ -261,6 +399,61 @@ class SessionKeywords(RequestsKeywords):
         ``retry_status_list`` List of integer HTTP status codes that, if returned, a retry is attempted.
                               eg. set to [502, 503] to retry requests if those status are returned.
                               Note that max_retries must be greater than 0.
+
+        ``max_response_bytes`` Maximum size in bytes of the response bodies, by default there is no limit.
+                               The body is read in chunks and the connection is closed as soon as the limit
+                               is exceeded, failing the request. It can be overridden per request.
+
+        ``spill_threshold`` Size in bytes above which response bodies are written to a temporary file
+                            instead of being kept in memory, by default bodies are always kept in memory.
+                            The body of spilled responses is accessed through a memory mapped view of the file,
+                            see `Response Body Should Contain`. It can be overridden per request.
+
+        ``compress_request`` Compresses the request bodies with ``gzip``, ``deflate`` or ``zstd``
+                             (requires the ``zstandard`` module) and sets their ``Content-Encoding``,
+                             by default bodies are not compressed. File descriptors are compressed
+                             while they are sent. It can be overridden per request.
+
+        ``expect_continue`` Sends request bodies of at least this number of bytes, and chunked bodies,
+                            with ``Expect: 100-continue``: the body is sent only once the server accepts it,
+                            a server rejecting the request early (e.g. 401 or 413) never receives it.
+                            ``0`` applies it to every request with a body, by default it is disabled.
+                            Single requests can also set the ``Expect: 100-continue`` header themselves.
+
+        ``cache`` Caches the ``GET`` responses following their ``Cache-Control``, ``Expires``, ``ETag``,
+                  ``Last-Modified`` and ``Vary`` headers: ``memory`` for the session only or ``disk``
+                  to share them between test runs. Fresh responses are returned without a request,
+                  stale ones are revalidated. Responses have a ``from_cache`` attribute and the log
+                  tells whether they come from the cache. Responses to requests with an ``Authorization``
+                  header are stored only when marked ``public``, ``s-maxage`` or ``must-revalidate``,
+                  the ones to requests with cookies only when marked ``public``.
+                  By default nothing is cached.
+
+        ``cache_max_bytes`` Size of the cached bodies beyond which the least recently used responses are evicted,
+                            64 MiB by default.
+
+        ``cache_dir`` Directory of the ``disk`` cache, by default ``robotframework-requests-cache-<uid>``
+                      in the temporary directory. It is shared by the sessions and runs using it,
+                      ``private`` responses are not stored there.
+
+        ``retry_budget`` Limits the retries to this ratio of the requests, e.g. ``0.1`` or ``10%``, to avoid
+                         retry storms multiplying the load of a failing server. The ratio applies to the requests
+                         of the last 10 seconds and 10 retries are always allowed. Requests that would exceed
+                         the budget fail like when ``max_retries`` is exhausted. By default retries are not limited.
+                         The retries are counted by request and by endpoint, see `Get Session Statistics`.
+
+        ``circuit_breaker`` Number of consecutive failures of a host after which its requests fail fast with
+                            ``CircuitOpenError``, without connecting nor retrying, for ``circuit_breaker_cooldown``
+                            seconds. A failure is a request without a response after all its ``max_retries``
+                            or with a ``5xx`` response. After the cooldown a single probe request is sent: its success
+                            closes the circuit, its failure opens it again. By default there is no circuit breaker.
+
+        ``circuit_breaker_cooldown`` Seconds during which an open circuit fails fast the requests, 30 by default.
+
+        ``hedge_after`` Seconds after which an idempotent request still without a response is sent again,
+                        on another connection, the first response is returned and the other request is cancelled.
+                        Duplicate requests are limited to 5% of the requests of the last 10 seconds, 10 are
+                        always allowed. By default requests are not hedged, see `Get Session Statistics`.
         """
         auth = requests.auth.HTTPBasicAuth(*auth) if auth else None
 
@@ -297,6 +490,17 @@ class SessionKeywords(RequestsKeywords):
             disable_warnings=disable_warnings,
             retry_status_list=retry_status_list,
             retry_method_list=retry_method_list,
+            max_response_bytes=max_response_bytes,
+            spill_threshold=spill_threshold,
+            compress_request=compress_request,
+            expect_continue=expect_continue,
+            cache=cache,
+            cache_max_bytes=cache_max_bytes,
+            cache_dir=cache_dir,
+            retry_budget=retry_budget,
+            circuit_breaker=circuit_breaker,
+            circuit_breaker_cooldown=circuit_breaker_cooldown,
+            hedge_after=hedge_after,
         )
 
         session.cert = tuple(client_certs)
@@ -319,6 +523,17 @@ class SessionKeywords(RequestsKeywords):
         disable_warnings=0,
         retry_status_list=[],
         retry_method_list=DEFAULT_RETRY_METHOD_LIST,
+        max_response_bytes=None,
+        spill_threshold=None,
+        compress_request=None,
+        expect_continue=None,
+        cache=None,
+        cache_max_bytes=None,
+        cache_dir=None,
+        retry_budget=None,
+        circuit_breaker=None,
+        circuit_breaker_cooldown=None,
+        hedge_after=None,
     ):
         """Create Session: create a HTTP session to a server
 
@@ -364,6 +579,61 @@ class SessionKeywords(RequestsKeywords):
         ``retry_status_list`` List of integer HTTP status codes that, if returned, a retry is attempted.
                               eg. set to [502, 503] to retry requests if those status are returned.
                               Note that max_retries must be greater than 0.
+
+        ``max_response_bytes`` Maximum size in bytes of the response bodies, by default there is no limit.
+                               The body is read in chunks and the connection is closed as soon as the limit
+                               is exceeded, failing the request. It can be overridden per request.
+
+        ``spill_threshold`` Size in bytes above which response bodies are written to a temporary file
+                            instead of being kept in memory, by default bodies are always kept in memory.
+                            The body of spilled responses is accessed through a memory mapped view of the file,
+                            see `Response Body Should Contain`. It can be overridden per request.
+
+        ``compress_request`` Compresses the request bodies with ``gzip``, ``deflate`` or ``zstd``
+                             (requires the ``zstandard`` module) and sets their ``Content-Encoding``,
+                             by default bodies are not compressed. File descriptors are compressed
+                             while they are sent. It can be overridden per request.
+
+        ``expect_continue`` Sends request bodies of at least this number of bytes, and chunked bodies,
+                            with ``Expect: 100-continue``: the body is sent only once the server accepts it,
+                            a server rejecting the request early (e.g. 401 or 413) never receives it.
+                            ``0`` applies it to every request with a body, by default it is disabled.
+                            Single requests can also set the ``Expect: 100-continue`` header themselves.
+
+        ``cache`` Caches the ``GET`` responses following their ``Cache-Control``, ``Expires``, ``ETag``,
+                  ``Last-Modified`` and ``Vary`` headers: ``memory`` for the session only or ``disk``
+                  to share them between test runs. Fresh responses are returned without a request,
+                  stale ones are revalidated. Responses have a ``from_cache`` attribute and the log
+                  tells whether they come from the cache. Responses to requests with an ``Authorization``
+                  header are stored only when marked ``public``, ``s-maxage`` or ``must-revalidate``,
+                  the ones to requests with cookies only when marked ``public``.
+                  By default nothing is cached.
+
+        ``cache_max_bytes`` Size of the cached bodies beyond which the least recently used responses are evicted,
+                            64 MiB by default.
+
+        ``cache_dir`` Directory of the ``disk`` cache, by default ``robotframework-requests-cache-<uid>``
+                      in the temporary directory. It is shared by the sessions and runs using it,
+                      ``private`` responses are not stored there.
+
+        ``retry_budget`` Limits the retries to this ratio of the requests, e.g. ``0.1`` or ``10%``, to avoid
+                         retry storms multiplying the load of a failing server. The ratio applies to the requests
+                         of the last 10 seconds and 10 retries are always allowed. Requests that would exceed
+                         the budget fail like when ``max_retries`` is exhausted. By default retries are not limited.
+                         The retries are counted by request and by endpoint, see `Get Session Statistics`.
+
+        ``circuit_breaker`` Number of consecutive failures of a host after which its requests fail fast with
+                            ``CircuitOpenError``, without connecting nor retrying, for ``circuit_breaker_cooldown``
+                            seconds. A failure is a request without a response after all its ``max_retries``
+                            or with a ``5xx`` response. After the cooldown a single probe request is sent: its success
+                            closes the circuit, its failure opens it again. By default there is no circuit breaker.
+
+        ``circuit_breaker_cooldown`` Seconds during which an open circuit fails fast the requests, 30 by default.
+
+        ``hedge_after`` Seconds after which an idempotent request still without a response is sent again,
+                        on another connection, the first response is returned and the other request is cancelled.
+                        Duplicate requests are limited to 5% of the requests of the last 10 seconds, 10 are
+                        always allowed. By default requests are not hedged, see `Get Session Statistics`.
         """
 
         logger.info(
@@ -388,6 +658,17 @@ class SessionKeywords(RequestsKeywords):
             disable_warnings=disable_warnings,
             retry_status_list=retry_status_list,
             retry_method_list=retry_method_list,
+            max_response_bytes=max_response_bytes,
+            spill_threshold=spill_threshold,
+            compress_request=compress_request,
+            expect_continue=expect_continue,
+            cache=cache,
+            cache_max_bytes=cache_max_bytes,
+            cache_dir=cache_dir,
+            retry_budget=retry_budget,
+            circuit_breaker=circuit_breaker,
+            circuit_breaker_cooldown=circuit_breaker_cooldown,
+            hedge_after=hedge_after,
         )
 
     @keyword("Create Digest Session")
@@ -407,6 +688,17 @@ class SessionKeywords(RequestsKeywords):
         disable_warnings=0,
         retry_status_list=[],
         retry_method_list=DEFAULT_RETRY_METHOD_LIST,
+        max_response_bytes=None,
+        spill_threshold=None,
+        compress_request=None,
+        expect_continue=None,
+        cache=None,
+        cache_max_bytes=None,
+        cache_dir=None,
+        retry_budget=None,
+        circuit_breaker=None,
+        circuit_breaker_cooldown=None,
+        hedge_after=None,
     ):
         """Create Session: create a HTTP session to a server
 
@@ -451,8 +743,63 @@ class SessionKeywords(RequestsKeywords):
         ``retry_status_list`` List of integer HTTP status codes that, if returned, a retry is attempted.
                               eg. set to [502, 503] to retry requests if those status are returned.
                               Note that max_retries must be greater than 0.
+
+        ``max_response_bytes`` Maximum size in bytes of the response bodies, by default there is no limit.
+                               The body is read in chunks and the connection is closed as soon as the limit
+                               is exceeded, failing the request. It can be overridden per request.
+
+        ``spill_threshold`` Size in bytes above which response bodies are written to a temporary file
+                            instead of being kept in memory, by default bodies are always kept in memory.
+                            The body of spilled responses is accessed through a memory mapped view of the file,
+                            see `Response Body Should Contain`. It can be overridden per request.
+
+        ``compress_request`` Compresses the request bodies with ``gzip``, ``deflate`` or ``zstd``
+                             (requires the ``zstandard`` module) and sets their ``Content-Encoding``,
+                             by default bodies are not compressed. File descriptors are compressed
+                             while they are sent. It can be overridden per request.
+
+        ``expect_continue`` Sends request bodies of at least this number of bytes, and chunked bodies,
+                            with ``Expect: 100-continue``: the body is sent only once the server accepts it,
+                            a server rejecting the request early (e.g. 401 or 413) never receives it.
+                            ``0`` applies it to every request with a body, by default it is disabled.
+                            Single requests can also set the ``Expect: 100-continue`` header themselves.
+
+        ``cache`` Caches the ``GET`` responses following their ``Cache-Control``, ``Expires``, ``ETag``,
+                  ``Last-Modified`` and ``Vary`` headers: ``memory`` for the session only or ``disk``
+                  to share them between test runs. Fresh responses are returned without a request,
+                  stale ones are revalidated. Responses have a ``from_cache`` attribute and the log
+                  tells whether they come from the cache. Responses to requests with an ``Authorization``
+                  header are stored only when marked ``public``, ``s-maxage`` or ``must-revalidate``,
+                  the ones to requests with cookies only when marked ``public``.
+                  By default nothing is cached.
+
+        ``cache_max_bytes`` Size of the cached bodies beyond which the least recently used responses are evicted,
+                            64 MiB by default.
+
+        ``cache_dir`` Directory of the ``disk`` cache, by default ``robotframework-requests-cache-<uid>``
+                      in the temporary directory. It is shared by the sessions and runs using it,
+                      ``private`` responses are not stored there.
+
+        ``retry_budget`` Limits the retries to this ratio of the requests, e.g. ``0.1`` or ``10%``, to avoid
+                         retry storms multiplying the load of a failing server. The ratio applies to the requests
+                         of the last 10 seconds and 10 retries are always allowed. Requests that would exceed
+                         the budget fail like when ``max_retries`` is exhausted. By default retries are not limited.
+                         The retries are counted by request and by endpoint, see `Get Session Statistics`.
+
+        ``circuit_breaker`` Number of consecutive failures of a host after which its requests fail fast with
+                            ``CircuitOpenError``, without connecting nor retrying, for ``circuit_breaker_cooldown``
+                            seconds. A failure is a request without a response after all its ``max_retries``
+                            or with a ``5xx`` response. After the cooldown a single probe request is sent: its success
+                            closes the circuit, its failure opens it again. By default there is no circuit breaker.
+
+        ``circuit_breaker_cooldown`` Seconds during which an open circuit fails fast the requests, 30 by default.
+
+        ``hedge_after`` Seconds after which an idempotent request still without a response is sent again,
+                        on another connection, the first response is returned and the other request is cancelled.
+                        Duplicate requests are limited to 5% of the requests of the last 10 seconds, 10 are
+                        always allowed. By default requests are not hedged, see `Get Session Statistics`.
         """
-        digest_auth = requests.auth.HTTPDigestAuth(*auth) if auth else None
+        digest_auth = HandshakeAuth(SharedDigestAuth(*auth)) if auth else None
 
         return self._create_session(
             alias=alias,
@@ -469,6 +816,17 @@ class SessionKeywords(RequestsKeywords):
             disable_warnings=disable_warnings,
             retry_status_list=retry_status_list,
             retry_method_list=retry_method_list,
+            max_response_bytes=max_response_bytes,
+            spill_threshold=spill_threshold,
+            compress_request=compress_request,
+            expect_continue=expect_continue,
+            cache=cache,
+            cache_max_bytes=cache_max_bytes,
+            cache_dir=cache_dir,
+            retry_budget=retry_budget,
+            circuit_breaker=circuit_breaker,
+            circuit_breaker_cooldown=circuit_breaker_cooldown,
+            hedge_after=hedge_after,
         )
 
     @keyword("Create Ntlm Session")
@@ -488,6 +846,17 @@ class SessionKeywords(RequestsKeywords):
         disable_warnings=0,
         retry_status_list=[],
         retry_method_list=DEFAULT_RETRY_METHOD_LIST,
+        max_response_bytes=None,
+        spill_threshold=None,
+        compress_request=None,
+        expect_continue=None,
+        cache=None,
+        cache_max_bytes=None,
+        cache_dir=None,
+        retry_budget=None,
+        circuit_breaker=None,
+        circuit_breaker_cooldown=None,
+        hedge_after=None,
     ):
         """Create Session: create a HTTP session to a server
 
@@ -532,6 +901,61 @@ class SessionKeywords(RequestsKeywords):
         ``retry_status_list`` List of integer HTTP status codes that, if returned, a retry is attempted.
                               eg. set to [502, 503] to retry requests if those status are returned.
                               Note that max_retries must be greater than 0.
+
+        ``max_response_bytes`` Maximum size in bytes of the response bodies, by default there is no limit.
+                               The body is read in chunks and the connection is closed as soon as the limit
+                               is exceeded, failing the request. It can be overridden per request.
+
+        ``spill_threshold`` Size in bytes above which response bodies are written to a temporary file
+                            instead of being kept in memory, by default bodies are always kept in memory.
+                            The body of spilled responses is accessed through a memory mapped view of the file,
+                            see `Response Body Should Contain`. It can be overridden per request.
+
+        ``compress_request`` Compresses the request bodies with ``gzip``, ``deflate`` or ``zstd``
+                             (requires the ``zstandard`` module) and sets their ``Content-Encoding``,
+                             by default bodies are not compressed. File descriptors are compressed
+                             while they are sent. It can be overridden per request.
+
+        ``expect_continue`` Sends request bodies of at least this number of bytes, and chunked bodies,
+                            with ``Expect: 100-continue``: the body is sent only once the server accepts it,
+                            a server rejecting the request early (e.g. 401 or 413) never receives it.
+                            ``0`` applies it to every request with a body, by default it is disabled.
+                            Single requests can also set the ``Expect: 100-continue`` header themselves.
+
+        ``cache`` Caches the ``GET`` responses following their ``Cache-Control``, ``Expires``, ``ETag``,
+                  ``Last-Modified`` and ``Vary`` headers: ``memory`` for the session only or ``disk``
+                  to share them between test runs. Fresh responses are returned without a request,
+                  stale ones are revalidated. Responses have a ``from_cache`` attribute and the log
+                  tells whether they come from the cache. Responses to requests with an ``Authorization``
+                  header are stored only when marked ``public``, ``s-maxage`` or ``must-revalidate``,
+                  the ones to requests with cookies only when marked ``public``.
+                  By default nothing is cached.
+
+        ``cache_max_bytes`` Size of the cached bodies beyond which the least recently used responses are evicted,
+                            64 MiB by default.
+
+        ``cache_dir`` Directory of the ``disk`` cache, by default ``robotframework-requests-cache-<uid>``
+                      in the temporary directory. It is shared by the sessions and runs using it,
+                      ``private`` responses are not stored there.
+
+        ``retry_budget`` Limits the retries to this ratio of the requests, e.g. ``0.1`` or ``10%``, to avoid
+                         retry storms multiplying the load of a failing server. The ratio applies to the requests
+                         of the last 10 seconds and 10 retries are always allowed. Requests that would exceed
+                         the budget fail like when ``max_retries`` is exhausted. By default retries are not limited.
+                         The retries are counted by request and by endpoint, see `Get Session Statistics`.
+
+        ``circuit_breaker`` Number of consecutive failures of a host after which its requests fail fast with
+                            ``CircuitOpenError``, without connecting nor retrying, for ``circuit_breaker_cooldown``
+                            seconds. A failure is a request without a response after all its ``max_retries``
+                            or with a ``5xx`` response. After the cooldown a single probe request is sent: its success
+                            closes the circuit, its failure opens it again. By default there is no circuit breaker.
+
+        ``circuit_breaker_cooldown`` Seconds during which an open circuit fails fast the requests, 30 by default.
+
+        ``hedge_after`` Seconds after which an idempotent request still without a response is sent again,
+                        on another connection, the first response is returned and the other request is cancelled.
+                        Duplicate requests are limited to 5% of the requests of the last 10 seconds, 10 are
+                        always allowed. By default requests are not hedged, see `Get Session Statistics`.
         """
         try:
             HttpNtlmAuth
@@ -543,7 +967,7 @@ class SessionKeywords(RequestsKeywords):
                 " - expected 3, got {}".format(len(auth))
             )
         else:
-            ntlm_auth = HttpNtlmAuth("{}\\{}".format(auth[0], auth[1]), auth[2])
+            ntlm_auth = HandshakeAuth(HttpNtlmAuth("{}\\{}".format(auth[0], auth[1]), auth[2]))
             logger.info(
                 "Creating NTLM Session using : alias=%s, url=%s, \
                         headers=%s, cookies=%s, ntlm_auth=%s, timeout=%s, \
@@ -576,8 +1000,220 @@ class SessionKeywords(RequestsKeywords):
                 disable_warnings=disable_warnings,
                 retry_status_list=retry_status_list,
                 retry_method_list=retry_method_list,
+                max_response_bytes=max_response_bytes,
+                spill_threshold=spill_threshold,
+                compress_request=compress_request,
+                expect_continue=expect_continue,
+                cache=cache,
+                cache_max_bytes=cache_max_bytes,
+                cache_dir=cache_dir,
+                retry_budget=retry_budget,
+                circuit_breaker=circuit_breaker,
+                circuit_breaker_cooldown=circuit_breaker_cooldown,
+                hedge_after=hedge_after,
             )
 
+    @keyword("Create OAuth2 Session")
+    def create_oauth2_session(
+        self,
+        alias,
+        url,
+        token_url,
+        client_id,
+        client_secret,
+        scope=None,
+        token_params=None,
+        client_auth="basic",
+        token_cache_dir=None,
+        headers={},
+        cookies={},
+        timeout=None,
+        proxies=None,
+        verify=False,
+        debug=0,
+        max_retries=3,
+        backoff_factor=0.10,
+        disable_warnings=0,
+        retry_status_list=[],
+        retry_method_list=DEFAULT_RETRY_METHOD_LIST,
+        max_response_bytes=None,
+        spill_threshold=None,
+        compress_request=None,
+        expect_continue=None,
+        cache=None,
+        cache_max_bytes=None,
+        cache_dir=None,
+        retry_budget=None,
+        circuit_breaker=None,
+        circuit_breaker_cooldown=None,
+        hedge_after=None,
+    ):
+        """Create OAuth2 Session: create a HTTP session to a server authenticated
+        with the OAuth 2.0 client credentials grant
+
+        The access token is fetched from the token endpoint with the first request and sent
+        as a ``Bearer`` token in the ``Authorization`` header. It is cached until shortly before
+        it expires, according to its ``expires_in``, and then refreshed transparently.
+        The token is shared by all the sessions with the same ``token_url``, ``client_id``,
+        ``scope``, ``token_params`` and ``client_auth``, so suites creating their own session do not log in again.
+        A request rejected with ``401`` is sent again once with a new token.
+
+        ``url`` Base url of the server
+
+        ``alias`` Robot Framework alias to identify the session
+
+        ``headers`` Dictionary of default headers
+
+        ``cookies`` Dictionary of cookies
+
+        ``token_url`` Url of the token endpoint
+
+        ``client_id`` Client identifier
+
+        ``client_secret`` Client secret
+
+        ``scope`` Scope of the access token, as a space separated string or a list
+
+        ``token_params`` Dictionary of additional parameters of the token request, e.g. ``audience``
+
+        ``client_auth`` How the client credentials are sent to the token endpoint: ``basic``,
+                        the default, in the ``Authorization`` header or ``body`` in the request body
+
+        ``token_cache_dir`` Directory where the tokens are also saved, to share them between the
+                            processes of a parallel run like pabot workers: the first process fetches
+                            the token while the others wait for it, holding a lock on the file.
+                            By default tokens are shared by the sessions of the process only.
+
+        ``timeout`` Connection timeout
+
+        ``proxies`` Dictionary mapping protocol or protocol and host to the URL of the proxy
+                (e.g. {'http': 'foo.bar:3128', 'http://host.name': 'foo.bar:4012'})
+
+        ``verify`` Whether the SSL cert will be verified. A CA_BUNDLE path can also be provided.
+                 Defaults to False.
+
+        ``debug`` Enable http verbosity option more information. Valid values are 0, 1, 2 ...
+                https://docs.python.org/2/library/httplib.html#httplib.HTTPConnection.set_debuglevel
+
+        ``max_retries`` Number of maximum retries each connection should attempt.
+                        By default it will retry 3 times in case of connection errors only.
+                        A 0 value will disable any kind of retries regardless of other retry settings.
+                        In case the number of retries is reached a retry exception is raised.
+
+        ``disable_warnings`` Disable requests warning useful when you have large number of testcases
+
+        ``backoff_factor`` Introduces a delay time between retries that is longer after each retry.
+                           eg. if backoff_factor is set to 0.1
+                           the sleep between attemps will be: 0.0, 0.2, 0.4
+                           More info here: https://urllib3.readthedocs.io/en/latest/reference/urllib3.util.html
+
+        ``retry_method_list`` List of uppercased HTTP method verbs where retries are allowed.
+                              By default retries are allowed only on HTTP requests methods that are considered to be
+                              idempotent (multiple requests with the same parameters end with the same state).
+                              eg. set to ['POST', 'GET'] to retry only those kind of requests.
+
+        ``retry_status_list`` List of integer HTTP status codes that, if returned, a retry is attempted.
+                              eg. set to [502, 503] to retry requests if those status are returned.
+                              Note that max_retries must be greater than 0.
+
+        ``max_response_bytes`` Maximum size in bytes of the response bodies, by default there is no limit.
+                               The body is read in chunks and the connection is closed as soon as the limit
+                               is exceeded, failing the request. It can be overridden per request.
+
+        ``spill_threshold`` Size in bytes above which response bodies are written to a temporary file
+                            instead of being kept in memory, by default bodies are always kept in memory.
+                            The body of spilled responses is accessed through a memory mapped view of the file,
+                            see `Response Body Should Contain`. It can be overridden per request.
+
+        ``compress_request`` Compresses the request bodies with ``gzip``, ``deflate`` or ``zstd``
+                             (requires the ``zstandard`` module) and sets their ``Content-Encoding``,
+                             by default bodies are not compressed. File descriptors are compressed
+                             while they are sent. It can be overridden per request.
+
+        ``expect_continue`` Sends request bodies of at least this number of bytes, and chunked bodies,
+                            with ``Expect: 100-continue``: the body is sent only once the server accepts it,
+                            a server rejecting the request early (e.g. 401 or 413) never receives it.
+                            ``0`` applies it to every request with a body, by default it is disabled.
+                            Single requests can also set the ``Expect: 100-continue`` header themselves.
+
+        ``cache`` Caches the ``GET`` responses following their ``Cache-Control``, ``Expires``, ``ETag``,
+                  ``Last-Modified`` and ``Vary`` headers: ``memory`` for the session only or ``disk``
+                  to share them between test runs. Fresh responses are returned without a request,
+                  stale ones are revalidated. Responses have a ``from_cache`` attribute and the log
+                  tells whether they come from the cache. Responses to requests with an ``Authorization``
+                  header are stored only when marked ``public``, ``s-maxage`` or ``must-revalidate``,
+                  the ones to requests with cookies only when marked ``public``.
+                  By default nothing is cached.
+
+        ``cache_max_bytes`` Size of the cached bodies beyond which the least recently used responses are evicted,
+                            64 MiB by default.
+
+        ``cache_dir`` Directory of the ``disk`` cache, by default ``robotframework-requests-cache-<uid>``
+                      in the temporary directory. It is shared by the sessions and runs using it,
+                      ``private`` responses are not stored there.
+
+        ``retry_budget`` Limits the retries to this ratio of the requests, e.g. ``0.1`` or ``10%``, to avoid
+                         retry storms multiplying the load of a failing server. The ratio applies to the requests
+                         of the last 10 seconds and 10 retries are always allowed. Requests that would exceed
+                         the budget fail like when ``max_retries`` is exhausted. By default retries are not limited.
+                         The retries are counted by request and by endpoint, see `Get Session Statistics`.
+
+        ``circuit_breaker`` Number of consecutive failures of a host after which its requests fail fast with
+                            ``CircuitOpenError``, without connecting nor retrying, for ``circuit_breaker_cooldown``
+                            seconds. A failure is a request without a response after all its ``max_retries``
+                            or with a ``5xx`` response. After the cooldown a single probe request is sent: its success
+                            closes the circuit, its failure opens it again. By default there is no circuit breaker.
+
+        ``circuit_breaker_cooldown`` Seconds during which an open circuit fails fast the requests, 30 by default.
+
+        ``hedge_after`` Seconds after which an idempotent request still without a response is sent again,
+                        on another connection, the first response is returned and the other request is cancelled.
+                        Duplicate requests are limited to 5% of the requests of the last 10 seconds, 10 are
+                        always allowed. By default requests are not hedged, see `Get Session Statistics`.
+        """
+        oauth2_auth = OAuth2ClientCredentials(
+            token_url,
+            client_id,
+            client_secret,
+            scope=scope,
+            token_params=token_params,
+            client_auth=client_auth,
+            cache_dir=token_cache_dir,
+        )
+
+        session = self._create_session(
+            alias=alias,
+            url=url,
+            headers=headers,
+            cookies=cookies,
+            auth=oauth2_auth,
+            timeout=timeout,
+            max_retries=max_retries,
+            backoff_factor=backoff_factor,
+            proxies=proxies,
+            verify=verify,
+            debug=debug,
+            disable_warnings=disable_warnings,
+            retry_status_list=retry_status_list,
+            retry_method_list=retry_method_list,
+            max_response_bytes=max_response_bytes,
+            spill_threshold=spill_threshold,
+            compress_request=compress_request,
+            expect_continue=expect_continue,
+            cache=cache,
+            cache_max_bytes=cache_max_bytes,
+            cache_dir=cache_dir,
+            retry_budget=retry_budget,
+            circuit_breaker=circuit_breaker,
+            circuit_breaker_cooldown=circuit_breaker_cooldown,
+            hedge_after=hedge_after,
+        )
+        # the token requests use the same settings as the session
+        oauth2_auth.verify = session.verify
+        oauth2_auth.proxies = session.proxies
+        oauth2_auth.timeout = self._get_timeout(timeout)
+        return session
+
     @keyword("Session Exists")
     def session_exists(self, alias):
         """Return True if the session has been already created
@@ -609,11 +1245,97 @@ class SessionKeywords(RequestsKeywords):
         session.headers = merge_setting(headers, session.headers)
         session.cookies = merge_cookies(session.cookies, cookies)
 
-    @staticmethod
-    def _check_status(expected_status, resp, msg=None):
+    @keyword("Get Session Statistics")
+    def get_session_statistics(self, alias):
+        """Returns the connection statistics of the session as a dictionary.
+
+        Session will be identified using the ``alias`` name.
+        ``connections`` is the number of connections opened by the session and ``requests``
+        the number of requests sent on them, including redirects, retries and the extra
+        requests of authentication handshakes. ``auth_handshakes`` is the number of ``401``
+        challenges answered by the digest or NTLM authentication of the session.
+
+        ``retries`` holds the retries of the session requests: the number of ``requests`` sent,
+        of ``retried_requests`` and of ``recovered_requests`` that succeeded after being retried,
+        the number of ``retries``, the ``sleep_seconds`` spent waiting between them, following
+        ``backoff_factor`` or ``Retry-After`` headers, and ``budget_exhausted``, the retries refused
+        by the ``retry_budget``. ``endpoints`` has the ``retries`` and ``sleep_seconds`` by method and path.
+
+        With a ``circuit_breaker``, ``circuit_breaker`` has by host the ``state`` of its circuit,
+        ``closed``, ``open`` or ``half-open``, its consecutive ``failures``, the number of times
+        it was ``opened`` and the number of requests ``rejected`` while it was open.
+
+        With ``hedge_after``, ``hedging`` has the number of ``requests`` that could be hedged,
+        of ``hedged`` requests sent twice, of ``hedge_wins`` answered first by the second request,
+        of duplicates refused by the budget, ``budget_exhausted``, and the ``hedge_rate`` of the requests.
+
+        | ${stats}= | `Get Session Statistics` | ntlm |
+        | Should Be True | ${stats}[auth_handshakes] <= ${stats}[connections] |
+        """
+        session = self._cache.switch(alias)
+        stats = {"connections": 0, "requests": 0}
+        adapters = []
+        for adapter in session.adapters.values():
+            if isinstance(adapter, LibraryHTTPAdapter) and adapter not in adapters:
+                adapters.append(adapter)
+                for name, value in adapter.statistics().items():
+                    stats[name] += value
+        stats["auth_handshakes"] = getattr(session.auth, "handshakes", 0)
+        retry_stats = getattr(session, "retry_stats", None)
+        if retry_stats is not None:
+            stats["retries"] = retry_stats.as_dict()
+        circuit_breaker = getattr(session, "circuit_breaker", None)
+        if circuit_breaker is not None:
+            stats["circuit_breaker"] = circuit_breaker.statistics()
+        hedger = getattr(session, "hedger", None)
+        if hedger is not None:
+            stats["hedging"] = hedger.statistics()
+        return stats
+
+    @keyword("Save Session State")
+    def save_session_state(self, alias, path):
+        """Saves the state of the session to the JSON file ``path``.
+
+        Session will be identified using the ``alias`` name.
+        The state holds the base url, the headers, including authentication headers like
+        ``Authorization``, the cookies, the basic authentication credentials, the default query
+        parameters, the proxies and the certificate verification. The file is readable by its owner only
+        and is replaced at once, so parallel workers never read a partial state.
+
+        Use it after a login flow, e.g. in a Suite Setup, to restore the logged in session
+        in later suites or parallel workers with `Restore Session State`.
+        """
+        session = self._cache.switch(alias)
+        save_state(path, session_state(session))
+        logger.info("Saved the state of session %s to %s" % (alias, os.path.abspath(path)))
+
+    @keyword("Restore Session State")
+    def restore_session_state(self, alias, path):
+        """Restores the session state saved by `Save Session State` in the JSON file ``path``.
+
+        Session will be identified using the ``alias`` name, when it does not exist it is created
+        with the saved base url. The saved headers are merged into the session ones and the
+        cookies not expired yet are added to its cookies. Returns the session.
+
+        | `Restore Session State` | sso | ${OUTPUT DIR}/sso-state.json |
+        | ${resp}= | `GET On Session` | sso | /profile |
+        """
+        state = load_state(path)
+        if not self.session_exists(alias):
+            self.create_session(alias, state.get("url"))
+        session = apply_session_state(self._cache.switch(alias), state)
+        logger.info("Restored the state of session %s from %s" % (alias, os.path.abspath(path)))
+        return session
+
+    def _check_status(self, expected_status, resp, msg=None):
         """
         Helper method to check HTTP status
         """
+        with self._profiler.measure("check_status"):
+            self._assert_status(expected_status, resp, msg)
+
+    @staticmethod
+    def _assert_status(expected_status, resp, msg=None):
         if not isinstance(resp, Response):
             raise InvalidResponse(resp)
         if expected_status is None:
@@ -1,4 +1,7 @@
 from .RequestsOnSessionKeywords import RequestsOnSessionKeywords
+from .cassette import create_cassette
+from .responses import parse_response_retention
+from .utils import set_json_backend
 from .version import VERSION
 
 """
@@ -86,7 +89,7 @@ class RequestsLibrary(RequestsOnSessionKeywords):
        | encoding | Encoding to decode with when accessing ``response.text.`` |
        | headers | Case-insensitive Dictionary of Response Headers. For example, ``headers['content-encoding']`` will return the value of a `Content-Encoding' response header. |
        | history | A list of Response objects from the history of the Request. Any redirect responses will end up here. The list is sorted from the oldest to the most recent request. |
-       | json    | Returns the json-encoded content of a response, if any. Parameters:	``**kwargs`` - Optional arguments that json.loads takes. Raises:	ValueError ? If the response body does not contain valid json. |
+       | json    | Returns the json-encoded content of a response, if any. Parameters:	``**kwargs`` - Optional arguments that json.loads takes. Raises:	ValueError ? If the response body does not contain valid json. The body is parsed only once, following calls without arguments return the same object. |
        | ok      | Returns True if status_code is less than 400, False if not. |
        | reason  | Textual reason of responded HTTP Status, e.g. ``Not Found`` or ``OK``. |
        | status_code | Integer Code of responded HTTP Status, e.g. 404 or 200. |
@@ -128,3 +131,63 @@ class RequestsLibrary(RequestsOnSessionKeywords):
 
     __version__ = VERSION
     ROBOT_LIBRARY_SCOPE = "GLOBAL"
+
+    def __init__(
+        self,
+        profile=False,
+        profile_dir=None,
+        json_backend=None,
+        response_retention="full",
+        cassette_mode=None,
+        cassette_dir=None,
+        cassette_match=None,
+    ):
+        """
+        ``profile`` Enables the library profiling since the import, see `Start Library Profiling`.
+                    Collected stats can be logged and returned with `Stop Library Profiling`.
+
+        ``profile_dir`` Directory where ``cProfile`` stats are dumped for each request when ``profile`` is enabled.
+
+        ``json_backend`` JSON implementation used to serialize ``json`` bodies and to parse JSON responses,
+                         valid values are ``json`` (the standard library module, used by default), ``orjson``
+                         or ``auto`` (``orjson`` if installed). When ``orjson`` is not installed the standard
+                         module is used. The setting is process wide.
+
+        ``response_retention`` What the library keeps of the last response, used by `Status Should Be`,
+                               `Request Should Be Successful` and `Last Response`. ``full`` (the default)
+                               keeps the whole response, ``headers-only`` replaces it with a snapshot
+                               without body and redirect history as soon as the response is received,
+                               the ``expected_status`` check of the request keywords still uses the full
+                               response, ``none`` keeps nothing. With long runs and large bodies ``headers-only``
+                               avoids holding the last body in memory until the next request.
+                               The responses returned to Robot variables are never modified.
+
+        ``cassette_mode`` ``record`` saves every request and its response in ``cassette_dir``,
+                          ``replay`` answers the requests with the recorded responses without using
+                          the network and fails the requests that were not recorded. ``passthrough``,
+                          the default, sends the requests as usual. Streamed responses, like the ones of
+                          `Download File On Session`, and spilled ones are not recorded. A replayed response
+                          is the one recorded, whatever the ``allow_redirects`` of the request, and transport
+                          options like ``timeout``, ``verify`` or ``proxies`` are ignored, while the response
+                          ``hooks`` of the request are run on it. Only the basic credentials of the session
+                          authentication are applied to replayed requests, OAuth2 sessions do not fetch tokens.
+
+        ``cassette_dir`` Directory of the recorded requests, ``cassettes`` in the current directory by default.
+
+        ``cassette_match`` Comma separated parts of the requests that must be equal to replay a recorded response:
+                           ``method``, ``url``, ``body`` (the default is all three) and ``header:<name>``
+                           for the value of a header. Streamed bodies, like file uploads, are not compared.
+
+        |   ***** Settings *****
+        |   Library               RequestsLibrary    profile=${True}    profile_dir=${OUTPUT_DIR}/profiles
+        |   Library               RequestsLibrary    json_backend=auto
+        |   Library               RequestsLibrary    response_retention=headers-only
+        |   Library               RequestsLibrary    cassette_mode=replay    cassette_dir=${CURDIR}/cassettes
+        """
+        super(RequestsLibrary, self).__init__()
+        self._response_retention = parse_response_retention(response_retention)
+        self._cassette = create_cassette(cassette_mode, cassette_dir, cassette_match)
+        if json_backend:
+            set_json_backend(json_backend)
+        if profile:
+            self._profiler.start(profile_dir)
@@ -0,0 +1,366 @@
+import contextlib
+import http.client
+import threading
+import time
+
+from requests import exceptions
+from requests.adapters import HTTPAdapter
+from urllib3 import connection, connectionpool
+from urllib3.exceptions import DecodeError
+from urllib3.util.connection import is_connection_dropped
+from urllib3.util.wait import wait_for_read
+
+from RequestsLibrary.cache import CACHE_HIT, CACHE_MISS
+from RequestsLibrary.compression import get_decompressor
+from RequestsLibrary.hedging import HedgeCancelled, track_connection
+from RequestsLibrary.streaming import CHUNK_SIZE
+
+
+class DecodingStream(object):
+    """
+    Raw response stream decoding a ``br`` or ``zstd`` body chunk by chunk while it is read.
+
+    Only the compressed chunk being decoded and its decoded output are in memory at once.
+    ``tell`` returns, like urllib3, the number of compressed bytes read so far,
+    every other attribute is the one of the wrapped urllib3 response.
+    """
+
+    def __init__(self, raw, encoding, decoder):
+        self._raw = raw
+        self.encoding = encoding
+        self._decoder = decoder
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __repr__(self):
+        return "<DecodingStream %s: %r>" % (self.encoding, self._raw)
+
+    def _decode(self, data):
+        try:
+            return self._decoder(data)
+        except Exception as error:
+            raise DecodeError(
+                "Received response with content-encoding: %s, but failed to decode it." % self.encoding,
+                error,
+            )
+
+    def read(self, amt=None, decode_content=True, **kwargs):
+        if amt is None:
+            return b"".join(self.stream(CHUNK_SIZE))
+        # compressed chunks can decode to nothing, read until some output or the end of the body
+        while True:
+            data = self._raw.read(amt, decode_content=False)
+            if not data:
+                return b""
+            decoded = self._decode(data)
+            if decoded:
+                return decoded
+
+    def stream(self, amt=CHUNK_SIZE, decode_content=True):
+        while True:
+            data = self.read(amt)
+            if not data:
+                break
+            yield data
+
+    def tell(self):
+        return self._raw.tell()
+
+
+EXPECT_CONTINUE_TIMEOUT = 1.0
+
+# states of a request sent with Expect: 100-continue
+_SENDING_HEADERS = "headers"
+_WAITING = "waiting"
+_CONTINUE = "continue"
+_REJECTED = "rejected"
+
+
+class _EarlyHTTPResponse(http.client.HTTPResponse):
+    """Final response received before the request body was sent, parsed from the already buffered ``early_fp``."""
+
+    def __init__(self, sock, *args, **kwargs):
+        early_fp = kwargs.pop("early_fp")
+        super(_EarlyHTTPResponse, self).__init__(sock, *args, **kwargs)
+        self.fp.close()
+        self.fp = early_fp
+
+
+def _read_status(fp):
+    """Returns the status code at the beginning of the ``fp`` buffer, without consuming it."""
+    parts = fp.peek(16).split(None, 2)
+    if len(parts) < 2 or not parts[1].isdigit():
+        return None
+    return int(parts[1])
+
+
+class _ExpectContinueMixin(object):
+    """
+    HTTP connection that sends the body of requests with an ``Expect: 100-continue`` header
+    only once the server answered with ``100 Continue``.
+
+    When the server sends its final response first, for example ``401`` or ``413``,
+    the body is not sent at all and the connection is not reused.
+    Servers that ignore the expectation get the body after ``EXPECT_CONTINUE_TIMEOUT`` seconds.
+    """
+
+    expect_continue_timeout = EXPECT_CONTINUE_TIMEOUT
+    _expect_continue = None
+    _early_fp = None
+
+    def putrequest(self, *args, **kwargs):
+        self._expect_continue = None
+        return super(_ExpectContinueMixin, self).putrequest(*args, **kwargs)
+
+    def putheader(self, header, *values):
+        name = header.decode("latin-1") if isinstance(header, bytes) else str(header)
+        if name.lower() == "expect" and any(str(value).lower() == "100-continue" for value in values):
+            self._expect_continue = _SENDING_HEADERS
+        return super(_ExpectContinueMixin, self).putheader(header, *values)
+
+    def send(self, data):
+        if self._expect_continue == _SENDING_HEADERS:
+            # the request line and the headers are always sent at once, before the body
+            super(_ExpectContinueMixin, self).send(data)
+            self._expect_continue = _WAITING
+            return
+        if self._expect_continue == _WAITING:
+            self._expect_continue = self._wait_for_continue()
+        if self._expect_continue == _REJECTED:
+            return
+        super(_ExpectContinueMixin, self).send(data)
+
+    def _wait_for_continue(self):
+        if not wait_for_read(self.sock, timeout=self.expect_continue_timeout):
+            return _CONTINUE
+        fp = self.sock.makefile("rb")
+        status = _read_status(fp)
+        if status is None or status >= 200:
+            self._early_fp = fp
+            return _REJECTED
+        # the interim response is skipped, nothing else is sent before the body
+        while fp.readline() not in (b"\r\n", b"\n", b""):
+            pass
+        fp.close()
+        return _CONTINUE
+
+    def getresponse(self, *args, **kwargs):
+        early_fp = self._early_fp
+        if early_fp is None:
+            return super(_ExpectContinueMixin, self).getresponse(*args, **kwargs)
+        self._early_fp = None
+        self.response_class = lambda sock, *args, **kwargs: _EarlyHTTPResponse(
+            sock, *args, early_fp=early_fp, **kwargs
+        )
+        try:
+            return super(_ExpectContinueMixin, self).getresponse(*args, **kwargs)
+        finally:
+            del self.response_class
+            # the server did not read the body, the socket stays open only for the response
+            self.close()
+
+
+# same names as the urllib3 classes, that appear in the connection error messages
+class HTTPConnection(_ExpectContinueMixin, connection.HTTPConnection):
+    pass
+
+
+class HTTPSConnection(_ExpectContinueMixin, connection.HTTPSConnection):
+    pass
+
+
+# connections released by the current thread while it pins them, by pool
+_pinned = threading.local()
+
+
+@contextlib.contextmanager
+def pinned_connections():
+    """
+    Keeps the connections released by the current thread for its own next requests,
+    instead of returning them to their pool where other threads could take them.
+
+    Connection based authentication handshakes, like NTLM, send all their legs on the
+    same connection. On exit the connections go back to their pool, before the others.
+    """
+    if getattr(_pinned, "connections", None) is not None:
+        yield
+        return
+    _pinned.connections = {}
+    try:
+        yield
+    finally:
+        connections, _pinned.connections = _pinned.connections, None
+        for pool, conn in connections.items():
+            pool._put_conn(conn)
+
+
+class _ConnectionAffinityMixin(object):
+    """Connection pool honouring ``pinned_connections`` and tracking the connections of hedged requests."""
+
+    def _get_conn(self, timeout=None):
+        connections = getattr(_pinned, "connections", None)
+        conn = connections.pop(self, None) if connections else None
+        if conn is None:
+            conn = super(_ConnectionAffinityMixin, self)._get_conn(timeout)
+        elif is_connection_dropped(conn):
+            conn.close()
+        if not track_connection(conn):
+            # urllib3 puts back an empty slot in the pool for the discarded connection
+            if conn is not None:
+                conn.close()
+            raise HedgeCancelled()
+        return conn
+
+    def _put_conn(self, conn):
+        connections = getattr(_pinned, "connections", None)
+        if conn is None or connections is None or self in connections or self.pool is None:
+            return super(_ConnectionAffinityMixin, self)._put_conn(conn)
+        connections[self] = conn
+
+
+class HTTPConnectionPool(_ConnectionAffinityMixin, connectionpool.HTTPConnectionPool):
+    ConnectionCls = HTTPConnection
+
+
+class HTTPSConnectionPool(_ConnectionAffinityMixin, connectionpool.HTTPSConnectionPool):
+    ConnectionCls = HTTPSConnection
+
+
+POOL_CLASSES_BY_SCHEME = {"http": HTTPConnectionPool, "https": HTTPSConnectionPool}
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+# errors of the requests that did not get a response from the server, even after their retries
+HOST_FAILURES = (exceptions.ConnectionError, exceptions.Timeout, exceptions.RetryError)
+
+
+class LibraryHTTPAdapter(HTTPAdapter):
+    """
+    Transport adapter mounted on the library sessions.
+
+    Bodies encoded with ``br`` or ``zstd`` are decoded with the installed codecs
+    when urllib3 itself is not able to decode them.
+
+    Requests with a body of at least ``expect_continue`` bytes, or with a chunked body,
+    are sent with ``Expect: 100-continue`` so that the server can reject them before the body is sent.
+
+    With an ``HTTPCache`` responses are answered from or stored in the cache, they have a
+    ``from_cache`` attribute and a ``cache_status`` of ``hit``, ``revalidated`` or ``miss``.
+
+    With a ``LibraryRetry`` as ``max_retries`` the requests and their retries are counted in its ``stats``,
+    responses received after retries have their number in ``retries`` and the time slept in ``retry_seconds``.
+
+    With a ``CircuitBreaker`` the requests to a host failing repeatedly are failed fast with ``CircuitOpenError``.
+
+    With a ``Hedger`` the slow idempotent requests are sent twice, the first response is returned.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["expect_continue", "cache", "circuit_breaker", "hedger"]
+
+    def __init__(self, expect_continue=None, cache=None, circuit_breaker=None, hedger=None, **kwargs):
+        self.expect_continue = expect_continue
+        self.cache = cache
+        self.circuit_breaker = circuit_breaker
+        self.hedger = hedger
+        super(LibraryHTTPAdapter, self).__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(LibraryHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = POOL_CLASSES_BY_SCHEME
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super(LibraryHTTPAdapter, self).proxy_manager_for(proxy, **proxy_kwargs)
+        # SOCKS proxies connect with their own pool classes
+        if not proxy.lower().startswith("socks"):
+            manager.pool_classes_by_scheme = POOL_CLASSES_BY_SCHEME
+        return manager
+
+    def send(self, request, **kwargs):
+        if self._expects_continue(request):
+            request.headers["Expect"] = "100-continue"
+        if self.cache is None:
+            return self._send(request, **kwargs)
+        return self._send_with_cache(request, **kwargs)
+
+    def _send(self, request, **kwargs):
+        breaker = self.circuit_breaker
+        host = breaker.before_request(request.url) if breaker is not None else None
+        stats = getattr(self.max_retries, "stats", None)
+        if stats is not None:
+            stats.record_request()
+        if breaker is None:
+            return self._send_hedged(request, **kwargs)
+        failed = None
+        try:
+            response = self._send_hedged(request, **kwargs)
+            failed = response.status_code >= 500
+            return response
+        except HOST_FAILURES:
+            failed = True
+            raise
+        finally:
+            breaker.after_request(host, failed)
+
+    def _send_hedged(self, request, **kwargs):
+        send = super(LibraryHTTPAdapter, self).send
+        if self.hedger is None:
+            return send(request, **kwargs)
+        return self.hedger.send(send, request, **kwargs)
+
+    def _send_with_cache(self, request, **kwargs):
+        cache = self.cache
+        if cache.bypasses(request):
+            response = self._send(request, **kwargs)
+            if request.method not in SAFE_METHODS and response.status_code < 400:
+                cache.invalidate(request)
+            return response
+
+        entry, fresh = cache.lookup(request)
+        if fresh:
+            return cache.build_response(request, entry, CACHE_HIT, self)
+        if entry is not None:
+            cache.add_validators(request, entry)
+        request_time = time.time()
+        response = self._send(request, **kwargs)
+        if entry is not None and response.status_code == 304:
+            return cache.revalidated(request, entry, response, request_time)
+        response.from_cache = False
+        response.cache_status = CACHE_MISS
+        if cache.is_cacheable(request, response):
+            cache.cache_response(request, response, request_time)
+        return response
+
+    def statistics(self):
+        """Returns the number of ``connections`` opened by the pools of the adapter and of ``requests`` sent on them."""
+        connections = requests = 0
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests += pool.num_requests
+        return {"connections": connections, "requests": requests}
+
+    def _expects_continue(self, request):
+        if self.expect_continue is None or request.body is None or "Expect" in request.headers:
+            return False
+        length = request.headers.get("Content-Length")
+        if length is None:
+            return "chunked" in request.headers.get("Transfer-Encoding", "").lower()
+        return int(length) >= self.expect_continue
+
+    def build_response(self, req, resp):
+        response = super(LibraryHTTPAdapter, self).build_response(req, resp)
+        retries = getattr(resp, "retries", None)
+        if retries is not None and retries.history:
+            response.retries = len(retries.history)
+            response.retry_seconds = getattr(retries, "slept", 0.0)
+            stats = getattr(retries, "stats", None)
+            if stats is not None and response.ok:
+                stats.record_recovered()
+        encoding = response.headers.get("Content-Encoding", "").strip().lower()
+        if encoding in ("br", "zstd") and encoding not in getattr(resp, "CONTENT_DECODERS", ()):
+            decoder = get_decompressor(encoding)
+            if decoder is not None:
+                response.raw = DecodingStream(resp, encoding, decoder)
+        return response
@@ -0,0 +1,91 @@
+import threading
+
+from requests.auth import AuthBase, HTTPDigestAuth
+
+from RequestsLibrary.adapters import pinned_connections
+
+
+def _shared_attribute(name):
+    return property(
+        lambda self: getattr(self._shared, name),
+        lambda self, value: setattr(self._shared, name, value),
+    )
+
+
+class _SharedChallenge(object):
+    def __init__(self):
+        self.last_nonce = ""
+        self.nonce_count = 0
+        self.chal = {}
+
+
+class _DigestState(threading.local):
+    """State of ``HTTPDigestAuth``: the request position and 401 calls per thread, the challenge shared by all."""
+
+    last_nonce = _shared_attribute("last_nonce")
+    nonce_count = _shared_attribute("nonce_count")
+    chal = _shared_attribute("chal")
+
+    def __init__(self, shared):
+        self._shared = shared
+
+
+class SharedDigestAuth(HTTPDigestAuth):
+    """
+    Digest authentication sharing the server challenge between the threads using the session.
+
+    The requests of every thread are authenticated upfront once any of them answered a challenge,
+    instead of each thread paying its own ``401`` round trip. The nonce count is incremented atomically.
+    """
+
+    def __init__(self, username, password):
+        super(SharedDigestAuth, self).__init__(username, password)
+        self._thread_local = _DigestState(_SharedChallenge())
+        self._lock = threading.RLock()
+
+    def init_per_thread_state(self):
+        if not hasattr(self._thread_local, "init"):
+            self._thread_local.init = True
+            self._thread_local.pos = None
+            self._thread_local.num_401_calls = None
+
+    def build_digest_header(self, method, url):
+        with self._lock:
+            return super(SharedDigestAuth, self).build_digest_header(method, url)
+
+
+class HandshakeAuth(AuthBase):
+    """
+    Wraps an authentication answering ``401`` challenges with more requests, like digest or NTLM,
+    to send all the legs of a handshake on the same pooled connection and count the handshakes.
+
+    NTLM authenticates the connection rather than the requests, once its handshake is done
+    the authenticated connection is the first one reused by the next request.
+    """
+
+    def __init__(self, auth):
+        self.auth = auth
+        self.handshakes = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        hooks = list(request.hooks["response"])
+        request = self.auth(request)
+        request.hooks["response"] = [
+            hook if hook in hooks else self._affine_hook(hook) for hook in request.hooks["response"]
+        ]
+        return request
+
+    def __repr__(self):
+        return "<HandshakeAuth %r>" % (self.auth,)
+
+    def _affine_hook(self, hook):
+        def affine_hook(response, **kwargs):
+            with pinned_connections():
+                result = hook(response, **kwargs)
+            if result is not response and response.status_code == 401:
+                with self._lock:
+                    self.handshakes += 1
+            return result
+
+        return affine_hook
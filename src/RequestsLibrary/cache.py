@@ -0,0 +1,445 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from email.utils import mktime_tz, parsedate_tz
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from robot.api import logger
+
+from RequestsLibrary.streaming import CHUNK_SIZE
+from RequestsLibrary.utils import decoded_body_headers
+
+CACHES = ("memory", "disk")
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# one directory per user, the entries of other users are neither trusted nor readable
+DEFAULT_CACHE_DIR = os.path.join(
+    tempfile.gettempdir(),
+    "robotframework-requests-cache" + ("-%s" % os.getuid() if hasattr(os, "getuid") else ""),
+)
+
+# statuses cacheable by default, RFC 7231 section 6.1
+CACHEABLE_STATUSES = (200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501)
+HEURISTIC_FRESHNESS = 0.1
+# directives allowing a shared cache to store the response of a request with Authorization, RFC 7234 section 3.2
+AUTHORIZED_CACHE_DIRECTIVES = ("public", "s-maxage", "must-revalidate")
+# headers of a 304 response that must not replace the stored ones
+NOT_UPDATED_HEADERS = ("content-length", "content-encoding", "transfer-encoding")
+
+CACHE_HIT = "hit"
+CACHE_REVALIDATED = "revalidated"
+CACHE_MISS = "miss"
+
+
+def parse_http_date(value):
+    """Returns an HTTP date header as seconds since the epoch, ``None`` when it is missing or invalid."""
+    parsed = parsedate_tz(value) if value else None
+    if parsed is None:
+        return None
+    return mktime_tz(parsed)
+
+
+def parse_cache_control(headers):
+    """Returns the ``Cache-Control`` directives as a dict, directives without a value map to ``None``."""
+    directives = {}
+    for directive in headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip().strip('"') or None
+    return directives
+
+
+def _seconds(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class CacheEntry(object):
+    """Stored response: status, reason, headers, decoded body and the request headers named by ``Vary``."""
+
+    def __init__(self, url, status, reason, headers, body, vary, response_time, request_time=None):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = CaseInsensitiveDict(headers)
+        self.body = body
+        self.vary = vary
+        self.response_time = response_time
+        self.request_time = response_time if request_time is None else request_time
+
+    @property
+    def size(self):
+        return len(self.body)
+
+    def to_dict(self):
+        return {
+            "url": self.url,
+            "status": self.status,
+            "reason": self.reason,
+            "headers": dict(self.headers),
+            "vary": self.vary,
+            "response_time": self.response_time,
+            "request_time": self.request_time,
+        }
+
+    @classmethod
+    def from_dict(cls, data, body):
+        return cls(body=body, **data)
+
+    def current_age(self, now):
+        """Age of the stored response, RFC 7234 section 4.2.3."""
+        date = parse_http_date(self.headers.get("Date")) or self.response_time
+        apparent_age = max(0, self.response_time - date)
+        response_delay = self.response_time - self.request_time
+        corrected_age = (_seconds(self.headers.get("Age")) or 0) + response_delay
+        return max(apparent_age, corrected_age) + now - self.response_time
+
+    def freshness_lifetime(self):
+        """Freshness lifetime in seconds, RFC 7234 section 4.2.1."""
+        directives = parse_cache_control(self.headers)
+        if "max-age" in directives:
+            return _seconds(directives["max-age"]) or 0
+        date = parse_http_date(self.headers.get("Date")) or self.response_time
+        if "Expires" in self.headers:
+            expires = parse_http_date(self.headers["Expires"])
+            return max(0, expires - date) if expires is not None else 0
+        last_modified = parse_http_date(self.headers.get("Last-Modified"))
+        if last_modified is not None:
+            return max(0, date - last_modified) * HEURISTIC_FRESHNESS
+        return 0
+
+    def matches(self, request):
+        """True when the request has the same values of the headers named by ``Vary``."""
+        return all(request.headers.get(name) == value for name, value in self.vary.items())
+
+    def update(self, response, request_time, response_time):
+        """Refreshes the stored headers with the ones of a ``304 Not Modified`` response."""
+        for name, value in response.headers.items():
+            if name.lower() not in NOT_UPDATED_HEADERS:
+                self.headers[name] = value
+        self.request_time = request_time
+        self.response_time = response_time
+
+
+class MemoryCacheStore(object):
+    """Entries kept in memory, the least recently used are evicted beyond ``max_bytes`` of bodies."""
+
+    shared = False
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self.size += entry.size
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+
+class DiskCacheStore(object):
+    """
+    Entries written to ``directory``, a JSON metadata file and a body file each,
+    so that they are shared by the test runs using the same directory.
+    The least recently used are evicted beyond ``max_bytes`` of bodies.
+    The directory and the files are readable by their owner only.
+    """
+
+    shared = True
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.directory = directory or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + suffix)
+
+    def __len__(self):
+        return len([name for name in os.listdir(self.directory) if name.endswith(".json")])
+
+    def get(self, key):
+        path = self._path(key, ".json")
+        try:
+            with open(path) as file:
+                data = json.load(file)
+            with open(self._path(key, ".body"), "rb") as file:
+                body = file.read()
+        except (IOError, OSError, ValueError):
+            return None
+        # the modification time orders the entries for eviction
+        os.utime(path, None)
+        return CacheEntry.from_dict(data, body)
+
+    def set(self, key, entry):
+        with self._lock:
+            self._write(self._path(key, ".body"), entry.body, "wb")
+            self._write(self._path(key, ".json"), json.dumps(entry.to_dict()), "w")
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(self._path(key, ""))
+
+    @staticmethod
+    def _write(path, data, mode):
+        # written aside and renamed, so concurrent readers never see a partial file
+        temporary = "%s.%s.%s.tmp" % (path, os.getpid(), threading.get_ident())
+        descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, mode) as file:
+            file.write(data)
+        os.replace(temporary, path)
+
+    @staticmethod
+    def _remove(base):
+        for suffix in (".json", ".body"):
+            if os.path.exists(base + suffix):
+                os.remove(base + suffix)
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                base = os.path.join(self.directory, name[: -len(".json")])
+                try:
+                    entries.append((os.path.getmtime(base + ".json"), os.path.getsize(base + ".body"), base))
+                except OSError:
+                    continue
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, base in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            self._remove(base)
+            size -= entry_size
+
+
+class CachingStream(object):
+    """
+    Raw response stream that keeps a copy of the decoded body while it is read
+    and stores it in the cache once complete. Bodies bigger than ``max_bytes`` are not kept.
+    """
+
+    def __init__(self, raw, on_complete, max_bytes):
+        self._raw = raw
+        self._on_complete = on_complete
+        self._max_bytes = max_bytes
+        self._chunks = []
+        self._size = 0
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def _keep(self, data):
+        if self._chunks is None or not data:
+            return
+        self._size += len(data)
+        if self._size > self._max_bytes:
+            self._chunks = None
+        else:
+            self._chunks.append(data)
+
+    def _complete(self):
+        if self._chunks is not None:
+            body = b"".join(self._chunks)
+            self._chunks = None
+            self._on_complete(body)
+
+    def read(self, amt=None, *args, **kwargs):
+        data = self._raw.read(amt, decode_content=True)
+        self._keep(data)
+        if not data or amt is None:
+            self._complete()
+        return data
+
+    def stream(self, amt=CHUNK_SIZE, decode_content=True):
+        for chunk in self._raw.stream(amt, decode_content=True):
+            self._keep(chunk)
+            yield chunk
+        self._complete()
+
+
+class HTTPCache(object):
+    """
+    Private HTTP cache following RFC 7234, used by the library adapter for ``GET`` requests.
+
+    Fresh stored responses are returned without contacting the server, stale ones are revalidated
+    with their ``ETag`` or ``Last-Modified`` validators. ``Cache-Control`` directives of requests and
+    responses and ``Vary`` are honoured. Successful unsafe requests invalidate the stored response.
+
+    Responses to requests with an ``Authorization`` header are only stored when they are explicitly
+    allowed to be shared, with ``public``, ``s-maxage`` or ``must-revalidate``, so that a response
+    fetched with credentials is never served to other credentials or without any. Responses to requests
+    with a ``Cookie`` header are only stored when ``public``. The ``disk`` store,
+    shared by the sessions and runs using its directory, does not store ``private`` responses either.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    @staticmethod
+    def _key(request):
+        return request.url
+
+    @staticmethod
+    def bypasses(request):
+        """True for the requests that are neither answered from nor stored in the cache."""
+        headers = request.headers
+        return (
+            request.method != "GET"
+            or "no-store" in parse_cache_control(headers)
+            or "Range" in headers
+            # conditional requests of the user are sent as they are
+            or "If-None-Match" in headers
+            or "If-Modified-Since" in headers
+        )
+
+    def lookup(self, request):
+        """
+        Returns the stored entry for ``request``, if any, and whether it can be used without revalidation.
+        """
+        entry = self.store.get(self._key(request))
+        if entry is None or not entry.matches(request):
+            return None, False
+        request_directives = parse_cache_control(request.headers)
+        response_directives = parse_cache_control(entry.headers)
+        age = entry.current_age(time.time())
+        fresh = (
+            entry.freshness_lifetime() > age
+            and "no-cache" not in response_directives
+            and "no-cache" not in request_directives
+            and "no-cache" not in request.headers.get("Pragma", "")
+        )
+        if fresh and "max-age" in request_directives:
+            fresh = age <= (_seconds(request_directives["max-age"]) or 0)
+        return entry, fresh
+
+    @staticmethod
+    def add_validators(request, entry):
+        """Makes ``request`` conditional on the validators of the stored ``entry``."""
+        if "ETag" in entry.headers:
+            request.headers["If-None-Match"] = entry.headers["ETag"]
+        if "Last-Modified" in entry.headers:
+            request.headers["If-Modified-Since"] = entry.headers["Last-Modified"]
+
+    def is_cacheable(self, request, response):
+        if response.status_code not in CACHEABLE_STATUSES:
+            return False
+        directives = parse_cache_control(response.headers)
+        if "no-store" in directives or response.headers.get("Vary", "").strip() == "*":
+            return False
+        if "Authorization" in request.headers and not any(
+            directive in directives for directive in AUTHORIZED_CACHE_DIRECTIVES
+        ):
+            return False
+        # cookies usually identify the client like credentials, only explicitly public responses are shared
+        if "Cookie" in request.headers and "public" not in directives:
+            return False
+        if self.store.shared and "private" in directives:
+            return False
+        # without freshness information nor validators the response could never be reused
+        return (
+            "max-age" in directives
+            or "Expires" in response.headers
+            or "ETag" in response.headers
+            or "Last-Modified" in response.headers
+            or "no-cache" in directives
+        )
+
+    def cache_response(self, request, response, request_time):
+        """Stores the body of ``response`` in the cache once it has been read."""
+        vary = {}
+        for name in response.headers.get("Vary", "").split(","):
+            if name.strip():
+                vary[name.strip()] = request.headers.get(name.strip())
+        key = self._key(request)
+
+        def store(body):
+            # the body is stored decoded, its headers must describe it as such
+            headers = decoded_body_headers(response.headers, body)
+            entry = CacheEntry(
+                request.url,
+                response.status_code,
+                response.reason,
+                headers,
+                body,
+                vary,
+                time.time(),
+                request_time,
+            )
+            self.store.set(key, entry)
+            logger.debug("Stored response of GET %s in the cache, %s bytes" % (request.url, len(body)))
+
+        response.raw = CachingStream(response.raw, store, self.store.max_bytes)
+
+    def revalidated(self, request, entry, response, request_time):
+        """Updates ``entry`` with the ``304`` ``response`` and returns it as a response."""
+        response.close()
+        entry.update(response, request_time, time.time())
+        self.store.set(self._key(request), entry)
+        return self.build_response(request, entry, CACHE_REVALIDATED, response.connection)
+
+    def invalidate(self, request):
+        self.store.delete(self._key(request))
+
+    @staticmethod
+    def build_response(request, entry, cache_status, connection=None):
+        response = Response()
+        response.status_code = entry.status
+        response.reason = entry.reason
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(entry.body)
+        response.url = request.url
+        response.request = request
+        response.connection = connection
+        response.from_cache = True
+        response.cache_status = cache_status
+        return response
+
+
+def create_cache(cache, max_bytes=None, directory=None):
+    """Returns the ``HTTPCache`` selected with the ``cache`` session option, ``None`` when disabled."""
+    if cache is None or cache is False:
+        return None
+    cache = str(cache).strip().lower()
+    if cache in ("", "none", "false", "no"):
+        return None
+    if cache not in CACHES:
+        raise ValueError("Unknown cache '%s', valid values are: %s" % (cache, ", ".join(CACHES)))
+    if max_bytes is None:
+        max_bytes = DEFAULT_CACHE_MAX_BYTES
+    if cache == "memory":
+        return HTTPCache(MemoryCacheStore(max_bytes))
+    return HTTPCache(DiskCacheStore(directory, max_bytes))
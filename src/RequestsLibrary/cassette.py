@@ -0,0 +1,202 @@
+import base64
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from robot.api import logger
+
+from RequestsLibrary.exceptions import RecordedResponseNotFound
+from RequestsLibrary.utils import decoded_body_headers
+
+CASSETTE_MODES = ("record", "replay", "passthrough")
+CASSETTE_MATCHERS = ("method", "url", "body")
+HEADER_MATCHER = "header:"
+DEFAULT_CASSETTE_DIR = "cassettes"
+
+
+def parse_cassette_match(match):
+    """
+    Returns the list of request parts compared to find a recorded response, from a comma separated string
+    or a list of ``method``, ``url``, ``body`` and ``header:<name>``.
+    """
+    if match is None:
+        return list(CASSETTE_MATCHERS)
+    if isinstance(match, str):
+        match = match.split(",")
+    rules = []
+    for rule in match:
+        rule = rule.strip()
+        if not rule:
+            continue
+        if rule.lower().startswith(HEADER_MATCHER) and rule[len(HEADER_MATCHER):].strip():
+            rules.append(HEADER_MATCHER + rule[len(HEADER_MATCHER):].strip().lower())
+        elif rule.lower() in CASSETTE_MATCHERS:
+            rules.append(rule.lower())
+        else:
+            raise ValueError(
+                "Unknown cassette match '%s', valid values are: %s and header:<name>"
+                % (rule, ", ".join(CASSETTE_MATCHERS))
+            )
+    return rules
+
+
+def body_hash(request):
+    """
+    Returns the SHA-256 of the request body, with the random multipart boundary replaced by a fixed one.
+    Streamed bodies, like file uploads, are never read and all hash the same.
+    """
+    body = request.body
+    if body is None:
+        body = b""
+    elif isinstance(body, str):
+        body = body.encode("utf-8")
+    elif not isinstance(body, (bytes, bytearray)):
+        return "stream"
+    content_type = request.headers.get("Content-Type", "")
+    if content_type.startswith("multipart/") and "boundary=" in content_type:
+        boundary = content_type.split("boundary=", 1)[1].split(";")[0].strip('" ')
+        body = body.replace(boundary.encode("latin-1"), b"boundary")
+    return hashlib.sha256(body).hexdigest()
+
+
+def _serialize_response(response):
+    content = response.content or b""
+    data = {
+        "status": response.status_code,
+        "reason": response.reason,
+        "url": response.url,
+        # the body is recorded decoded, its headers must describe it as such
+        "headers": dict(decoded_body_headers(response.headers, content)),
+    }
+    try:
+        data["body"] = content.decode("utf-8")
+    except UnicodeDecodeError:
+        data["body_base64"] = base64.b64encode(content).decode("ascii")
+    return data
+
+
+class Cassette(object):
+    """
+    Requests and their responses recorded in ``directory``, to replay them without the network.
+
+    Each request is identified by a key, the hash of the parts selected by ``match``, and all
+    the responses recorded for a key are saved in its own ``<key>.json`` file. Files are read only
+    when their key is first requested, so the lookup does not depend on the size of the cassette.
+    Responses recorded more than once for the same key are replayed in the recorded order,
+    the last one is repeated.
+    """
+
+    def __init__(self, directory=None, mode="replay", match=None):
+        self.directory = os.path.abspath(directory or DEFAULT_CASSETTE_DIR)
+        self.mode = mode
+        self.match = parse_cassette_match(match)
+        self._responses = {}
+        self._played = {}
+        self._recorded = set()
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def key(self, request):
+        parts = []
+        for rule in self.match:
+            if rule == "method":
+                parts.append(request.method.upper())
+            elif rule == "url":
+                parts.append(request.url)
+            elif rule == "body":
+                parts.append(body_hash(request))
+            else:
+                parts.append(request.headers.get(rule[len(HEADER_MATCHER):], ""))
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def _load(self, key):
+        responses = self._responses.get(key)
+        if responses is None:
+            try:
+                with open(self._path(key)) as file:
+                    responses = json.load(file)["responses"]
+            except (IOError, OSError):
+                responses = []
+            self._responses[key] = responses
+        return responses
+
+    def play(self, request):
+        """Returns the recorded response of the prepared ``request``."""
+        key = self.key(request)
+        with self._lock:
+            responses = self._load(key)
+            if not responses:
+                raise RecordedResponseNotFound(
+                    "No response recorded in cassette %s for %s %s" % (self.directory, request.method, request.url)
+                )
+            position = self._played.get(key, 0)
+            self._played[key] = position + 1
+            data = responses[min(position, len(responses) - 1)]
+        logger.debug("Replaying the response of %s %s from the cassette" % (request.method, request.url))
+        return self._build_response(request, data)
+
+    def record(self, response):
+        """Saves ``response``, the responses recorded by previous runs for the same request are replaced."""
+        request = response.history[0].request if response.history else response.request
+        key = self.key(request)
+        data = _serialize_response(response)
+        with self._lock:
+            if key not in self._recorded:
+                self._recorded.add(key)
+                self._responses[key] = []
+            self._responses[key].append(data)
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            with open(self._path(key), "w") as file:
+                json.dump(
+                    {
+                        "request": {"method": request.method, "url": request.url},
+                        "responses": self._responses[key],
+                    },
+                    file,
+                    indent=2,
+                )
+
+    @staticmethod
+    def _build_response(request, data):
+        response = Response()
+        response.status_code = data["status"]
+        response.reason = data["reason"]
+        response.url = data["url"]
+        response.headers = CaseInsensitiveDict(data["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        if "body_base64" in data:
+            response._content = base64.b64decode(data["body_base64"])
+        else:
+            response._content = data["body"].encode("utf-8")
+        response._content_consumed = True
+        response.request = request
+        response.elapsed = datetime.timedelta(0)
+        return response
+
+
+def create_cassette(mode, directory=None, match=None):
+    """Returns the ``Cassette`` of the ``record`` and ``replay`` modes, ``None`` for ``passthrough``."""
+    mode = (mode or "passthrough").lower()
+    if mode not in CASSETTE_MODES:
+        raise ValueError(
+            "Unknown cassette mode '%s', valid values are: %s" % (mode, ", ".join(CASSETTE_MODES))
+        )
+    if mode == "passthrough":
+        return None
+    return Cassette(directory, mode, match)
@@ -0,0 +1,134 @@
+import threading
+import time
+
+from robot.api import logger
+from urllib3.util import parse_url
+
+from RequestsLibrary.exceptions import CircuitOpenError
+from RequestsLibrary.utils import is_disabled
+
+DEFAULT_CIRCUIT_BREAKER_COOLDOWN = 30.0
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half-open"
+
+
+def parse_threshold(value):
+    """Converts the ``circuit_breaker`` option to a number of consecutive failures, ``None`` when empty."""
+    if is_disabled(value):
+        return None
+    try:
+        threshold = int(str(value).strip())
+    except ValueError:
+        raise ValueError("circuit_breaker must be a number of consecutive failures, got '%s'" % value)
+    if threshold < 1:
+        raise ValueError("circuit_breaker must be a positive number of consecutive failures, got %s" % value)
+    return threshold
+
+
+def parse_cooldown(value):
+    """Converts the ``circuit_breaker_cooldown`` option to seconds, ``DEFAULT_CIRCUIT_BREAKER_COOLDOWN`` when empty."""
+    if is_disabled(value):
+        return DEFAULT_CIRCUIT_BREAKER_COOLDOWN
+    try:
+        value = float(value)
+    except ValueError:
+        raise ValueError("circuit_breaker_cooldown must be a number of seconds, got '%s'" % value)
+    if value < 0:
+        raise ValueError("circuit_breaker_cooldown must be a positive number of seconds, got %s" % value)
+    return value
+
+
+class _Circuit(object):
+    def __init__(self):
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.opened = 0
+        self.rejected = 0
+
+
+class CircuitBreaker(object):
+    """
+    Fails fast the requests to a host after ``threshold`` consecutive failures, for ``cooldown`` seconds.
+
+    A failure is a request that did not get a response, even after its retries, or got a ``5xx`` one.
+    Once the cooldown is over a single probe request is let through: its success closes the circuit,
+    its failure opens it again for another cooldown. Each host of a session has its own circuit.
+    """
+
+    def __init__(self, threshold, cooldown=DEFAULT_CIRCUIT_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host(url):
+        parsed = parse_url(url)
+        return "%s://%s" % (parsed.scheme, parsed.netloc)
+
+    def before_request(self, url, now=None):
+        """Raises ``CircuitOpenError`` when the circuit of the ``url`` host is open, returns the host otherwise."""
+        host = self.host(url)
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            if circuit.state == CIRCUIT_OPEN and now - circuit.opened_at >= self.cooldown:
+                circuit.state = CIRCUIT_HALF_OPEN
+            if circuit.state == CIRCUIT_HALF_OPEN and not circuit.probing:
+                circuit.probing = True
+                logger.info("Circuit breaker of %s is half-open, sending a probe request" % host)
+                return host
+            if circuit.state != CIRCUIT_CLOSED:
+                circuit.rejected += 1
+                remaining = max(0.0, self.cooldown - (now - circuit.opened_at))
+                raise CircuitOpenError(
+                    "Circuit breaker of %s is open after %s consecutive failures, failing fast for %.1f more seconds"
+                    % (host, circuit.failures, remaining)
+                )
+            return host
+
+    def after_request(self, host, failed, now=None):
+        """
+        Records the outcome of a request let through by ``before_request``,
+        ``failed`` is ``None`` when the request failed for a reason unrelated to the host.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            circuit = self._circuits[host]
+            probe = circuit.state == CIRCUIT_HALF_OPEN
+            if probe:
+                circuit.probing = False
+            if failed is None:
+                return
+            if not failed:
+                if probe:
+                    logger.info("Circuit breaker of %s is closed, the probe request succeeded" % host)
+                circuit.state = CIRCUIT_CLOSED
+                circuit.failures = 0
+                return
+            circuit.failures += 1
+            if probe or (circuit.state == CIRCUIT_CLOSED and circuit.failures >= self.threshold):
+                circuit.state = CIRCUIT_OPEN
+                circuit.opened_at = now
+                circuit.opened += 1
+                logger.warn(
+                    "Circuit breaker of %s is open after %s consecutive failures, failing fast for %s seconds"
+                    % (host, circuit.failures, self.cooldown)
+                )
+
+    def statistics(self):
+        """Returns the ``state``, consecutive ``failures``, times ``opened`` and requests ``rejected`` by host."""
+        with self._lock:
+            return {
+                host: {
+                    "state": circuit.state,
+                    "failures": circuit.failures,
+                    "opened": circuit.opened,
+                    "rejected": circuit.rejected,
+                }
+                for host, circuit in self._circuits.items()
+            }
@@ -0,0 +1,128 @@
+import io
+import zlib
+
+from RequestsLibrary.compat import brotli, zstandard, zstd
+from RequestsLibrary.streaming import CHUNK_SIZE
+
+COMPRESSIONS = ("gzip", "deflate", "zstd")
+COMPRESSION_LEVEL = 6
+
+
+def parse_compression(value):
+    """
+    Returns the ``Content-Encoding`` used to compress request bodies, ``None`` when disabled.
+    """
+    if value is None or value is False:
+        return None
+    value = str(value).strip().lower()
+    if value in ("", "none", "false", "no"):
+        return None
+    if value not in COMPRESSIONS:
+        raise ValueError(
+            "Unknown request compression '%s', valid values are: %s" % (value, ", ".join(COMPRESSIONS))
+        )
+    if value == "zstd" and not has_zstd():
+        raise AssertionError("zstandard module not installed")
+    return value
+
+
+def has_zstd():
+    return zstandard is not None or zstd is not None
+
+
+def get_compressor(encoding):
+    """Returns a new compressor object, with ``compress`` and ``flush`` methods, for ``encoding``."""
+    if encoding == "gzip":
+        return zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        # HTTP deflate is the zlib format, not raw deflate
+        return zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS)
+    if zstandard is not None:
+        return zstandard.ZstdCompressor().compressobj()
+    return zstd.ZstdCompressor()
+
+
+def response_decoders():
+    """Returns the response ``Content-Encoding`` values that can be decoded with the installed codecs."""
+    encodings = ["gzip", "deflate"]
+    if brotli is not None:
+        encodings.append("br")
+    if has_zstd():
+        encodings.append("zstd")
+    return encodings
+
+
+def get_decompressor(encoding):
+    """
+    Returns a function decoding successive chunks of a ``br`` or ``zstd`` encoded body,
+    ``None`` when the codec is not installed.
+    """
+    if encoding == "br" and brotli is not None:
+        decompressor = brotli.Decompressor()
+        # brotli names the method process, brotlicffi decompress
+        return getattr(decompressor, "process", None) or decompressor.decompress
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj().decompress
+    if encoding == "zstd" and zstd is not None:
+        return zstd.ZstdDecompressor().decompress
+    return None
+
+
+def compress_bytes(data, encoding):
+    compressor = get_compressor(encoding)
+    return compressor.compress(data) + compressor.flush()
+
+
+class CompressedStream(io.RawIOBase):
+    """
+    Compresses a file-like object, or an iterable of bytes chunks, while it is read,
+    so that request bodies of any size are sent compressed without being loaded in memory.
+    """
+
+    def __init__(self, source, encoding, chunk_size=CHUNK_SIZE):
+        self.source = source
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.compressor = get_compressor(encoding)
+        if hasattr(source, "read"):
+            # text mode files return "" at their end, their chunks are encoded by read
+            self.chunks = iter(lambda: source.read(chunk_size) or None, None)
+        else:
+            self.chunks = iter(source)
+        self.buffer = b""
+        self.eof = False
+        self.read_bytes = 0
+        self.sent_bytes = 0
+
+    def __repr__(self):
+        return "<%s compressed stream of %r: %s bytes read, %s bytes compressed>" % (
+            self.encoding,
+            self.source,
+            self.read_bytes,
+            self.sent_bytes,
+        )
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while not self.eof and (size is None or size < 0 or len(self.buffer) < size):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.buffer += self.compressor.flush()
+                self.eof = True
+                break
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            self.read_bytes += len(chunk)
+            self.buffer += self.compressor.compress(chunk)
+        if size is None or size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        self.sent_bytes += len(data)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from robot.api import logger
+
+from RequestsLibrary.exceptions import InvalidResponse
+from RequestsLibrary.streaming import CHUNK_SIZE
+
+DEFAULT_HASH_ALGORITHMS = ("sha256", "md5")
+PARTIAL_SUFFIX = ".part"
+RANGES_STATE_SUFFIX = ".part.ranges"
+
+MIN_RANGE_SIZE = 1024 * 1024
+RANGES_PER_CONNECTION = 4
+# arguments of the keyword also passed to the range requests, the others are set for each range
+RANGE_REQUEST_ARGUMENTS = ("auth", "proxies", "hooks", "stream", "verify", "cert")
+
+
+class DownloadResult(object):
+    """
+    Metadata of a response body downloaded to a file.
+
+    The body itself is never kept in memory, only its size and hashes are.
+    """
+
+    def __init__(self, path, size, hashes, response, connections=1, resumed_bytes=0):
+        self.path = path
+        self.size = size
+        self.hashes = hashes
+        self.connections = connections
+        self.resumed_bytes = resumed_bytes
+        self.status_code = response.status_code
+        self.reason = response.reason
+        self.headers = response.headers
+        self.url = response.url
+
+    @property
+    def sha256(self):
+        return self.hashes.get("sha256")
+
+    @property
+    def md5(self):
+        return self.hashes.get("md5")
+
+    def __repr__(self):
+        return "<DownloadResult [%s] %s: %s bytes>" % (self.status_code, self.path, self.size)
+
+
+def parse_hash_algorithms(algorithms):
+    """
+    Returns the list of hash algorithm names from a comma separated string or a list,
+    an empty value disables hashing.
+    """
+    if algorithms is None:
+        return list(DEFAULT_HASH_ALGORITHMS)
+    if isinstance(algorithms, str):
+        algorithms = algorithms.split(",")
+    names = [name.strip().lower() for name in algorithms if name.strip()]
+    for name in names:
+        if name not in hashlib.algorithms_available:
+            raise ValueError(
+                "Unknown hash algorithm '%s', valid values are: %s"
+                % (name, ", ".join(sorted(hashlib.algorithms_guaranteed)))
+            )
+    return names
+
+
+def _prepare_directory(path):
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+
+def hash_file(path, algorithms=None, chunk_size=CHUNK_SIZE):
+    hashers = {name: hashlib.new(name) for name in parse_hash_algorithms(algorithms)}
+    if hashers:
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                for hasher in hashers.values():
+                    hasher.update(chunk)
+    return {name: hasher.hexdigest() for name, hasher in hashers.items()}
+
+
+def download_to_file(response, path, algorithms=None, chunk_size=CHUNK_SIZE):
+    """
+    Writes a streamed ``response`` body to ``path`` chunk by chunk, hashing it on the fly.
+
+    The body is written to a ``.part`` file that is renamed to ``path`` only when complete,
+    so a failed download never leaves a truncated file in place.
+    """
+    partial_path = path + PARTIAL_SUFFIX
+    size = 0
+    try:
+        hashers = {name: hashlib.new(name) for name in parse_hash_algorithms(algorithms)}
+        _prepare_directory(path)
+        with open(partial_path, "wb") as file:
+            for chunk in response.iter_content(chunk_size):
+                file.write(chunk)
+                for hasher in hashers.values():
+                    hasher.update(chunk)
+                size += len(chunk)
+        os.replace(partial_path, path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    finally:
+        response.close()
+    hashes = {name: hasher.hexdigest() for name, hasher in hashers.items()}
+    return DownloadResult(path, size, hashes, response)
+
+
+def supports_ranges(response):
+    """
+    True when the body of ``response`` can be downloaded in byte ranges:
+    the server accepts them and the length of the not encoded body is known.
+    """
+    headers = response.headers
+    return (
+        headers.get("Accept-Ranges", "").lower() == "bytes"
+        and headers.get("Content-Length", "").isdigit()
+        and int(headers["Content-Length"]) > 0
+        and headers.get("Content-Encoding", "identity").lower() == "identity"
+    )
+
+
+def split_ranges(size, range_size):
+    """Returns the list of ``[first, last]`` byte positions, inclusive, covering ``size`` bytes."""
+    return [
+        [first, min(first + range_size, size) - 1] for first in range(0, size, range_size)
+    ]
+
+
+class _RangesState(object):
+    """
+    Completed ranges of a parallel download, saved next to the ``.part`` file
+    after each range so that a failed download can be resumed.
+    """
+
+    def __init__(self, path, url, size, validator, range_size):
+        self.path = path + RANGES_STATE_SUFFIX
+        self.partial_path = path + PARTIAL_SUFFIX
+        self.identity = {"url": url, "size": size, "validator": validator}
+        self.range_size = range_size
+        self.completed = []
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Loads the completed ranges of a previous download of the same unchanged resource."""
+        if not self.identity["validator"] or not os.path.exists(self.partial_path):
+            return
+        try:
+            with open(self.path) as file:
+                saved = json.load(file)
+        except (IOError, OSError, ValueError):
+            return
+        if saved.get("identity") == self.identity:
+            # the ranges of the previous download are kept, even with a different number of connections
+            self.range_size = saved["range_size"]
+            self.completed = [list(item) for item in saved.get("completed", [])]
+
+    def complete(self, byte_range):
+        with self.lock:
+            self.completed.append(byte_range)
+            with open(self.path, "w") as file:
+                json.dump(
+                    {"identity": self.identity, "range_size": self.range_size, "completed": self.completed},
+                    file,
+                )
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def download_ranges_to_file(
+    response, path, fetch_range, connections, algorithms=None, range_size=None, chunk_size=CHUNK_SIZE
+):
+    """
+    Downloads the body of ``response`` to ``path`` in byte ranges fetched in parallel
+    with up to ``connections`` threads.
+
+    ``fetch_range(first, last)`` must return the streamed response of the given range.
+    Ranges are written at their offset in a preallocated ``.part`` file. Completed ranges are
+    recorded, with the resource ``ETag`` or ``Last-Modified``, so that downloading the same resource
+    again after a failure only fetches the missing ranges.
+    Hashes are computed reading the file once completed.
+    """
+    response.close()
+    size = int(response.headers["Content-Length"])
+    validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+    if range_size is None:
+        range_size = max(MIN_RANGE_SIZE, -(-size // (connections * RANGES_PER_CONNECTION)))
+
+    _prepare_directory(path)
+    state = _RangesState(path, response.url, size, validator, range_size)
+    state.load()
+    if state.completed:
+        mode = "r+b"
+        logger.info(
+            "Resuming download of %s, %s ranges already completed" % (path, len(state.completed))
+        )
+    else:
+        mode = "wb"
+    with open(state.partial_path, mode) as file:
+        file.truncate(size)
+
+    resumed_bytes = sum(last - first + 1 for first, last in state.completed)
+    pending = [item for item in split_ranges(size, state.range_size) if item not in state.completed]
+    failed = threading.Event()
+
+    def download_range(byte_range):
+        if failed.is_set():
+            return
+        first, last = byte_range
+        try:
+            range_response = fetch_range(first, last)
+            try:
+                if range_response.status_code != 206:
+                    raise InvalidResponse(
+                        "Expected status 206 for range bytes=%s-%s but got %s, the resource may have changed"
+                        % (first, last, range_response.status_code)
+                    )
+                written = 0
+                with open(state.partial_path, "r+b") as file:
+                    file.seek(first)
+                    for chunk in range_response.iter_content(chunk_size):
+                        file.write(chunk[: max(0, last - first + 1 - written)])
+                        written += len(chunk)
+                if written < last - first + 1:
+                    raise InvalidResponse(
+                        "Incomplete range bytes=%s-%s: received %s bytes" % (first, last, written)
+                    )
+            finally:
+                range_response.close()
+        except BaseException:
+            failed.set()
+            raise
+        state.complete(byte_range)
+
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        futures = [executor.submit(download_range, item) for item in pending]
+    for future in futures:
+        # the first error is raised, the completed ranges are kept to resume the download
+        future.result()
+
+    os.replace(state.partial_path, path)
+    state.remove()
+    return DownloadResult(
+        path, size, hash_file(path, algorithms), response, connections, resumed_bytes
+    )
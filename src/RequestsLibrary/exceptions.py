@@ -8,3 +8,27 @@ class InvalidResponse(Exception):
 
 class InvalidExpectedStatus(Exception):
     pass
+
+
+class InvalidJsonPath(Exception):
+    pass
+
+
+class JsonPathNotFound(Exception):
+    pass
+
+
+class ResponseTooLarge(Exception):
+    pass
+
+
+class RecordedResponseNotFound(Exception):
+    pass
+
+
+class OAuth2TokenError(Exception):
+    pass
+
+
+class CircuitOpenError(Exception):
+    pass
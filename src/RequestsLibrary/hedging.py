@@ -0,0 +1,197 @@
+import queue
+import socket
+import threading
+
+from robot.api import logger
+
+from RequestsLibrary.compat import RetryAdapter
+from RequestsLibrary.utils import is_disabled
+
+# duplicates allowed in the budget window whatever the number of requests
+HEDGE_BUDGET_RATIO = 0.05
+HEDGE_BUDGET_MIN_HEDGES = 10
+HEDGED_METHODS = frozenset(RetryAdapter.get_default_allowed_methods())
+HEDGE_CANCELLED = "hedged request cancelled"
+
+# attempt run by the current thread
+_current = threading.local()
+
+
+def parse_hedge_after(value):
+    """Converts the ``hedge_after`` option to seconds, ``None`` when empty, which disables hedging."""
+    if is_disabled(value):
+        return None
+    try:
+        value = float(value)
+    except ValueError:
+        raise ValueError("hedge_after must be a number of seconds, got '%s'" % value)
+    if value < 0:
+        raise ValueError("hedge_after must be a positive number of seconds, got %s" % value)
+    return value
+
+
+def cancelled():
+    """Returns whether the current thread sends the copy of a hedged request that lost the race."""
+    attempt = getattr(_current, "attempt", None)
+    return attempt is not None and attempt.cancelled
+
+
+class HedgeCancelled(Exception):
+    """Raised in the thread of a cancelled hedged request when it takes a connection, to stop its retries."""
+
+
+def track_connection(conn):
+    """
+    Records a connection taken from its pool by the current thread, to shut it down if its attempt is cancelled.
+    Returns ``False`` when the attempt is already cancelled.
+    """
+    attempt = getattr(_current, "attempt", None)
+    return attempt is None or attempt.track(conn)
+
+
+def _resendable(request):
+    # bodies read from files or generators can only be sent once
+    return request.body is None or isinstance(request.body, (bytes, str))
+
+
+class _Attempt(object):
+    """One of the copies of a hedged request, sent from its own thread."""
+
+    def __init__(self, send, request, kwargs, done, hedge=False):
+        self.hedge = hedge
+        self.cancelled = False
+        self.response = None
+        self.error = None
+        self._send = send
+        self._request = request
+        self._kwargs = kwargs
+        self._done = done
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name="hedged-request")
+        thread.daemon = True
+        thread.start()
+
+    def _run(self):
+        _current.attempt = self
+        try:
+            self.response = self._send(self._request, **self._kwargs)
+        except Exception as error:
+            self.error = error
+        finally:
+            _current.attempt = None
+        with self._lock:
+            if self.cancelled and self.response is not None:
+                self.response.close()
+        self._done.put(self)
+
+    def result(self):
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+    def track(self, conn):
+        with self._lock:
+            self._connections.append(conn)
+            return not self.cancelled
+
+    def cancel(self):
+        """Closes the connections of the attempt, its response if it already has one."""
+        with self._lock:
+            self.cancelled = True
+            if self.response is not None:
+                self.response.close()
+            for conn in self._connections:
+                sock = getattr(conn, "sock", None)
+                if sock is not None:
+                    try:
+                        sock.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+
+
+class Hedger(object):
+    """
+    Sends a duplicate of the idempotent requests still without a response after ``delay`` seconds,
+    on another connection of the pool, and returns the first response received.
+
+    The other copy is cancelled: its connection is shut down and it is neither retried nor counted
+    in the retry statistics, only the returned response or error is seen by the circuit breaker.
+    Duplicates are limited by ``budget``, a ``RetryBudget`` of the requests, usually of
+    ``HEDGE_BUDGET_RATIO`` with ``HEDGE_BUDGET_MIN_HEDGES`` always allowed.
+    Requests with a body that can only be read once are never hedged.
+    """
+
+    def __init__(self, delay, budget):
+        self.delay = delay
+        self.budget = budget
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+        self._lock = threading.Lock()
+
+    def hedges(self, request):
+        return request.method in HEDGED_METHODS and _resendable(request)
+
+    def _acquire(self):
+        with self._lock:
+            if not self.budget.acquire():
+                self.budget_exhausted += 1
+                return False
+            self.hedged += 1
+            return True
+
+    def send(self, send, request, **kwargs):
+        """Sends ``request`` with the ``send`` function, hedging it when it is slow."""
+        if not self.hedges(request):
+            return send(request, **kwargs)
+        with self._lock:
+            self.requests += 1
+            self.budget.record_request()
+        done = queue.Queue()
+        primary = _Attempt(send, request, kwargs, done)
+        primary.start()
+        try:
+            return done.get(timeout=self.delay).result()
+        except queue.Empty:
+            pass
+        if not self._acquire():
+            logger.info(
+                "Not hedging %s %s, the hedging budget of the session is exhausted" % (request.method, request.url)
+            )
+            return done.get().result()
+        logger.info(
+            "Hedging %s %s, no response after %s seconds" % (request.method, request.url, self.delay)
+        )
+        hedge = _Attempt(send, request.copy(), kwargs, done, hedge=True)
+        hedge.start()
+        first = done.get()
+        if first.error is not None:
+            # an error is not a response, the other attempt can still get one
+            second = done.get()
+            if second.error is None:
+                first = second
+        winner, loser = (first, hedge if first is primary else primary)
+        loser.cancel()
+        if winner.hedge:
+            with self._lock:
+                self.hedge_wins += 1
+            logger.info("Hedged request of %s %s answered first" % (request.method, request.url))
+        return winner.result()
+
+    def statistics(self):
+        """
+        Returns the hedgeable ``requests``, the ``hedged`` ones that got a duplicate, the ``hedge_wins``
+        answered first by the duplicate, the duplicates refused by the budget and the ``hedge_rate``.
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "budget_exhausted": self.budget_exhausted,
+                "hedge_rate": round(float(self.hedged) / self.requests, 3) if self.requests else 0.0,
+            }
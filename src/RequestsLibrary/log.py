@@ -2,21 +2,64 @@ import logging
 
 from robot.api import logger
 
+from RequestsLibrary.responses import LibraryResponse
 from RequestsLibrary.utils import is_file_descriptor
 
 LOG_CHAR_LIMIT = 10000
 AUTHORIZATION = 'Authorization'
 
 
-def log_response(response):
+NOT_LOGGED_BODY = "<streamed, not logged>"
+
+
+def log_response(response, log_body=True):
+    if not log_body:
+        body = NOT_LOGGED_BODY
+    elif isinstance(response, LibraryResponse) and response.spilled:
+        body = "<%s bytes spilled to a temporary file, not logged>" % len(response.body_view)
+    else:
+        body = format_data_to_log_string(response.text)
     logger.info(
         "%s Response : url=%s \n " % (response.request.method.upper(), response.url)
         + "status=%s, reason=%s \n " % (response.status_code, response.reason)
         + "headers=%s \n " % response.headers
-        + "body=%s \n " % format_data_to_log_string(response.text)
+        + "body=%s \n " % body
+        + format_body_size(response)
+        + format_cache_status(response)
+        + format_retries(response)
     )
 
 
+def format_cache_status(response):
+    cache_status = getattr(response, "cache_status", None)
+    if not isinstance(response, LibraryResponse) or cache_status is None:
+        return ""
+    return "cache=%s \n " % cache_status
+
+
+def format_retries(response):
+    if not isinstance(response, LibraryResponse) or not response.retries:
+        return ""
+    return "retries=%s (slept %.3f s) \n " % (response.retries, response.retry_seconds)
+
+
+def format_body_size(response):
+    """
+    Returns the decoded and the received size of a read encoded body as a log line,
+    an empty string for not encoded or not read bodies.
+    """
+    encoding = response.headers.get("Content-Encoding", "identity").lower()
+    if encoding == "identity" or not isinstance(response, LibraryResponse) or response.from_cache:
+        return ""
+    if not response._content_consumed or response.raw is None:
+        return ""
+    try:
+        received = response.raw.tell()
+    except (AttributeError, OSError):
+        return ""
+    return "size=%s bytes (%s encoded: %s bytes) \n " % (len(response.body_view), encoding, received)
+
+
 def log_request(response):
     request = response.request
     if response.history:
@@ -33,10 +76,18 @@ def log_request(response):
         + "url=%s %s\n " % (original_request.url, redirected)
         + "path_url=%s \n " % original_request.path_url
         + "headers=%s \n " % safe_headers
-        + "body=%s \n " % format_data_to_log_string(original_request.body)
+        + "body=%s \n " % format_request_body(original_request)
     )
 
 
+def format_request_body(request):
+    encoding = request.headers.get("Content-Encoding")
+    # compressed binary bodies are summarized, streams log their own summary with repr
+    if encoding and isinstance(request.body, (bytes, bytearray)):
+        return "<%s compressed body, %s bytes>" % (encoding, len(request.body))
+    return format_data_to_log_string(request.body)
+
+
 def format_data_to_log_string(data, limit=LOG_CHAR_LIMIT):
 
     if not data:
@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+
+from RequestsLibrary.utils import is_disabled
+
+DEFAULT_MEMO_SIZE = 256
+
+
+def parse_ttl(value):
+    """Converts the ``cache_ttl`` argument to seconds, ``None`` and empty values disable it."""
+    if is_disabled(value):
+        return None
+    try:
+        ttl = float(value)
+    except ValueError:
+        raise ValueError("cache_ttl must be a number of seconds, got '%s'" % value)
+    if ttl < 0:
+        raise ValueError("cache_ttl must be a positive number of seconds, got %s" % value)
+    return ttl
+
+
+class ResponseMemo(object):
+    """
+    Responses memoized for a time to live, whatever their caching headers.
+
+    The least recently used entries are evicted beyond ``max_entries``.
+    It belongs to the library instance so, with the library ``GLOBAL`` scope,
+    it is shared by all the suites of a run.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MEMO_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(alias, url, headers):
+        """Key of a request: the session alias, the url with its query string and the sent headers."""
+        return alias, url, tuple(sorted((name.lower(), value) for name, value in headers.items()))
+
+    def get(self, key):
+        """Returns the memoized response and its remaining time to live, ``(None, 0)`` when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, 0
+            response, expires = entry
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                del self._entries[key]
+                return None, 0
+            self._entries.move_to_end(key)
+            return response, remaining
+
+    def set(self, key, response, ttl):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (response, time.monotonic() + ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,179 @@
+import io
+import time
+
+from requests.utils import guess_filename, super_len, to_key_val_list
+from robot.api import logger
+from urllib3.fields import RequestField
+from urllib3.filepost import choose_boundary
+
+PROGRESS_STEPS = 10
+
+
+class _FilePart(object):
+    """A part body read lazily from a file-like object, starting from its current position."""
+
+    def __init__(self, file):
+        self.file = file
+        self.length = super_len(file)
+        try:
+            self.start = file.tell()
+        except (AttributeError, OSError):
+            self.start = None
+
+    def rewind(self):
+        if self.start is None:
+            raise io.UnsupportedOperation("The file %r cannot be sent again" % self.file)
+        self.file.seek(self.start)
+
+
+def _to_bytes(value):
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, bytearray):
+        return bytes(value)
+    return str(value).encode("utf-8")
+
+
+class StreamingMultipartEncoder(io.IOBase):
+    """
+    ``multipart/form-data`` body that reads the uploaded files lazily while it is sent.
+
+    It accepts the same ``data`` fields and ``files`` as requests, but only the part headers
+    are kept in memory. Its length is known in advance so the request is sent with a Content-Length.
+    Upload progress is logged at debug level and throughput at info level once the body is sent.
+    """
+
+    def __init__(self, data=None, files=None, boundary=None):
+        self.boundary = boundary or choose_boundary()
+        self.content_type = "multipart/form-data; boundary=%s" % self.boundary
+        self.segments = []
+        self.parts = 0
+        self._build(data, files)
+        self.length = sum(
+            segment.length if isinstance(segment, _FilePart) else len(segment)
+            for segment in self.segments
+        )
+        self.rewind()
+
+    def _build(self, data, files):
+        if isinstance(data, (str, bytes, bytearray)):
+            raise ValueError("Data must not be a string.")
+        for field, values in to_key_val_list(data or {}):
+            if isinstance(values, (str, bytes)) or not hasattr(values, "__iter__"):
+                values = [values]
+            for value in values:
+                if value is not None:
+                    request_field = RequestField(name=field, data=b"")
+                    request_field.make_multipart()
+                    self._add_part(request_field, _to_bytes(value))
+
+        for field, value in to_key_val_list(files or {}):
+            file_name, content_type, headers = None, None, None
+            if isinstance(value, (tuple, list)):
+                if len(value) == 2:
+                    file_name, file = value
+                elif len(value) == 3:
+                    file_name, file, content_type = value
+                else:
+                    file_name, file, content_type, headers = value
+            else:
+                file_name = guess_filename(value) or field
+                file = value
+
+            if isinstance(file, (str, bytes, bytearray)):
+                body = _to_bytes(file)
+            elif hasattr(file, "read"):
+                body = _FilePart(file)
+            elif file is None:
+                continue
+            else:
+                body = _to_bytes(file)
+            request_field = RequestField(name=field, data=b"", filename=file_name, headers=headers)
+            request_field.make_multipart(content_type=content_type)
+            self._add_part(request_field, body)
+        self.segments.append(("--%s--\r\n" % self.boundary).encode("latin-1"))
+
+    def _add_part(self, request_field, body):
+        self.parts += 1
+        header = "--%s\r\n%s" % (self.boundary, request_field.render_headers())
+        self.segments.append(header.encode("utf-8"))
+        self.segments.append(body)
+        self.segments.append(b"\r\n")
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return "<StreamingMultipartEncoder: %s parts, %s bytes>" % (self.parts, self.length)
+
+    def readable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        # only rewinding is supported, e.g. to send the body again after a redirect
+        if offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("StreamingMultipartEncoder can only be rewound")
+        self.rewind()
+        return 0
+
+    def rewind(self):
+        for segment in self.segments:
+            if isinstance(segment, _FilePart):
+                segment.rewind()
+        self.index = 0
+        self.offset = 0
+        self.position = 0
+        self.started = None
+        self.reported = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.length - self.position
+        chunks = []
+        remaining = size
+        while remaining > 0 and self.index < len(self.segments):
+            segment = self.segments[self.index]
+            if isinstance(segment, _FilePart):
+                chunk = segment.file.read(min(remaining, segment.length - self.offset)) or b""
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                if not chunk and self.offset < segment.length:
+                    raise IOError(
+                        "File %r is shorter than its expected %s bytes" % (segment.file, segment.length)
+                    )
+                segment_length = segment.length
+            else:
+                chunk = segment[self.offset:self.offset + remaining]
+                segment_length = len(segment)
+            chunks.append(chunk)
+            self.offset += len(chunk)
+            remaining -= len(chunk)
+            if self.offset >= segment_length:
+                self.index += 1
+                self.offset = 0
+        data = b"".join(chunks)
+        self._progress(len(data))
+        return data
+
+    def _progress(self, size):
+        if self.started is None:
+            self.started = time.perf_counter()
+        self.position += size
+        if not self.length:
+            return
+        step = self.position * PROGRESS_STEPS // self.length
+        if step > self.reported:
+            self.reported = step
+            logger.debug(
+                "Uploaded %s%% (%s of %s bytes)"
+                % (step * 100 // PROGRESS_STEPS, self.position, self.length)
+            )
+        if self.position == self.length and size:
+            elapsed = time.perf_counter() - self.started
+            logger.info(
+                "Uploaded %s bytes in %s parts in %.3f s (%.1f KiB/s)"
+                % (self.length, self.parts, elapsed, self.length / 1024.0 / max(elapsed, 1e-9))
+            )
@@ -0,0 +1,243 @@
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.auth import AuthBase
+from robot.api import logger
+
+from RequestsLibrary.compat import fcntl, msvcrt
+from RequestsLibrary.exceptions import OAuth2TokenError
+
+CLIENT_AUTH_METHODS = ("basic", "body")
+# tokens are refreshed this many seconds before they expire, at most a tenth of their lifetime
+TOKEN_REFRESH_MARGIN = 60
+
+# tokens shared by every session of the process, by token url, client id and scope
+_tokens = {}
+_token_locks = {}
+_registry_lock = threading.Lock()
+
+
+def clear_tokens():
+    """Forgets the tokens cached by the process, the ones saved on disk are kept."""
+    with _registry_lock:
+        _tokens.clear()
+
+
+def _token_lock(key):
+    with _registry_lock:
+        return _token_locks.setdefault(key, threading.Lock())
+
+
+class Token(object):
+    """An access token, ``refresh_at`` is the time since the epoch from which a new one is fetched."""
+
+    def __init__(self, access_token, refresh_at=None):
+        self.access_token = access_token
+        self.refresh_at = refresh_at
+
+    @classmethod
+    def from_response(cls, data, now=None):
+        now = time.time() if now is None else now
+        expires_in = data.get("expires_in")
+        refresh_at = None
+        if expires_in is not None:
+            expires_in = float(expires_in)
+            refresh_at = now + expires_in - min(TOKEN_REFRESH_MARGIN, expires_in / 10.0)
+        return cls(data["access_token"], refresh_at)
+
+    def is_valid(self, now=None):
+        if self.refresh_at is None:
+            return True
+        return (time.time() if now is None else now) < self.refresh_at
+
+    def to_dict(self):
+        return {"access_token": self.access_token, "refresh_at": self.refresh_at}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["access_token"], data.get("refresh_at"))
+
+
+@contextlib.contextmanager
+def locked_file(path):
+    """Holds an exclusive lock on the ``path`` file, shared by all the processes using it."""
+    with open(path, "a+b") as file:
+        if fcntl is not None:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after 10 seconds, the other process is still fetching
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class DiskTokenStore(object):
+    """
+    Tokens saved in ``directory``, shared by the processes of a parallel run like pabot workers.
+
+    The token of a key is fetched by a single process at a time: the others wait for its lock
+    and then read the token it saved. Files are readable by their owner only.
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    def lock(self, key):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+        return locked_file(self._path(key, ".lock"))
+
+    def get(self, key):
+        try:
+            with open(self._path(key, ".json")) as file:
+                return Token.from_dict(json.load(file))
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+
+    def set(self, key, token):
+        path = self._path(key, ".json")
+        temporary = "%s.%s.%s.tmp" % (path, os.getpid(), threading.get_ident())
+        descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w") as file:
+            json.dump(token.to_dict(), file)
+        os.replace(temporary, path)
+
+
+class OAuth2ClientCredentials(AuthBase):
+    """
+    Authenticates requests with a bearer token of the OAuth 2.0 client credentials grant.
+
+    The token is fetched from ``token_url`` on the first request and cached, together with the other
+    sessions of the same client id, scope and token parameters, until shortly before it expires. With a ``cache_dir``
+    it is also saved on disk for the other processes. A request rejected with ``401`` is sent again
+    once with a new token.
+    """
+
+    def __init__(
+        self,
+        token_url,
+        client_id,
+        client_secret,
+        scope=None,
+        token_params=None,
+        client_auth="basic",
+        cache_dir=None,
+    ):
+        client_auth = (client_auth or "basic").lower()
+        if client_auth not in CLIENT_AUTH_METHODS:
+            raise ValueError(
+                "Unknown client_auth '%s', valid values are: %s" % (client_auth, ", ".join(CLIENT_AUTH_METHODS))
+            )
+        if isinstance(scope, (list, tuple)):
+            scope = " ".join(scope)
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.scope = scope
+        self.token_params = dict(token_params or {})
+        self.client_auth = client_auth
+        self.store = DiskTokenStore(cache_dir) if cache_dir else None
+        # tokens requested with other parameters, like an audience, are for other resources
+        params = json.dumps(sorted((str(name), str(value)) for name, value in self.token_params.items()))
+        self.key = hashlib.sha256(
+            "\n".join((token_url, client_id, scope or "", params, client_auth)).encode("utf-8")
+        ).hexdigest()
+        # settings of the token requests, set from the session
+        self.verify = True
+        self.proxies = None
+        self.timeout = None
+
+    def __call__(self, request):
+        request.headers["Authorization"] = "Bearer %s" % self.token()
+        request.register_hook("response", self.handle_401)
+        return request
+
+    def token(self, rejected=None):
+        """
+        Returns the cached access token, fetching a new one when it is about to expire
+        or when it is the ``rejected`` one.
+        """
+        with _token_lock(self.key):
+            token = _tokens.get(self.key)
+            if not self._usable(token, rejected):
+                if self.store is None:
+                    token = self.fetch_token()
+                else:
+                    with self.store.lock(self.key):
+                        token = self.store.get(self.key)
+                        if not self._usable(token, rejected):
+                            token = self.fetch_token()
+                            self.store.set(self.key, token)
+                with _registry_lock:
+                    _tokens[self.key] = token
+            return token.access_token
+
+    @staticmethod
+    def _usable(token, rejected):
+        return token is not None and token.access_token != rejected and token.is_valid()
+
+    def fetch_token(self):
+        data = {"grant_type": "client_credentials"}
+        if self.scope:
+            data["scope"] = self.scope
+        data.update(self.token_params)
+        auth = None
+        if self.client_auth == "basic":
+            auth = (self.client_id, self.client_secret)
+        else:
+            data.update(client_id=self.client_id, client_secret=self.client_secret)
+        response = requests.post(
+            self.token_url,
+            data=data,
+            auth=auth,
+            headers={"Accept": "application/json"},
+            verify=self.verify,
+            proxies=self.proxies,
+            timeout=self.timeout,
+        )
+        try:
+            token = Token.from_response(response.json())
+        except (ValueError, KeyError, TypeError):
+            token = None
+        if not response.ok or token is None:
+            raise OAuth2TokenError(
+                "Fetching the OAuth2 token of client %s from %s failed: %s %s"
+                % (self.client_id, self.token_url, response.status_code, response.text)
+            )
+        logger.info("Fetched the OAuth2 token of client %s from %s" % (self.client_id, self.token_url))
+        return token
+
+    def handle_401(self, response, **kwargs):
+        """Sends the request rejected with ``401`` again, once, with a new token."""
+        if response.status_code != 401:
+            return response
+        rejected = response.request.headers.get("Authorization", "")[len("Bearer "):]
+        # the connection is released before the request is sent again
+        response.content
+        response.close()
+        request = response.request.copy()
+        request.headers["Authorization"] = "Bearer %s" % self.token(rejected=rejected)
+        retried = response.connection.send(request, **kwargs)
+        retried.history.append(response)
+        retried.request = request
+        return retried
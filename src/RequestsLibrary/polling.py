@@ -0,0 +1,125 @@
+import json
+import random
+import time
+
+from robot.utils import timestr_to_secs
+
+from RequestsLibrary.exceptions import JsonPathNotFound
+from RequestsLibrary.utils import get_json_path_value, is_string_type
+
+DEFAULT_POLL_TIMEOUT = 60.0
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_POLL_MAX_INTERVAL = 10.0
+DEFAULT_POLL_BACKOFF = 2.0
+# each delay is randomly shortened by up to this ratio, so that parallel pollers do not synchronize
+POLL_JITTER = 0.5
+
+_MISSING = object()
+
+
+class PollBackoff(object):
+    """
+    Delays between the attempts of a poll: they start at ``interval`` seconds, grow by ``backoff``
+    up to ``max_interval`` and are shortened by a random jitter. ``next_delay`` returns ``None``
+    once the ``timeout`` is over, the last delay ends at the deadline.
+    """
+
+    def __init__(self, timeout, interval, max_interval, backoff=DEFAULT_POLL_BACKOFF, clock=time.monotonic):
+        self.interval = interval
+        self.max_interval = max(max_interval, interval)
+        self.backoff = backoff
+        self.clock = clock
+        self.start = clock()
+        self.deadline = self.start + timeout
+
+    @classmethod
+    def from_options(cls, timeout, interval, max_interval, backoff):
+        return cls(
+            timestr_to_secs(timeout),
+            timestr_to_secs(interval),
+            timestr_to_secs(max_interval),
+            float(backoff),
+        )
+
+    @property
+    def elapsed(self):
+        return self.clock() - self.start
+
+    def next_delay(self):
+        remaining = self.deadline - self.clock()
+        if remaining <= 0:
+            return None
+        delay = self.interval * random.uniform(1 - POLL_JITTER, 1)
+        self.interval = min(self.interval * self.backoff, self.max_interval)
+        return min(delay, remaining)
+
+
+def _parse_statuses(status):
+    if status is None:
+        return None
+    if is_string_type(status):
+        status = status.split(",")
+    elif not isinstance(status, (list, tuple)):
+        status = [status]
+    return [int(str(code).strip()) for code in status]
+
+
+class PollCondition(object):
+    """
+    Condition met by a response with one of the expected ``status`` codes and, with a ``json_path``,
+    a JSON body having ``expected_value`` at that path, or any value when it is ``None``.
+    Without ``status`` the response must be successful.
+    """
+
+    def __init__(self, status=None, json_path=None, expected_value=None):
+        self.statuses = _parse_statuses(status)
+        self.json_path = json_path
+        self.expected_value = expected_value
+
+    def __str__(self):
+        parts = []
+        if self.statuses:
+            parts.append("status in %s" % ", ".join(str(code) for code in self.statuses))
+        if self.json_path:
+            if self.expected_value is None:
+                parts.append("%s exists" % self.json_path)
+            else:
+                parts.append("%s == %r" % (self.json_path, self.expected_value))
+        return " and ".join(parts) or "successful status"
+
+    def value(self, response):
+        """Returns the value at ``json_path`` in the body of ``response``, ``_MISSING`` when there is none."""
+        try:
+            return get_json_path_value(response.json(), self.json_path)
+        except (ValueError, JsonPathNotFound):
+            return _MISSING
+
+    def matches(self, response):
+        if self.statuses is not None:
+            if response.status_code not in self.statuses:
+                return False
+        elif not response.ok:
+            return False
+        if not self.json_path:
+            return True
+        value = self.value(response)
+        if value is _MISSING:
+            return False
+        return self.expected_value is None or self._equals(value, self.expected_value)
+
+    @staticmethod
+    def _equals(value, expected):
+        if value == expected:
+            return True
+        # Robot Framework arguments are strings, compare them to the JSON representation of other values
+        if is_string_type(expected) and not is_string_type(value):
+            return json.dumps(value) == expected or str(value) == expected
+        return False
+
+    def describe(self, response):
+        """Returns the status and the value at ``json_path`` of ``response``, for failure messages."""
+        description = "status %s" % response.status_code
+        if self.json_path:
+            value = self.value(response)
+            description += ", %s %s" % (self.json_path, "not found" if value is _MISSING else "= %r" % (value,))
+        return description
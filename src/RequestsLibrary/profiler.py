@@ -0,0 +1,128 @@
+import cProfile
+import os
+import time
+
+from robot.api import logger
+
+NETWORK_PHASE = "request"
+
+
+class _NoOpTimer(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_OP_TIMER = _NoOpTimer()
+
+
+class _PhaseTimer(object):
+    def __init__(self, profiler, phase):
+        self.profiler = profiler
+        self.phase = phase
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add(self.phase, time.perf_counter() - self.start)
+        return False
+
+
+class _RequestProfile(object):
+    def __init__(self, path):
+        self.path = path
+        self.profile = cProfile.Profile()
+
+    def __enter__(self):
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        self.profile.dump_stats(self.path)
+        return False
+
+
+class LibraryProfiler(object):
+    """
+    Collects the time spent in RequestsLibrary itself, split by phase.
+
+    The ``request`` phase is the time spent inside requests, network wait included,
+    all the other phases are library overhead.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.cprofile_dir = None
+        self.reset()
+
+    def reset(self):
+        self.timings = {}
+        self.requests = 0
+
+    def start(self, cprofile_dir=None):
+        self.reset()
+        self.enabled = True
+        self.cprofile_dir = cprofile_dir
+        if cprofile_dir and not os.path.isdir(cprofile_dir):
+            os.makedirs(cprofile_dir)
+
+    def stop(self):
+        self.enabled = False
+        self.cprofile_dir = None
+
+    def measure(self, phase):
+        if not self.enabled:
+            return _NO_OP_TIMER
+        return _PhaseTimer(self, phase)
+
+    def profile_request(self, method):
+        if not self.enabled:
+            return _NO_OP_TIMER
+        self.requests += 1
+        if not self.cprofile_dir:
+            return _NO_OP_TIMER
+        file_name = "%04d-%s.prof" % (self.requests, method.upper())
+        return _RequestProfile(os.path.join(self.cprofile_dir, file_name))
+
+    def add(self, phase, elapsed):
+        calls, total = self.timings.get(phase, (0, 0.0))
+        self.timings[phase] = (calls + 1, total + elapsed)
+
+    def get_stats(self):
+        phases = {}
+        overhead = 0.0
+        for phase, (calls, total) in self.timings.items():
+            phases[phase] = {
+                "calls": calls,
+                "total_ms": total * 1000,
+                "mean_ms": total * 1000 / calls,
+            }
+            if phase != NETWORK_PHASE:
+                overhead += total
+        network = self.timings.get(NETWORK_PHASE, (0, 0.0))[1]
+        return {
+            "requests": self.requests,
+            "network_ms": network * 1000,
+            "library_overhead_ms": overhead * 1000,
+            "phases": phases,
+        }
+
+    def log_stats(self, stats):
+        lines = [
+            "Library profiling: requests=%s, network=%.3f ms, library overhead=%.3f ms"
+            % (stats["requests"], stats["network_ms"], stats["library_overhead_ms"])
+        ]
+        for phase, timing in sorted(
+            stats["phases"].items(), key=lambda item: -item[1]["total_ms"]
+        ):
+            lines.append(
+                "%s: calls=%s, total=%.3f ms, mean=%.3f ms"
+                % (phase, timing["calls"], timing["total_ms"], timing["mean_ms"])
+            )
+        logger.info("\n".join(lines))
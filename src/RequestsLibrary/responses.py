@@ -0,0 +1,227 @@
+import mmap
+from json import JSONDecodeError
+
+from requests.exceptions import JSONDecodeError as RequestsJSONDecodeError
+from requests.compat import chardet
+from requests.models import PreparedRequest, Response
+from requests.utils import guess_json_utf, iter_slices, stream_decode_response_unicode
+
+from RequestsLibrary import utils
+from RequestsLibrary.exceptions import ResponseTooLarge
+from RequestsLibrary.streaming import CHUNK_SIZE
+
+_NOT_PARSED = object()
+
+RESPONSE_RETENTIONS = ("full", "headers-only", "none")
+
+
+class LibraryResponse(Response):
+    """
+    Response returned by the requests keywords.
+
+    It behaves exactly like a requests ``Response`` but the JSON body is parsed
+    only once, following ``json()`` calls return the same already parsed object.
+    The body is parsed with the JSON backend selected in the library import.
+
+    Large bodies can be spilled to a temporary file, in that case ``content`` and ``text``
+    read it from a memory mapped view at each access instead of keeping it in memory,
+    ``iter_content`` and ``iter_lines`` read it chunk by chunk. ``close`` releases the file.
+
+    With the session ``cache`` enabled ``from_cache`` tells whether it was answered by the cache
+    and ``cache_status`` is ``hit``, ``revalidated`` or ``miss``.
+
+    ``retries`` is the number of times the request was retried before this response
+    and ``retry_seconds`` the time slept between the retries.
+    """
+
+    from_cache = False
+    cache_status = None
+    retries = 0
+    retry_seconds = 0.0
+
+    @classmethod
+    def wrap(cls, response):
+        """
+        Turns a requests ``Response`` into a ``LibraryResponse`` in place, anything else is returned unchanged.
+        """
+        if isinstance(response, Response) and not isinstance(response, cls):
+            response.__class__ = cls
+        return response
+
+    def spill(self, file):
+        """
+        Uses the already written temporary ``file`` as body of the response.
+        """
+        file.flush()
+        self._body_file = file
+        self._body_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._content = False
+        self._content_consumed = True
+
+    @property
+    def spilled(self):
+        return getattr(self, "_body_map", None) is not None
+
+    @property
+    def body_view(self):
+        """
+        The body as a bytes-like object: the memory mapped file of spilled responses,
+        that supports ``find`` and slicing without loading the body, otherwise ``content``.
+        """
+        if self.spilled:
+            return self._body_map
+        return self.content
+
+    @property
+    def content(self):
+        if self.spilled:
+            return self._body_map[:]
+        return super(LibraryResponse, self).content
+
+    @property
+    def text(self):
+        if not self.spilled:
+            return super(LibraryResponse, self).text
+        # the body is copied from the file only once
+        content = self.content
+        if not content:
+            return ""
+        encoding = self.encoding or chardet.detect(content)["encoding"]
+        try:
+            return str(content, encoding, errors="replace")
+        except (LookupError, TypeError):
+            return str(content, errors="replace")
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        if not self.spilled:
+            return super(LibraryResponse, self).iter_content(chunk_size, decode_unicode)
+        chunks = iter_slices(self._body_map, chunk_size)
+        if decode_unicode:
+            return stream_decode_response_unicode(chunks, self)
+        return chunks
+
+    def close(self):
+        if self.spilled:
+            self._body_map.close()
+            self._body_map = None
+            self._body_file.close()
+            self._body_file = None
+        super(LibraryResponse, self).close()
+
+    def json(self, **kwargs):
+        # custom decoding arguments could change the result, nothing to reuse
+        if kwargs:
+            return super(LibraryResponse, self).json(**kwargs)
+        parsed = getattr(self, "_json", _NOT_PARSED)
+        if parsed is _NOT_PARSED:
+            parsed = self._parse_json()
+            self._json = parsed
+        return parsed
+
+    def _parse_json(self):
+        if not utils.is_fast_json_backend():
+            return super(LibraryResponse, self).json()
+        # spilled bodies are copied from their file at each access
+        content = self.content
+        encoding = self.encoding
+        if not encoding and content and len(content) > 3:
+            encoding = guess_json_utf(content)
+        try:
+            # orjson parses UTF-8 bytes directly, without decoding them to text first
+            if encoding and encoding.lower().replace("-", "") == "utf8":
+                return utils.json_loads(content)
+            return utils.json_loads(self.text)
+        except JSONDecodeError as e:
+            raise RequestsJSONDecodeError(e.msg, e.doc, e.pos)
+
+
+class LimitedStream(object):
+    """
+    Raw response stream failing with ``ResponseTooLarge``, after closing the connection,
+    as soon as more than ``limit`` bytes of the body are read.
+
+    Every other attribute is the one of the wrapped stream.
+    """
+
+    def __init__(self, raw, limit, message):
+        self._raw = raw
+        self._limit = limit
+        self._message = message
+        self._size = 0
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def _count(self, data):
+        self._size += len(data)
+        if self._size > self._limit:
+            self._raw.close()
+            raise ResponseTooLarge(self._message)
+        return data
+
+    def read(self, amt=None, *args, **kwargs):
+        return self._count(self._raw.read(amt, *args, **kwargs))
+
+    def stream(self, amt=CHUNK_SIZE, decode_content=True):
+        if hasattr(self._raw, "stream"):
+            chunks = self._raw.stream(amt, decode_content=decode_content)
+        else:
+            chunks = iter(lambda: self._raw.read(amt), b"")
+        for chunk in chunks:
+            yield self._count(chunk)
+
+
+class ResponseSnapshot(Response):
+    """
+    Compact copy of a response without its body, its redirect history and its connection objects.
+
+    Status, reason, url, headers and elapsed time are kept, so status assertions still work.
+    """
+
+    @classmethod
+    def of(cls, response):
+        snapshot = cls()
+        snapshot.status_code = response.status_code
+        snapshot.reason = response.reason
+        snapshot.url = response.url
+        snapshot.headers = response.headers
+        snapshot.encoding = response.encoding
+        snapshot.elapsed = response.elapsed
+        snapshot.request = _request_snapshot(response.request)
+        snapshot._content = None
+        snapshot._content_consumed = True
+        return snapshot
+
+    def __repr__(self):
+        return "<ResponseSnapshot [%s]>" % self.status_code
+
+
+def _request_snapshot(request):
+    if request is None:
+        return None
+    snapshot = PreparedRequest()
+    snapshot.method = request.method
+    snapshot.url = request.url
+    snapshot.headers = request.headers
+    return snapshot
+
+
+def parse_response_retention(retention):
+    retention = (retention or "full").lower()
+    if retention not in RESPONSE_RETENTIONS:
+        raise ValueError(
+            "Unknown response retention '%s', valid values are: %s"
+            % (retention, ", ".join(RESPONSE_RETENTIONS))
+        )
+    return retention
+
+
+def retain_response(response, retention):
+    """
+    Returns what the library keeps of ``response`` as last response with the given ``retention`` policy.
+    """
+    if retention == "none":
+        return None
+    if retention == "headers-only" and isinstance(response, Response):
+        return ResponseSnapshot.of(response)
+    return response
@@ -0,0 +1,174 @@
+import collections
+import threading
+import time
+
+from robot.api import logger
+from urllib3.exceptions import MaxRetryError, ResponseError
+
+from RequestsLibrary import hedging
+from RequestsLibrary.compat import RetryAdapter
+from RequestsLibrary.utils import is_disabled
+
+# retries allowed by a budget in its window whatever the number of requests
+RETRY_BUDGET_MIN_RETRIES = 10
+RETRY_BUDGET_WINDOW = 10.0
+RETRY_BUDGET_EXHAUSTED = "retry budget exhausted"
+
+
+def parse_retry_budget(value):
+    """
+    Converts the ``retry_budget`` option, a ratio like ``0.1`` or a percentage like ``10%``,
+    to a float between 0 and 1. Empty values and ``None`` disable the budget and are returned as ``None``.
+    """
+    if is_disabled(value):
+        return None
+    text = str(value).strip()
+    try:
+        ratio = float(text[:-1]) / 100 if text.endswith("%") else float(text)
+    except ValueError:
+        raise ValueError("retry_budget must be a ratio like 0.1 or a percentage like 10%%, got '%s'" % value)
+    if not 0 <= ratio <= 1:
+        raise ValueError("retry_budget must be between 0 and 1, or 0%% and 100%%, got '%s'" % value)
+    return ratio
+
+
+class RetryBudget(object):
+    """
+    Limits the retries to ``ratio`` of the requests sent in the last ``RETRY_BUDGET_WINDOW`` seconds,
+    at least ``RETRY_BUDGET_MIN_RETRIES`` retries are always allowed in the window.
+    When a backend is failing its load is then multiplied by ``1 + ratio`` at most, instead of by ``max_retries``.
+    """
+
+    def __init__(self, ratio, min_retries=RETRY_BUDGET_MIN_RETRIES, window=RETRY_BUDGET_WINDOW):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests = collections.deque()
+        self._retries = collections.deque()
+
+    def _prune(self, now):
+        for times in (self._requests, self._retries):
+            while times and times[0] <= now - self.window:
+                times.popleft()
+
+    def record_request(self, now=None):
+        now = time.monotonic() if now is None else now
+        self._prune(now)
+        self._requests.append(now)
+
+    def acquire(self, now=None):
+        """Returns whether one more retry is allowed, counting it when it is."""
+        now = time.monotonic() if now is None else now
+        self._prune(now)
+        if len(self._retries) >= max(self.min_retries, self.ratio * len(self._requests)):
+            return False
+        self._retries.append(now)
+        return True
+
+
+class RetryStats(object):
+    """
+    Retries of the requests sent by a session: how many requests were retried and recovered,
+    the retries and the time slept between them, by endpoint, and the retries refused by the budget.
+    """
+
+    def __init__(self, budget=None):
+        self.budget = RetryBudget(budget) if budget is not None else None
+        self.requests = 0
+        self.retried_requests = 0
+        self.recovered_requests = 0
+        self.retries = 0
+        self.sleep_seconds = 0.0
+        self.budget_exhausted = 0
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, method, url):
+        key = "%s %s" % (method, (url or "").split("?")[0])
+        return self.endpoints.setdefault(key, {"retries": 0, "sleep_seconds": 0.0})
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+            if self.budget is not None:
+                self.budget.record_request()
+
+    def record_retry(self, method, url, first):
+        """Returns whether the retry is allowed by the budget."""
+        with self._lock:
+            if self.budget is not None and not self.budget.acquire():
+                self.budget_exhausted += 1
+                return False
+            self.retries += 1
+            if first:
+                self.retried_requests += 1
+            self._endpoint(method, url)["retries"] += 1
+            return True
+
+    def record_sleep(self, method, url, seconds):
+        with self._lock:
+            self.sleep_seconds += seconds
+            self._endpoint(method, url)["sleep_seconds"] += seconds
+
+    def record_recovered(self):
+        with self._lock:
+            self.recovered_requests += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retried_requests": self.retried_requests,
+                "recovered_requests": self.recovered_requests,
+                "retries": self.retries,
+                "sleep_seconds": round(self.sleep_seconds, 3),
+                "budget_exhausted": self.budget_exhausted,
+                "endpoints": {
+                    key: {"retries": value["retries"], "sleep_seconds": round(value["sleep_seconds"], 3)}
+                    for key, value in self.endpoints.items()
+                },
+            }
+
+
+class LibraryRetry(RetryAdapter):
+    """
+    Retry configuration of the library sessions, counting the retries in ``stats``.
+
+    ``Retry-After`` headers of ``413``, ``429`` and ``503`` responses are honoured, like urllib3 does,
+    and the time slept is counted too. Retries refused by the budget of ``stats`` end the request
+    like exhausted retries do, and so do the ones of cancelled hedged requests.
+    """
+
+    stats = None
+    slept = 0.0
+
+    def new(self, **kwargs):
+        retry = super(LibraryRetry, self).new(**kwargs)
+        retry.stats = self.stats
+        retry.slept = self.slept
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if hedging.cancelled():
+            # the other copy of the hedged request won, this one is neither counted, retried nor delayed
+            reason = error or ResponseError(hedging.HEDGE_CANCELLED)
+            raise MaxRetryError(_pool, url, reason) from reason
+        retry = super(LibraryRetry, self).increment(method, url, response, error, _pool, _stacktrace)
+        if self.stats is None:
+            return retry
+        if not self.stats.record_retry(method, url, first=not self.history):
+            logger.info("Not retrying %s %s, the retry budget of the session is exhausted" % (method, url))
+            reason = error or ResponseError(RETRY_BUDGET_EXHAUSTED)
+            raise MaxRetryError(_pool, url, reason) from reason
+        cause = type(error).__name__ if error else "status %s" % getattr(response, "status", None)
+        logger.info("Retrying %s %s after %s, retry %s" % (method, url, cause, len(retry.history)))
+        return retry
+
+    def sleep(self, response=None):
+        start = time.monotonic()
+        super(LibraryRetry, self).sleep(response)
+        seconds = time.monotonic() - start
+        self.slept += seconds
+        if self.stats is not None and self.history:
+            last = self.history[-1]
+            self.stats.record_sleep(last.method, last.url, seconds)
@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+import time
+
+from requests.auth import HTTPBasicAuth
+from requests.cookies import create_cookie
+from robot.api import logger
+
+STATE_VERSION = 1
+
+
+def _cookie_to_dict(cookie):
+    return {
+        "name": cookie.name,
+        "value": cookie.value,
+        "domain": cookie.domain,
+        "path": cookie.path,
+        "secure": cookie.secure,
+        "expires": cookie.expires,
+        "discard": cookie.discard,
+        "rest": cookie._rest,
+    }
+
+
+def session_state(session):
+    """
+    Returns the state of ``session`` as a JSON serializable dictionary: base url, headers, cookies,
+    basic authentication, query parameters, proxies and certificate verification.
+    """
+    auth = session.auth
+    if isinstance(auth, HTTPBasicAuth):
+        auth = (auth.username, auth.password)
+    elif auth is not None and not isinstance(auth, (tuple, list)):
+        # authentication objects like digest or NTLM keep a handshake state that cannot be restored
+        logger.warn("The %s authentication of the session is not saved" % type(getattr(auth, "auth", auth)).__name__)
+        auth = None
+    return {
+        "version": STATE_VERSION,
+        "url": getattr(session, "url", None),
+        "headers": dict(session.headers),
+        "cookies": [_cookie_to_dict(cookie) for cookie in session.cookies],
+        "auth": list(auth) if auth is not None else None,
+        "params": dict(session.params),
+        "proxies": dict(session.proxies),
+        "verify": session.verify,
+    }
+
+
+def apply_session_state(session, state):
+    """
+    Applies a ``state`` returned by ``session_state`` to ``session``: the saved headers, query parameters
+    and proxies are merged with the ones of the session and the cookies not expired yet are added to its jar.
+    """
+    version = state.get("version")
+    if version != STATE_VERSION:
+        raise ValueError("Unsupported session state version %s, expected %s" % (version, STATE_VERSION))
+    if state.get("url") is not None:
+        session.url = state["url"]
+    session.headers.update(state.get("headers") or {})
+    session.params.update(state.get("params") or {})
+    session.proxies.update(state.get("proxies") or {})
+    if state.get("auth"):
+        session.auth = HTTPBasicAuth(*state["auth"])
+    if "verify" in state:
+        session.verify = state["verify"]
+    now = time.time()
+    for data in state.get("cookies") or []:
+        if data.get("expires") is not None and data["expires"] <= now:
+            continue
+        session.cookies.set_cookie(create_cookie(**data))
+    return session
+
+
+def save_state(path, state):
+    """Writes ``state`` to ``path``, readable by its owner only, replacing the file at once for concurrent readers."""
+    directory = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        os.makedirs(directory, exist_ok=True)
+    temporary = "%s.%s.%s.tmp" % (path, os.getpid(), threading.get_ident())
+    descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "w") as file:
+        json.dump(state, file, indent=2)
+    os.replace(temporary, path)
+
+
+def load_state(path):
+    with open(path) as file:
+        return json.load(file)
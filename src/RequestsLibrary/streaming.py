@@ -0,0 +1,140 @@
+import codecs
+import json
+import re
+
+from RequestsLibrary.exceptions import InvalidJsonPath, JsonPathNotFound
+from RequestsLibrary.utils import parse_json_path
+
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r"\s*")
+NUMBER_CHARACTERS = "0123456789.eE+-"
+
+
+class _JsonStreamReader(object):
+    """
+    Minimal incremental JSON reader over an iterator of bytes chunks.
+
+    Only the part of the document that is currently parsed is kept in memory,
+    values are decoded one at a time with the standard ``json`` raw decoder.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def _read_more(self, size=1):
+        """Reads at least ``size`` more characters, if available, returns False at the end of the data."""
+        if self.eof:
+            return False
+        # drop what has been already parsed, it keeps memory bounded
+        parts = [self.buffer[self.position:]]
+        self.position = 0
+        read = 0
+        for chunk in self.chunks:
+            text = self.decoder.decode(chunk)
+            parts.append(text)
+            read += len(text)
+            if read >= size:
+                break
+        else:
+            parts.append(self.decoder.decode(b"", final=True))
+            self.eof = True
+        self.buffer = "".join(parts)
+        return True
+
+    def peek(self):
+        """Returns the next not blank character, without consuming it, or an empty string at the end."""
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._read_more():
+                return ""
+
+    def expect(self, characters):
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(
+                "Invalid JSON stream: expected one of %r, found %r" % (characters, character or "end of data")
+            )
+        self.position += 1
+        return character
+
+    def value(self):
+        """Decodes and returns the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.position)
+                # a number cut by the end of the buffer could continue in the next chunk
+                if self.eof or (end < len(self.buffer) and self.buffer[end] not in NUMBER_CHARACTERS):
+                    self.position = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            # doubling what is read for each retry avoids parsing large values too many times
+            self._read_more(len(self.buffer) - self.position)
+
+
+def _select(reader, path, tokens):
+    """Moves the reader to the beginning of the value found at the JSON path ``tokens``."""
+    not_found = JsonPathNotFound("No value found at JSON path '%s'" % path)
+    for token in tokens:
+        if token == "*":
+            raise InvalidJsonPath(
+                "Wildcards are only supported at the end of the JSON path '%s'" % path
+            )
+        if isinstance(token, int):
+            if token < 0 or reader.peek() != "[":
+                raise not_found
+            reader.expect("[")
+            if reader.peek() == "]":
+                raise not_found
+            for _ in range(token):
+                reader.value()
+                if reader.expect(",]") == "]":
+                    raise not_found
+        else:
+            if reader.peek() != "{":
+                raise not_found
+            reader.expect("{")
+            if reader.peek() == "}":
+                raise not_found
+            while True:
+                key = reader.value()
+                reader.expect(":")
+                if key == token:
+                    break
+                reader.value()
+                if reader.expect(",}") == "}":
+                    raise not_found
+
+
+def iter_json_items(chunks, path="$"):
+    """
+    Yields, one at a time, the items of the JSON array found at ``path`` in a JSON document
+    read from an iterator of bytes ``chunks``, without loading the whole document in memory.
+
+    ``path`` is a JSONPath made of keys and indexes, like ``$.data.items``,
+    an optional ``[*]`` at the end is ignored.
+    """
+    tokens = parse_json_path(path)
+    if tokens and tokens[-1] == "*":
+        tokens = tokens[:-1]
+    reader = _JsonStreamReader(chunks)
+    _select(reader, path, tokens)
+    if reader.peek() != "[":
+        raise JsonPathNotFound("No JSON array found at JSON path '%s'" % path)
+    reader.expect("[")
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(",]") == "]":
+            return
@@ -1,13 +1,30 @@
 import io
 import json
+import re
 import types
 
 from requests.status_codes import codes
 from requests.structures import CaseInsensitiveDict
 from robot.api import logger
 
-from RequestsLibrary.compat import urlencode
-from RequestsLibrary.exceptions import UnknownStatusError
+from RequestsLibrary.compat import orjson, urlencode
+from RequestsLibrary.exceptions import (
+    InvalidJsonPath,
+    JsonPathNotFound,
+    UnknownStatusError,
+)
+
+JSON_PATH_TOKEN = re.compile(
+    r"""\.(?P<key>[^.\[\]]+)"""
+    r"""|\[\s*(?P<index>-?\d+|\*)\s*\]"""
+    r"""|\[\s*'(?P<single_quoted>[^']*)'\s*\]"""
+    r"""|\[\s*"(?P<double_quoted>[^"]*)"\s*\]"""
+)
+
+JSON_BACKENDS = ("json", "orjson", "auto")
+
+# process wide, set with the json_backend library import option
+_json_backend = "json"
 
 
 class WritableObject:
@@ -49,9 +66,88 @@ def merge_headers(session, headers):
     return merged_headers
 
 
+def decoded_body_headers(headers, body):
+    """
+    Returns a copy of the response ``headers`` describing its already decoded ``body``,
+    without ``Content-Encoding`` and ``Transfer-Encoding`` and with its ``Content-Length``.
+    """
+    headers = CaseInsensitiveDict(headers)
+    for name in ("Content-Encoding", "Transfer-Encoding"):
+        headers.pop(name, None)
+    headers["Content-Length"] = str(len(body))
+    return headers
+
+
+def parse_byte_size(value, name):
+    """
+    Converts a size in bytes option, like ``max_response_bytes``, to an integer.
+    Empty values and ``None`` disable the option and are returned as ``None``.
+    """
+    if is_disabled(value):
+        return None
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValueError("%s must be an integer, got '%s'" % (name, value))
+    if value < 0:
+        raise ValueError("%s must be a positive integer, got %s" % (name, value))
+    return value
+
+
+def set_json_backend(name):
+    """
+    Selects the JSON implementation used to parse and serialize bodies and returns the one in use.
+
+    ``orjson`` falls back to the standard ``json`` module with a warning when it is not installed,
+    ``auto`` uses ``orjson`` only if available.
+    """
+    global _json_backend
+    name = (name or "json").lower()
+    if name not in JSON_BACKENDS:
+        raise ValueError(
+            "Unknown JSON backend '%s', valid values are: %s" % (name, ", ".join(JSON_BACKENDS))
+        )
+    if name != "json" and orjson is None:
+        if name == "orjson":
+            logger.warn("orjson module not installed, falling back to the standard json module")
+        name = "json"
+    elif name == "auto":
+        name = "orjson"
+    _json_backend = name
+    return _json_backend
+
+
+def is_fast_json_backend():
+    return _json_backend == "orjson"
+
+
+def json_loads(data):
+    """
+    Parses a JSON document (str, bytes or bytearray) with the selected JSON backend.
+    """
+    if _json_backend == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(data, as_bytes=False):
+    """
+    Serializes ``data`` to a compact JSON document with the selected JSON backend.
+    Data types not supported by orjson, like non string keys, are serialized with the standard json module.
+    """
+    if _json_backend == "orjson":
+        try:
+            serialized = orjson.dumps(data)
+            return serialized if as_bytes else serialized.decode("utf-8")
+        except TypeError:
+            pass
+    serialized = json.dumps(data)
+    return serialized.encode("utf-8") if as_bytes else serialized
+
+
 def is_json(data):
     try:
-        json.loads(data)
+        json_loads(data)
     except (TypeError, ValueError):
         return False
     return True
@@ -63,14 +159,82 @@ def json_pretty_print(content):
 
     ``content``  JSON object to pretty print
     """
-    temp = json.loads(content)
+    temp = json_loads(content)
+    # orjson only indents with 2 spaces, the standard module keeps the output unchanged
     return json.dumps(temp, sort_keys=True, indent=4, separators=(",", ": "))
 
 
+def parse_json_path(path):
+    """
+    Splits a JSONPath like ``$.key[0]['other key'][*]`` in a list of keys, indexes and ``*`` wildcards.
+    The leading ``$`` is optional.
+    """
+    if path.startswith("$"):
+        expression = path[1:]
+    elif path.startswith("["):
+        expression = path
+    else:
+        expression = "." + path
+
+    tokens = []
+    position = 0
+    while position < len(expression):
+        match = JSON_PATH_TOKEN.match(expression, position)
+        if not match:
+            raise InvalidJsonPath(
+                "Invalid JSON path '%s' at position %s" % (path, position + len(path) - len(expression))
+            )
+        if match.group("key") is not None:
+            tokens.append(match.group("key"))
+        elif match.group("index") is not None:
+            index = match.group("index")
+            tokens.append(index if index == "*" else int(index))
+        elif match.group("single_quoted") is not None:
+            tokens.append(match.group("single_quoted"))
+        else:
+            tokens.append(match.group("double_quoted"))
+        position = match.end()
+    return tokens
+
+
+def get_json_path_value(data, path):
+    """
+    Returns the value found at ``path`` in the already parsed JSON ``data``.
+    When the path contains ``*`` wildcards the list of all the matching values is returned.
+    """
+    tokens = parse_json_path(path)
+    matches = [data]
+    for token in tokens:
+        found = []
+        for value in matches:
+            if token == "*":
+                if isinstance(value, dict):
+                    found.extend(value.values())
+                elif isinstance(value, list):
+                    found.extend(value)
+            elif isinstance(value, list) and isinstance(token, int):
+                if -len(value) <= token < len(value):
+                    found.append(value[token])
+            elif isinstance(value, dict) and not isinstance(token, int) and token in value:
+                found.append(value[token])
+        matches = found
+        if not matches and "*" not in tokens:
+            raise JsonPathNotFound("No value found at JSON path '%s'" % path)
+
+    if "*" in tokens:
+        return matches
+    return matches[0]
+
+
 def is_string_type(data):
     return isinstance(data, str)
 
 
+def is_disabled(value):
+    """Returns whether an option value disables the option: ``None``, an empty string or ``NONE``."""
+    return value is None or (is_string_type(value) and value.strip().upper() in ("", "NONE"))
+
+
 def is_file_descriptor(fd):
     return isinstance(fd, io.IOBase)
 
@@ -100,6 +264,10 @@ def format_data_according_to_header(session, data, headers):
     # Merged headers are already case insensitive
     headers = merge_headers(session, headers)
 
+    # a compressed body is already encoded binary data
+    if headers.get("Content-Encoding", "identity").lower() != "identity":
+        return data
+
     if (
         data is not None
         and headers is not None
@@ -109,7 +277,7 @@ def format_data_according_to_header(session, data, headers):
         if headers["Content-Type"].find("application/json") != -1:
             if not isinstance(data, types.GeneratorType):
                 if str(data).strip():
-                    data = json.dumps(data)
+                    data = json_dumps(data)
         elif headers["Content-Type"].find("application/x-www-form-urlencoded") != -1:
             data = utf8_urlencode(data)
     else:
@@ -0,0 +1,33 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from RequestsLibrary.utils import set_json_backend
+
+
+@pytest.fixture
+def orjson_backend():
+    pytest.importorskip('orjson')
+    yield set_json_backend('orjson')
+    set_json_backend('json')
+
+
+@pytest.fixture
+def local_server():
+    """Returns a function starting a ``ThreadingHTTPServer`` with the given handler class on a free local port."""
+    started = []
+
+    def start(handler):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        server.url = 'http://127.0.0.1:%s' % server.server_address[1]
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        started.append((server, thread))
+        return server
+
+    yield start
+    for server, thread in started:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -1,4 +1,14 @@
+import io
+import zlib
+
+import pytest
+import requests
+from urllib3.response import HTTPResponse
+
 from RequestsLibrary import RequestsLibrary
+from RequestsLibrary.compression import CompressedStream
+from RequestsLibrary.exceptions import ResponseTooLarge
+from RequestsLibrary.responses import LibraryResponse
 from utests import mock
 
 
@@ -81,3 +91,179 @@ def test_merge_url_with_url_override_base():
     session, keywords = build_mocked_session_keywords('http://www.domain.com')
     url = keywords._merge_url(session, 'https://new.domain.com')
     assert url == 'https://new.domain.com'
+
+
+def build_streamed_response(body, headers=None):
+    response = requests.Response()
+    response.raw = HTTPResponse(io.BytesIO(body), headers=headers or {}, preload_content=False)
+    response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    response.status_code = 200
+    response.url = 'http://mocking.rules/big'
+    response.request = requests.Request('GET', response.url).prepare()
+    return response
+
+
+def test_read_body_within_limit():
+    response = build_streamed_response(b'x' * 100)
+    RequestsLibrary._read_body(response, limit=100)
+    assert response.content == b'x' * 100
+
+
+def test_read_body_exceeded_while_reading():
+    response = build_streamed_response(b'x' * 200000)
+    with pytest.raises(ResponseTooLarge, match='exceeds max_response_bytes=100000$'):
+        RequestsLibrary._read_body(response, limit=100000)
+    assert response.raw.closed
+
+
+def test_read_body_exceeded_content_length():
+    response = build_streamed_response(b'x' * 200, {'Content-Length': '200'})
+    with pytest.raises(ResponseTooLarge, match=r'\(Content-Length: 200\)'):
+        RequestsLibrary._read_body(response, limit=100, read_body=False)
+    assert response.raw.closed
+
+
+def test_read_body_of_streamed_response_is_not_read():
+    response = build_streamed_response(b'x' * 200)
+    RequestsLibrary._read_body(response, limit=100, read_body=False)
+    assert response._content is False
+
+
+def test_max_response_bytes_of_the_session_and_per_request():
+    keywords = RequestsLibrary()
+    session = keywords.create_session('alias', 'http://mocking.rules', max_response_bytes='10')
+    assert session.max_response_bytes == 10
+    session.request = mock.MagicMock(return_value=build_streamed_response(b'x' * 20))
+    with pytest.raises(ResponseTooLarge):
+        keywords.get_on_session('alias', '/')
+    assert session.request.call_args[1]['stream'] is True
+
+    session.request.return_value = build_streamed_response(b'x' * 20)
+    response = keywords.get_on_session('alias', '/', max_response_bytes=None)
+    assert response.content == b'x' * 20
+
+
+def test_max_response_bytes_of_streamed_response_without_content_length():
+    keywords = RequestsLibrary()
+    session = keywords.create_session('alias', 'http://mocking.rules', max_response_bytes='1000')
+    session.request = mock.MagicMock(return_value=build_streamed_response(b'x' * 200000))
+    response = keywords.get_on_session('alias', '/', stream=True)
+    assert response._content is False
+    with pytest.raises(ResponseTooLarge, match='exceeds max_response_bytes=1000$'):
+        for _ in response.iter_content(100):
+            pass
+    assert response.raw.closed
+
+
+def test_max_response_bytes_of_streamed_response_read_from_raw():
+    keywords = RequestsLibrary()
+    session = keywords.create_session('alias', 'http://mocking.rules', max_response_bytes='1000')
+    session.request = mock.MagicMock(return_value=build_streamed_response(b'x' * 2000))
+    response = keywords.get_on_session('alias', '/', stream=True)
+    assert len(response.raw.read(1000)) == 1000
+    with pytest.raises(ResponseTooLarge):
+        response.raw.read(1000)
+
+
+def test_files_are_closed_when_the_request_fails():
+    keywords = RequestsLibrary()
+    session = keywords.create_session('alias', 'http://mocking.rules', max_response_bytes='10')
+    session.request = mock.MagicMock(return_value=build_streamed_response(b'x' * 20))
+    upload = io.BytesIO(b'content')
+    with pytest.raises(ResponseTooLarge):
+        keywords.post_on_session('alias', '/', files={'file': upload})
+    assert upload.closed
+
+    session.request.side_effect = requests.ConnectionError('refused')
+    upload = io.BytesIO(b'content')
+    with pytest.raises(requests.ConnectionError):
+        keywords.post_on_session('alias', '/', files={'file': upload})
+    assert upload.closed
+
+
+def test_read_body_spills_above_threshold():
+    body = b'{"items": [%s]}' % b','.join(b'1' for _ in range(100000))
+    response = LibraryResponse.wrap(build_streamed_response(body))
+    RequestsLibrary._read_body(response, spill_threshold=1000)
+    assert response.spilled
+    assert response.content == body
+    assert response.json()['items'][-1] == 1
+    assert response.body_view.find(b'1]}') == len(body) - 3
+
+
+def test_spilled_body_can_be_iterated_and_closed():
+    body = b'line one\nline two\n' * 1000
+    response = LibraryResponse.wrap(build_streamed_response(body))
+    RequestsLibrary._read_body(response, spill_threshold=1000)
+    response.encoding = 'utf-8'
+    assert b''.join(response.iter_content(4096)) == body
+    assert ''.join(response.iter_content(100, decode_unicode=True)) == body.decode()
+    assert list(response.iter_lines())[:3] == [b'line one', b'line two', b'line one']
+    assert response.text == body.decode()
+    body_map, body_file = response._body_map, response._body_file
+    response.close()
+    assert body_map.closed and body_file.closed
+    assert not response.spilled
+
+
+def test_read_body_below_threshold_stays_in_memory():
+    response = LibraryResponse.wrap(build_streamed_response(b'small'))
+    RequestsLibrary._read_body(response, spill_threshold=1000)
+    assert not response.spilled
+    assert response.content == b'small'
+
+
+def test_read_body_limit_is_checked_with_spill():
+    response = LibraryResponse.wrap(build_streamed_response(b'x' * 200000))
+    with pytest.raises(ResponseTooLarge):
+        RequestsLibrary._read_body(response, limit=150000, spill_threshold=1000)
+
+
+def test_response_body_should_contain():
+    keywords = RequestsLibrary()
+    response = LibraryResponse.wrap(build_streamed_response('caffè latte'.encode('utf-8')))
+    RequestsLibrary._read_body(response, spill_threshold=4)
+    response.encoding = 'utf-8'
+    keywords.response_body_should_contain(response, 'è latte')
+    keywords.response_body_should_contain(response, b'caff')
+    with pytest.raises(AssertionError, match='does not contain'):
+        keywords.response_body_should_contain(response, 'tea')
+    with pytest.raises(AssertionError, match='^custom$'):
+        keywords.response_body_should_contain(response, 'tea', msg='custom')
+
+
+def test_compress_body_of_json_and_form_data():
+    keywords = RequestsLibrary()
+    session = keywords.create_session('alias', 'http://mocking.rules', compress_request='gzip')
+    session.request = mock.MagicMock()
+    keywords._common_request('POST', session, '/', json={'a': 1})
+    kwargs = session.request.call_args[1]
+    assert kwargs['headers']['Content-Encoding'] == 'gzip'
+    assert kwargs['headers']['Content-Type'] == 'application/json'
+    assert zlib.decompress(kwargs['data'], 16 + zlib.MAX_WBITS) == b'{"a": 1}'
+
+    keywords._common_request('POST', session, '/', data={'a': 'b c'}, compress_request='deflate')
+    kwargs = session.request.call_args[1]
+    assert kwargs['headers']['Content-Type'] == 'application/x-www-form-urlencoded'
+    assert zlib.decompress(kwargs['data']) == b'a=b+c'
+
+
+def test_compress_body_of_file_descriptor_is_streamed(tmp_path):
+    path = tmp_path / 'body.json'
+    path.write_bytes(b'{}')
+    keywords = RequestsLibrary()
+    session = keywords.create_session('alias', 'http://mocking.rules')
+    session.request = mock.MagicMock()
+    file = keywords.get_file_for_streaming_upload(str(path))
+    keywords._common_request('POST', session, '/', data=file, compress_request='gzip')
+    data = session.request.call_args[1]['data']
+    assert isinstance(data, CompressedStream)
+    assert file.closed
+
+
+def test_compress_body_without_body_does_nothing():
+    keywords = RequestsLibrary()
+    session = keywords.create_session('alias', 'http://mocking.rules', compress_request='gzip')
+    session.request = mock.MagicMock()
+    keywords._common_request('GET', session, '/')
+    assert 'Content-Encoding' not in (session.request.call_args[1].get('headers') or {})
@@ -1,5 +1,7 @@
 import os
 
+import requests
+
 from RequestsLibrary import RequestsLibrary
 from utests import SCRIPT_DIR
 from utests import mock
@@ -100,3 +102,67 @@ def test_common_request_with_touple_timeout_override():
     session, m_common_request = build_mocked_session_common_request(timeout=None)
     m_common_request('get', session, '/', timeout=(123.4, 432.1))
     session.request.assert_called_with('get','http://mocking.rules/', timeout=(123.4, 432.1), cookies={})
+
+
+def test_common_request_json_body_with_orjson(orjson_backend):
+    session, m_common_request = build_mocked_session_common_request()
+    m_common_request('post', session, '/', json={'a': 1})
+    args, kwargs = session.request.call_args
+    assert kwargs['data'] == b'{"a":1}'
+    assert 'json' not in kwargs
+    assert kwargs['headers']['Content-Type'] == 'application/json'
+
+
+def test_common_request_json_body_with_orjson_keeps_content_type(orjson_backend):
+    session, m_common_request = build_mocked_session_common_request()
+    m_common_request('post', session, '/', json=[1], headers={'content-type': 'application/vnd+json'})
+    args, kwargs = session.request.call_args
+    assert kwargs['data'] == b'[1]'
+    assert kwargs['headers'] == {'content-type': 'application/vnd+json'}
+
+
+def test_common_request_json_body_data_has_priority(orjson_backend):
+    session, m_common_request = build_mocked_session_common_request()
+    m_common_request('post', session, '/', data='raw', json={'a': 1})
+    session.request.assert_called_with('post', 'http://mocking.rules/', timeout=None, cookies={},
+                                       data='raw', json={'a': 1})
+
+
+def build_memoized_keywords():
+    keywords = RequestsLibrary()
+    keywords.create_session('alias', 'http://mocking.rules')
+    response = requests.Response()
+    response.status_code = 200
+    response.url = 'http://mocking.rules/flags'
+    keywords._common_request = mock.MagicMock(return_value=response)
+    return keywords, response
+
+
+def test_get_on_session_memoizes_with_cache_ttl():
+    keywords, response = build_memoized_keywords()
+    first = keywords.get_on_session('alias', '/flags', params={'b': 2, 'a': 1}, cache_ttl=60)
+    second = keywords.get_on_session('alias', '/flags', params={'a': 1, 'b': 2}, cache_ttl='60')
+    assert first is second is response
+    assert keywords._common_request.call_count == 1
+    assert 'cache_ttl' not in keywords._common_request.call_args[1]
+    assert keywords.last_response is response
+
+
+def test_get_on_session_memo_keyed_on_headers():
+    keywords, _ = build_memoized_keywords()
+    keywords.get_on_session('alias', '/flags', headers={'X-Tenant': 'a'}, cache_ttl=60)
+    keywords.get_on_session('alias', '/flags', headers={'X-Tenant': 'b'}, cache_ttl=60)
+    keywords.get_on_session('alias', '/flags', cache_ttl=60)
+    assert keywords._common_request.call_count == 3
+
+
+def test_get_on_session_does_not_memoize_errors_and_clears():
+    keywords, response = build_memoized_keywords()
+    response.status_code = 500
+    keywords.get_on_session('alias', '/flags', cache_ttl=60, expected_status='any')
+    response.status_code = 200
+    keywords.get_on_session('alias', '/flags', cache_ttl=60)
+    keywords.clear_memoized_responses()
+    keywords.get_on_session('alias', '/flags', cache_ttl=60)
+    keywords.get_on_session('alias', '/flags')
+    assert keywords._common_request.call_count == 4
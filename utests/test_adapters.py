@@ -0,0 +1,166 @@
+import io
+import os
+import socket
+import threading
+import zlib
+
+import pytest
+import requests
+from requests.exceptions import ContentDecodingError
+from urllib3 import HTTPResponse
+
+from RequestsLibrary import RequestsLibrary, adapters, compression
+from RequestsLibrary.adapters import DecodingStream, LibraryHTTPAdapter
+from RequestsLibrary.log import format_body_size
+from RequestsLibrary.responses import LibraryResponse
+from RequestsLibrary.streaming import CHUNK_SIZE
+
+BODY = b'{"key": "value"}' * 10000
+
+
+def zlib_decoder(encoding):
+    # stands for the br and zstd codecs, that are optional
+    return zlib.decompressobj().decompress
+
+
+def build_adapter_response(body, encoding):
+    raw = HTTPResponse(io.BytesIO(body), headers={'Content-Encoding': encoding}, status=200,
+                       preload_content=False)
+    request = requests.Request('GET', 'http://mocking.rules/encoded').prepare()
+    return LibraryHTTPAdapter().build_response(request, raw)
+
+
+def test_adapter_decodes_encoding_not_supported_by_urllib3(monkeypatch):
+    monkeypatch.setattr(adapters, 'get_decompressor', zlib_decoder)
+    compressed = zlib.compress(BODY)
+    response = build_adapter_response(compressed, 'zstd')
+    assert isinstance(response.raw, DecodingStream)
+    assert response.content == BODY
+    assert response.raw.tell() == len(compressed)
+
+
+def test_adapter_streams_decoded_chunks(monkeypatch):
+    monkeypatch.setattr(adapters, 'get_decompressor', zlib_decoder)
+    body = os.urandom(100000)
+    response = build_adapter_response(zlib.compress(body), 'br')
+    chunks = list(response.iter_content(1024))
+    assert b''.join(chunks) == body
+    assert len(chunks) > 1
+
+
+def test_adapter_without_codec_keeps_body_encoded(monkeypatch):
+    monkeypatch.setattr(adapters, 'get_decompressor', lambda encoding: None)
+    compressed = zlib.compress(BODY)
+    response = build_adapter_response(compressed, 'zstd')
+    assert not isinstance(response.raw, DecodingStream)
+    assert response.content == compressed
+
+
+def test_adapter_leaves_gzip_to_urllib3():
+    compressed = compression.compress_bytes(BODY, 'gzip')
+    response = build_adapter_response(compressed, 'gzip')
+    assert not isinstance(response.raw, DecodingStream)
+    assert response.content == BODY
+
+
+def test_adapter_decoding_error(monkeypatch):
+    monkeypatch.setattr(adapters, 'get_decompressor', zlib_decoder)
+    response = build_adapter_response(b'not compressed', 'zstd')
+    with pytest.raises(ContentDecodingError):
+        response.content
+
+
+def test_session_advertises_installed_decoders():
+    session = RequestsLibrary().create_session('alias', 'http://mocking.rules')
+    assert session.headers['Accept-Encoding'] == ', '.join(compression.response_decoders())
+    assert isinstance(session.get_adapter('http://mocking.rules'), LibraryHTTPAdapter)
+
+
+def test_session_keeps_user_accept_encoding():
+    session = RequestsLibrary().create_session(
+        'alias', 'http://mocking.rules', headers={'accept-encoding': 'identity'})
+    assert session.headers['Accept-Encoding'] == 'identity'
+
+
+def test_format_body_size_of_decoded_body(monkeypatch):
+    monkeypatch.setattr(adapters, 'get_decompressor', zlib_decoder)
+    compressed = zlib.compress(BODY)
+    response = LibraryResponse.wrap(build_adapter_response(compressed, 'zstd'))
+    assert format_body_size(response) == ''
+    response.content
+    assert format_body_size(response) == 'size=%s bytes (zstd encoded: %s bytes) \n ' % (
+        len(BODY), len(compressed))
+
+
+class ExpectContinueServer(object):
+    """Single connection server answering ``Expect: 100-continue`` requests with ``100`` or ``413``."""
+
+    def __init__(self, accept):
+        self.accept = accept
+        self.headers = b''
+        self.body_bytes = 0
+        self.socket = socket.socket()
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.listen(1)
+        self.url = 'http://127.0.0.1:%s' % self.socket.getsockname()[1]
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.start()
+
+    def serve(self):
+        connection, _ = self.socket.accept()
+        connection.settimeout(5)
+        file = connection.makefile('rb')
+        for line in iter(file.readline, b'\r\n'):
+            self.headers += line
+        if self.accept:
+            connection.sendall(b'HTTP/1.1 100 Continue\r\n\r\n')
+        else:
+            connection.sendall(b'HTTP/1.1 413 Payload Too Large\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+        while True:
+            chunk = file.read1(CHUNK_SIZE)
+            if not chunk:
+                break
+            self.body_bytes += len(chunk)
+            if self.accept and self.body_bytes >= len(UPLOAD):
+                connection.sendall(b'HTTP/1.1 200 OK\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                break
+        connection.close()
+        self.socket.close()
+
+    def join(self):
+        self.thread.join(5)
+
+
+UPLOAD = b'x' * 1024 * 1024
+
+
+@pytest.mark.parametrize('accept, status, body_bytes', [(True, 200, len(UPLOAD)), (False, 413, 0)])
+def test_expect_continue(accept, status, body_bytes):
+    server = ExpectContinueServer(accept)
+    session = RequestsLibrary().create_session('alias', server.url, expect_continue=1024)
+    response = session.post(server.url + '/upload', data=io.BytesIO(UPLOAD))
+    server.join()
+    assert response.status_code == status
+    assert b'Expect: 100-continue' in server.headers
+    assert server.body_bytes == body_bytes
+
+
+def test_expect_continue_through_proxy():
+    proxy = ExpectContinueServer(accept=False)
+    session = RequestsLibrary().create_session('alias', 'http://upstream.invalid', expect_continue=1024)
+    response = session.post('http://upstream.invalid/upload', data=io.BytesIO(UPLOAD), proxies={'http': proxy.url})
+    proxy.join()
+    assert response.status_code == 413
+    assert b'POST http://upstream.invalid/upload' in proxy.headers
+    assert proxy.body_bytes == 0
+
+
+def test_expect_continue_threshold():
+    adapter = LibraryHTTPAdapter(expect_continue=1024)
+    small = requests.Request('POST', 'http://mocking.rules', data=b'x' * 1023).prepare()
+    large = requests.Request('POST', 'http://mocking.rules', data=b'x' * 1024).prepare()
+    chunked = requests.Request('POST', 'http://mocking.rules', data=iter([b'x'])).prepare()
+    assert not adapter._expects_continue(small)
+    assert adapter._expects_continue(large)
+    assert adapter._expects_continue(chunked)
+    assert not LibraryHTTPAdapter()._expects_continue(large)
@@ -0,0 +1,95 @@
+import re
+import threading
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from RequestsLibrary import RequestsLibrary
+from RequestsLibrary.adapters import HTTPConnectionPool, pinned_connections
+from RequestsLibrary.auth import HandshakeAuth, SharedDigestAuth
+
+
+class DigestHandler(BaseHTTPRequestHandler):
+    """Challenges the requests without digest credentials, records the client port and nonce count of the others."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        authorization = self.headers.get('Authorization', '')
+        nonce_count = re.search(r'nc=(\w+)', authorization)
+        with self.server.lock:
+            self.server.requests.append((self.client_address[1], nonce_count and nonce_count.group(1)))
+        if nonce_count is None:
+            self.send_response(401)
+            self.send_header('WWW-Authenticate', 'Digest realm="test", nonce="abc", qop="auth"')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(local_server):
+    server = local_server(DigestHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    return server
+
+
+def test_digest_challenge_is_shared_by_threads(server):
+    library = RequestsLibrary()
+    session = library.create_digest_session('digest', server.url, ['user', 'passwd'])
+    assert isinstance(session.auth, HandshakeAuth)
+    assert isinstance(session.auth.auth, SharedDigestAuth)
+    assert session.get(server.url + '/first').history[0].status_code == 401
+
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(session.get(server.url + '/next')))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert all(not response.history for response in responses)
+    nonce_counts = [nonce_count for _, nonce_count in server.requests if nonce_count]
+    assert len(nonce_counts) == len(set(nonce_counts)) == 5
+    assert session.auth.handshakes == 1
+
+    stats = library.get_session_statistics('digest')
+    assert stats['requests'] == 6
+    assert 1 <= stats['connections'] <= 5
+    assert stats['auth_handshakes'] == 1
+
+
+def test_handshake_legs_share_the_connection(server):
+    session = RequestsLibrary().create_digest_session('digest', server.url, ['user', 'passwd'])
+    session.get(server.url)
+    (challenged_port, _), (authenticated_port, _) = server.requests
+    assert challenged_port == authenticated_port
+
+
+def test_pinned_connections_are_kept_for_the_thread():
+    pool = HTTPConnectionPool('127.0.0.1', 1, maxsize=2)
+    with pinned_connections():
+        conn = pool._get_conn()
+        pool._put_conn(conn)
+        other = []
+        thread = threading.Thread(target=lambda: other.append(pool._get_conn()))
+        thread.start()
+        thread.join()
+        assert other[0] is not conn
+        assert pool._get_conn() is conn
+        pool._put_conn(conn)
+    assert pool._get_conn() is conn
+
+
+def test_session_statistics_without_handshake_auth():
+    library = RequestsLibrary()
+    library.create_session('alias', 'http://mocking.rules')
+    stats = library.get_session_statistics('alias')
+    assert (stats['connections'], stats['requests'], stats['auth_handshakes']) == (0, 0, 0)
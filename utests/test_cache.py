@@ -0,0 +1,304 @@
+import gzip
+import io
+import os
+import stat
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+from urllib3 import HTTPResponse
+
+from RequestsLibrary import RequestsLibrary
+from RequestsLibrary.adapters import LibraryHTTPAdapter
+from RequestsLibrary.cache import (
+    CacheEntry,
+    CachingStream,
+    DiskCacheStore,
+    MemoryCacheStore,
+    create_cache,
+)
+from RequestsLibrary.log import format_cache_status
+from RequestsLibrary.responses import LibraryResponse
+
+URL = 'http://mocking.rules/catalog'
+
+
+def build_entry(headers, body=b'body', vary=None, response_time=None):
+    return CacheEntry(URL, 200, 'OK', headers, body, vary or {}, response_time or time.time())
+
+
+def build_request(method='GET', headers=None):
+    return requests.Request(method, URL, headers=headers).prepare()
+
+
+class FakeServer(object):
+    """Replaces the network of the adapter, answering with the queued status, headers and body."""
+
+    def __init__(self, monkeypatch):
+        self.responses = []
+        self.requests = []
+        monkeypatch.setattr(requests.adapters.HTTPAdapter, 'send',
+                            lambda adapter, request, **kwargs: self.send(adapter, request))
+
+    def queue(self, status, headers=None, body=b''):
+        self.responses.append((status, headers or {}, body))
+
+    def send(self, adapter, request):
+        self.requests.append(request.copy())
+        status, headers, body = self.responses.pop(0)
+        raw = HTTPResponse(io.BytesIO(body), headers=headers, status=status, preload_content=False)
+        return adapter.build_response(request, raw)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    return FakeServer(monkeypatch)
+
+
+@pytest.fixture
+def adapter():
+    return LibraryHTTPAdapter(cache=create_cache('memory'))
+
+
+def send(adapter, method='GET', headers=None):
+    response = adapter.send(build_request(method, headers))
+    response.content
+    return response
+
+
+@pytest.mark.parametrize('headers, lifetime', [
+    ({'Cache-Control': 'public, max-age=60'}, 60),
+    ({'Cache-Control': 'max-age=60', 'Expires': 'Thu, 01 Jan 1970 00:00:00 GMT'}, 60),
+    ({'Date': 'Wed, 21 Oct 2015 07:28:00 GMT', 'Expires': 'Wed, 21 Oct 2015 07:29:00 GMT'}, 60),
+    ({'Date': 'Wed, 21 Oct 2015 07:28:00 GMT', 'Expires': '0'}, 0),
+    ({'Date': 'Wed, 21 Oct 2015 07:28:00 GMT', 'Last-Modified': 'Wed, 21 Oct 2015 07:18:00 GMT'}, 60),
+    ({}, 0),
+])
+def test_freshness_lifetime(headers, lifetime):
+    assert build_entry(headers).freshness_lifetime() == lifetime
+
+
+def test_current_age_includes_age_header():
+    now = time.time()
+    entry = build_entry({'Date': formatdate(now), 'Age': '30'}, response_time=now)
+    assert 39 <= entry.current_age(now + 10) <= 41
+
+
+def test_lookup_fresh_and_stale_entries():
+    cache = create_cache('memory')
+    cache.store.set(URL, build_entry({'Cache-Control': 'max-age=60'}))
+    assert cache.lookup(build_request())[1]
+    assert not cache.lookup(build_request(headers={'Cache-Control': 'no-cache'}))[1]
+    assert not cache.lookup(build_request(headers={'Cache-Control': 'max-age=0'}))[1]
+    cache.store.set(URL, build_entry({'Cache-Control': 'max-age=60'}, response_time=time.time() - 61))
+    entry, fresh = cache.lookup(build_request())
+    assert entry is not None and not fresh
+
+
+def test_lookup_honours_vary():
+    cache = create_cache('memory')
+    cache.store.set(URL, build_entry({'Cache-Control': 'max-age=60'}, vary={'X-Tenant': 'a'}))
+    assert cache.lookup(build_request(headers={'X-Tenant': 'a'}))[1]
+    assert cache.lookup(build_request(headers={'X-Tenant': 'b'})) == (None, False)
+
+
+@pytest.mark.parametrize('status, headers, cacheable', [
+    (200, {'Cache-Control': 'max-age=60'}, True),
+    (200, {'ETag': '"v1"'}, True),
+    (200, {}, False),
+    (200, {'Cache-Control': 'no-store, max-age=60'}, False),
+    (200, {'Cache-Control': 'max-age=60', 'Vary': '*'}, False),
+    (500, {'Cache-Control': 'max-age=60'}, False),
+])
+def test_is_cacheable(status, headers, cacheable):
+    response = requests.Response()
+    response.status_code = status
+    response.headers = requests.structures.CaseInsensitiveDict(headers)
+    assert create_cache('memory').is_cacheable(build_request(), response) == cacheable
+
+
+@pytest.mark.parametrize('headers, cacheable', [
+    ({'Cache-Control': 'max-age=60'}, False),
+    ({'Cache-Control': 'private, max-age=60'}, False),
+    ({'Cache-Control': 'public, max-age=60'}, True),
+    ({'Cache-Control': 'max-age=60, s-maxage=60'}, True),
+    ({'Cache-Control': 'max-age=60, must-revalidate'}, True),
+])
+def test_responses_to_authorized_requests_are_cached_only_when_shareable(headers, cacheable):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers = requests.structures.CaseInsensitiveDict(headers)
+    request = build_request(headers={'Authorization': 'Basic YWxpY2U6c2VjcmV0'})
+    assert create_cache('memory').is_cacheable(request, response) == cacheable
+
+
+@pytest.mark.parametrize('headers, cacheable', [
+    ({'Cache-Control': 'max-age=60'}, False),
+    ({'Cache-Control': 'max-age=60, must-revalidate'}, False),
+    ({'Cache-Control': 'public, max-age=60'}, True),
+])
+def test_responses_to_requests_with_cookies_are_cached_only_when_public(headers, cacheable):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers = requests.structures.CaseInsensitiveDict(headers)
+    request = build_request(headers={'Cookie': 'sid=alice'})
+    assert create_cache('memory').is_cacheable(request, response) == cacheable
+
+
+def test_private_responses_are_not_cached_on_disk(tmp_path):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers = requests.structures.CaseInsensitiveDict({'Cache-Control': 'private, max-age=60'})
+    assert create_cache('memory').is_cacheable(build_request(), response)
+    assert not create_cache('disk', directory=str(tmp_path)).is_cacheable(build_request(), response)
+
+
+def test_authorized_response_is_not_served_to_other_sessions(tmp_path, server):
+    server.queue(200, {'Cache-Control': 'max-age=60'}, b'alice')
+    server.queue(200, {'Cache-Control': 'max-age=60'}, b'bob')
+    alice = LibraryHTTPAdapter(cache=create_cache('disk', directory=str(tmp_path)))
+    bob = LibraryHTTPAdapter(cache=create_cache('disk', directory=str(tmp_path)))
+    send(alice, headers={'Authorization': 'Basic YWxpY2U6c2VjcmV0'})
+    assert send(bob, headers={'Authorization': 'Basic Ym9iOnNlY3JldA=='}).content == b'bob'
+    assert len(server.requests) == 2
+
+
+def test_response_fetched_with_cookies_is_not_served_to_other_sessions(tmp_path, server):
+    server.queue(200, {'Cache-Control': 'max-age=60'}, b'alice')
+    server.queue(200, {'Cache-Control': 'max-age=60'}, b'bob')
+    alice = LibraryHTTPAdapter(cache=create_cache('disk', directory=str(tmp_path)))
+    bob = LibraryHTTPAdapter(cache=create_cache('disk', directory=str(tmp_path)))
+    send(alice, headers={'Cookie': 'sid=alice'})
+    assert send(bob, headers={'Cookie': 'sid=bob'}).content == b'bob'
+    assert len(server.requests) == 2
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryCacheStore(max_bytes=10)
+    store.set('a', build_entry({}, body=b'x' * 4))
+    store.set('b', build_entry({}, body=b'x' * 4))
+    store.get('a')
+    store.set('c', build_entry({}, body=b'x' * 4))
+    assert store.get('b') is None
+    assert store.get('a') is not None and store.get('c') is not None
+    assert store.size == 8
+
+
+def test_disk_store_round_trip_and_eviction(tmp_path):
+    store = DiskCacheStore(str(tmp_path), max_bytes=10)
+    store.set('a', build_entry({'ETag': '"v1"'}, body=b'x' * 6, vary={'Accept': 'text/plain'}))
+    entry = store.get('a')
+    assert entry.body == b'x' * 6
+    assert entry.headers['etag'] == '"v1"'
+    assert entry.vary == {'Accept': 'text/plain'}
+    store.set('b', build_entry({}, body=b'x' * 6))
+    assert len(store) == 1
+    assert store.get('a') is None
+    store.delete('b')
+    assert len(store) == 0
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason='POSIX permissions')
+def test_disk_store_is_readable_by_its_owner_only(tmp_path):
+    directory = str(tmp_path / 'cache')
+    store = DiskCacheStore(directory)
+    store.set('a', build_entry({'ETag': '"v1"'}))
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    for name in os.listdir(directory):
+        assert stat.S_IMODE(os.stat(os.path.join(directory, name)).st_mode) == 0o600
+    # stores of parallel workers may create the directory at the same time
+    DiskCacheStore(directory)
+
+
+def test_caching_stream_skips_too_big_bodies():
+    stored = []
+    raw = HTTPResponse(io.BytesIO(b'x' * 100), preload_content=False)
+    stream = CachingStream(raw, stored.append, max_bytes=50)
+    assert b''.join(stream.stream(10)) == b'x' * 100
+    assert stored == []
+
+
+def test_adapter_serves_fresh_response_from_cache(server, adapter):
+    server.queue(200, {'Cache-Control': 'max-age=60'}, b'catalog')
+    first = send(adapter)
+    second = send(adapter)
+    assert (first.from_cache, first.cache_status) == (False, 'miss')
+    assert (second.from_cache, second.cache_status) == (True, 'hit')
+    assert second.content == b'catalog'
+    assert len(server.requests) == 1
+
+
+def test_cached_compressed_response_is_served_decoded(server, adapter):
+    body = b'catalog' * 100
+    compressed = gzip.compress(body)
+    server.queue(200, {'Cache-Control': 'max-age=60', 'Content-Encoding': 'gzip',
+                       'Content-Length': str(len(compressed))}, compressed)
+    assert send(adapter).content == body
+    cached = send(adapter)
+    assert cached.content == body
+    assert 'Content-Encoding' not in cached.headers
+    assert cached.headers['Content-Length'] == str(len(body))
+
+
+def test_adapter_revalidates_stale_response(server, adapter):
+    server.queue(200, {'ETag': '"v1"', 'Cache-Control': 'no-cache'}, b'catalog')
+    server.queue(304, {'ETag': '"v1"', 'Cache-Control': 'max-age=60'})
+    send(adapter)
+    revalidated = send(adapter)
+    assert server.requests[1].headers['If-None-Match'] == '"v1"'
+    assert revalidated.status_code == 200
+    assert revalidated.cache_status == 'revalidated'
+    assert revalidated.content == b'catalog'
+    assert revalidated.headers['Cache-Control'] == 'max-age=60'
+    assert send(adapter).cache_status == 'hit'
+
+
+def test_adapter_replaces_changed_response(server, adapter):
+    server.queue(200, {'ETag': '"v1"'}, b'old')
+    server.queue(200, {'ETag': '"v2"'}, b'new')
+    server.queue(304, {'ETag': '"v2"'})
+    send(adapter)
+    assert send(adapter).content == b'new'
+    assert send(adapter).content == b'new'
+    assert server.requests[2].headers['If-None-Match'] == '"v2"'
+
+
+def test_adapter_unsafe_request_invalidates_response(server, adapter):
+    server.queue(200, {'Cache-Control': 'max-age=60'}, b'catalog')
+    server.queue(204)
+    server.queue(200, {'Cache-Control': 'max-age=60'}, b'updated')
+    send(adapter)
+    send(adapter, 'PUT')
+    assert send(adapter).content == b'updated'
+
+
+def test_adapter_does_not_store_unread_body(server, adapter):
+    server.queue(200, {'Cache-Control': 'max-age=60'}, b'catalog')
+    server.queue(200, {'Cache-Control': 'max-age=60'}, b'catalog')
+    adapter.send(build_request()).close()
+    assert not send(adapter).from_cache
+
+
+def test_create_cache():
+    assert create_cache(None) is None
+    assert create_cache('NONE') is None
+    assert isinstance(create_cache('Memory').store, MemoryCacheStore)
+    with pytest.raises(ValueError, match='valid values are: memory, disk'):
+        create_cache('redis')
+
+
+def test_session_cache_option(tmp_path):
+    session = RequestsLibrary().create_session(
+        'alias', 'http://mocking.rules', cache='disk', cache_max_bytes='1000', cache_dir=str(tmp_path))
+    adapter = session.get_adapter('http://mocking.rules')
+    assert adapter.cache is session.cache
+    assert session.cache.store.directory == str(tmp_path)
+    assert session.cache.store.max_bytes == 1000
+
+
+def test_format_cache_status():
+    response = LibraryResponse()
+    assert format_cache_status(response) == ''
+    response.cache_status = 'hit'
+    assert format_cache_status(response) == 'cache=hit \n '
@@ -0,0 +1,175 @@
+import gzip
+import io
+import os
+
+import pytest
+import requests
+from urllib3.response import HTTPResponse
+
+from RequestsLibrary import RequestsLibrary
+from RequestsLibrary.cassette import Cassette, body_hash, create_cassette, parse_cassette_match
+from RequestsLibrary.exceptions import RecordedResponseNotFound
+from utests import mock
+
+
+def build_response(request, content=b'{"id": 1}', status=200):
+    response = requests.Response()
+    response.status_code = status
+    response.reason = 'OK'
+    response.url = request.url
+    response.headers = requests.structures.CaseInsensitiveDict({'Content-Type': 'application/json'})
+    response._content = content
+    response.request = request
+    return response
+
+
+def build_library(tmp_path, mode, match=None):
+    library = RequestsLibrary(cassette_mode=mode, cassette_dir=str(tmp_path), cassette_match=match)
+    session = library.create_session('alias', 'http://mocking.rules')
+
+    def send(method, url, **kwargs):
+        request = session.prepare_request(requests.Request(
+            method.upper(), url, data=kwargs.get('data'), json=kwargs.get('json'),
+            files=kwargs.get('files'), headers=kwargs.get('headers'), params=kwargs.get('params')))
+        return build_response(request, kwargs.pop('content', b'{"id": 1}'))
+
+    session.request = mock.MagicMock(side_effect=send)
+    return library, session
+
+
+@pytest.mark.parametrize('match, rules', [
+    (None, ['method', 'url', 'body']),
+    ('url, Header:X-Tenant', ['url', 'header:x-tenant']),
+    (['METHOD'], ['method']),
+])
+def test_parse_cassette_match(match, rules):
+    assert parse_cassette_match(match) == rules
+
+
+def test_parse_unknown_cassette_match():
+    with pytest.raises(ValueError, match='valid values are: method, url, body and header:<name>'):
+        parse_cassette_match('url,query')
+
+
+def test_create_cassette():
+    assert create_cassette(None) is None
+    assert create_cassette('PassThrough') is None
+    assert create_cassette('record').recording
+    with pytest.raises(ValueError, match='valid values are: record, replay, passthrough'):
+        create_cassette('live')
+
+
+def test_body_hash_ignores_multipart_boundary():
+    first = requests.Request('POST', 'http://mocking.rules', files={'file': ('a.txt', b'abc')}).prepare()
+    second = requests.Request('POST', 'http://mocking.rules', files={'file': ('a.txt', b'abc')}).prepare()
+    assert first.body != second.body
+    assert body_hash(first) == body_hash(second)
+    stream = requests.Request('POST', 'http://mocking.rules', data=io.BytesIO(b'abc')).prepare()
+    assert body_hash(stream) == 'stream'
+
+
+def test_record_and_replay(tmp_path):
+    recorder, _ = build_library(tmp_path, 'record')
+    recorder.post_on_session('alias', '/items', json={'id': 1})
+    assert len(os.listdir(str(tmp_path))) == 1
+
+    player, session = build_library(tmp_path, 'replay')
+    response = player.post_on_session('alias', '/items', json={'id': 1})
+    session.request.assert_not_called()
+    assert response.json() == {'id': 1}
+    assert response.request.method == 'POST'
+    with pytest.raises(RecordedResponseNotFound, match='POST http://mocking.rules/items'):
+        player.post_on_session('alias', '/items', json={'id': 2})
+
+
+def test_replay_in_recorded_order(tmp_path):
+    recorder, session = build_library(tmp_path, 'record')
+    for content in (b'"first"', b'"second"'):
+        session.request.side_effect = lambda method, url, content=content, **kwargs: build_response(
+            requests.Request(method.upper(), url).prepare(), content)
+        recorder.get_on_session('alias', '/state')
+
+    player, _ = build_library(tmp_path, 'replay')
+    assert [player.get_on_session('alias', '/state').json() for _ in range(3)] == ['first', 'second', 'second']
+
+
+def test_replay_matches_selected_headers(tmp_path):
+    recorder, _ = build_library(tmp_path, 'record', match='method,url,header:X-Tenant')
+    recorder.get_on_session('alias', '/config', headers={'X-Tenant': 'a'})
+    player, _ = build_library(tmp_path, 'replay', match='method,url,header:X-Tenant')
+    player.get_on_session('alias', '/config', headers={'X-Tenant': 'a'})
+    with pytest.raises(RecordedResponseNotFound):
+        player.get_on_session('alias', '/config', headers={'X-Tenant': 'b'})
+
+
+def test_cassette_loads_only_requested_keys(tmp_path):
+    cassette = Cassette(str(tmp_path), 'record')
+    for path in ('/a', '/b'):
+        request = requests.Request('GET', 'http://mocking.rules' + path).prepare()
+        cassette.record(build_response(request))
+    player = Cassette(str(tmp_path), 'replay')
+    response = player.play(requests.Request('GET', 'http://mocking.rules/a').prepare())
+    assert response.content == b'{"id": 1}'
+    assert len(player._responses) == 1
+
+
+def test_binary_bodies_are_recorded(tmp_path):
+    cassette = Cassette(str(tmp_path), 'record')
+    request = requests.Request('GET', 'http://mocking.rules/bytes').prepare()
+    cassette.record(build_response(request, content=b'\xff\x00\xfe'))
+    response = Cassette(str(tmp_path), 'replay').play(request)
+    assert response.content == b'\xff\x00\xfe'
+
+
+def test_streamed_responses_are_not_recorded(tmp_path):
+    recorder, _ = build_library(tmp_path, 'record')
+    with mock.patch('RequestsLibrary.RequestsKeywords.logger') as logger:
+        recorder.get_on_session('alias', '/export', stream=True)
+    assert os.listdir(str(tmp_path)) == []
+    assert 'body is streamed' in logger.warn.call_args[0][0]
+
+
+def test_replayed_response_runs_request_hooks(tmp_path):
+    recorder, _ = build_library(tmp_path, 'record')
+    recorder.get_on_session('alias', '/items')
+    player, _ = build_library(tmp_path, 'replay')
+    seen = []
+    player.get_on_session('alias', '/items', hooks={'response': lambda response, **kwargs: seen.append(response)})
+    assert len(seen) == 1 and seen[0].json() == {'id': 1}
+
+
+def test_replayed_gzip_response_is_described_as_decoded(tmp_path):
+    body = b'{"id": 1, "name": "compressed"}'
+    compressed = gzip.compress(body)
+    recorder, session = build_library(tmp_path, 'record')
+
+    def send(method, url, **kwargs):
+        headers = {'Content-Type': 'application/json', 'Content-Encoding': 'gzip',
+                   'Content-Length': str(len(compressed))}
+        response = build_response(requests.Request(method.upper(), url).prepare(), content=False)
+        response.headers = requests.structures.CaseInsensitiveDict(headers)
+        response.raw = HTTPResponse(io.BytesIO(compressed), headers=headers, preload_content=False)
+        return response
+
+    session.request.side_effect = send
+    assert recorder.get_on_session('alias', '/items').content == body
+
+    player, _ = build_library(tmp_path, 'replay')
+    response = player.get_on_session('alias', '/items')
+    assert response.content == body
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Content-Length'] == str(len(body))
+
+
+def test_oauth2_session_replays_without_fetching_a_token(tmp_path):
+    recorder, _ = build_library(tmp_path, 'record')
+    recorder.get_on_session('alias', '/items')
+
+    player = RequestsLibrary(cassette_mode='replay', cassette_dir=str(tmp_path))
+    session = player.create_oauth2_session(
+        'alias', 'http://mocking.rules', 'http://unreachable.invalid/token', 'client', 'secret')
+    session.request = mock.MagicMock()
+    with mock.patch('RequestsLibrary.oauth2.requests.post') as post:
+        response = player.get_on_session('alias', '/items')
+    post.assert_not_called()
+    assert response.json() == {'id': 1}
@@ -0,0 +1,111 @@
+import socket
+
+import pytest
+from requests.exceptions import ConnectionError
+
+from RequestsLibrary import RequestsLibrary
+from RequestsLibrary.circuit import CircuitBreaker, parse_cooldown, parse_threshold
+from RequestsLibrary.exceptions import CircuitOpenError
+
+URL = 'http://mocking.rules:8080/items?page=1'
+
+
+def fail(breaker, now, failed=True):
+    breaker.after_request(breaker.before_request(URL, now=now), failed, now=now)
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(threshold=3, cooldown=10)
+    fail(breaker, 0)
+    fail(breaker, 0, failed=False)
+    fail(breaker, 0)
+    fail(breaker, 0)
+    assert breaker.statistics()['http://mocking.rules:8080']['state'] == 'closed'
+    fail(breaker, 0)
+    with pytest.raises(CircuitOpenError, match='mocking.rules:8080 is open after 3 consecutive failures'):
+        breaker.before_request(URL, now=5)
+    assert breaker.statistics()['http://mocking.rules:8080'] == {
+        'state': 'open', 'failures': 3, 'opened': 1, 'rejected': 1}
+
+
+def test_circuit_lets_a_single_probe_through_after_cooldown():
+    breaker = CircuitBreaker(threshold=1, cooldown=10)
+    fail(breaker, 0)
+    host = breaker.before_request(URL, now=10)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(URL, now=10)
+    breaker.after_request(host, False, now=10)
+    assert breaker.statistics()[host]['state'] == 'closed'
+    breaker.before_request(URL, now=10)
+
+
+def test_failed_probe_opens_circuit_again():
+    breaker = CircuitBreaker(threshold=2, cooldown=10)
+    fail(breaker, 0)
+    fail(breaker, 0)
+    fail(breaker, 10)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(URL, now=19)
+    assert breaker.statistics()['http://mocking.rules:8080']['opened'] == 2
+
+
+def test_unrelated_error_releases_probe():
+    breaker = CircuitBreaker(threshold=1, cooldown=10)
+    fail(breaker, 0)
+    fail(breaker, 10, failed=None)
+    assert breaker.before_request(URL, now=10) == 'http://mocking.rules:8080'
+
+
+def test_hosts_have_their_own_circuit():
+    breaker = CircuitBreaker(threshold=1)
+    fail(breaker, 0)
+    breaker.before_request('https://other.rules/items', now=0)
+
+
+@pytest.mark.parametrize('value, threshold', [(None, None), ('', None), ('none', None), ('3', 3), (5, 5), (' 2 ', 2)])
+def test_parse_threshold(value, threshold):
+    assert parse_threshold(value) == threshold
+
+
+@pytest.mark.parametrize('value', ['three', '2.5', '-1', '0'])
+def test_parse_invalid_threshold(value):
+    with pytest.raises(ValueError, match='circuit_breaker must be a .*number of consecutive failures'):
+        parse_threshold(value)
+
+
+@pytest.mark.parametrize('value, seconds', [(None, 30.0), ('', 30.0), ('2.5', 2.5), (0, 0.0)])
+def test_parse_cooldown(value, seconds):
+    assert parse_cooldown(value) == seconds
+
+
+def test_parse_invalid_cooldown():
+    with pytest.raises(ValueError, match='circuit_breaker_cooldown must be a number'):
+        parse_cooldown('soon')
+
+
+def closed_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_session_fails_fast_when_circuit_is_open():
+    library = RequestsLibrary()
+    url = 'http://127.0.0.1:%s' % closed_port()
+    session = library.create_session('alias', url, max_retries=0, circuit_breaker='2')
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            library.get_on_session('alias', '/')
+    with pytest.raises(CircuitOpenError):
+        library.get_on_session('alias', '/')
+    assert session.retry_stats.requests == 2
+    stats = library.get_session_statistics('alias')['circuit_breaker'][url]
+    assert (stats['state'], stats['rejected']) == ('open', 1)
+
+
+def test_session_without_circuit_breaker():
+    session = RequestsLibrary().create_session('alias', 'http://mocking.rules')
+    assert session.circuit_breaker is None
+    assert session.get_adapter('http://mocking.rules').circuit_breaker is None
@@ -0,0 +1,82 @@
+import io
+import zlib
+
+import pytest
+
+from RequestsLibrary import compression
+from RequestsLibrary.compression import CompressedStream, compress_bytes, parse_compression
+
+BODY = b'{"key": "value"}' * 10000
+
+
+def decompress(data, encoding):
+    if encoding == 'gzip':
+        return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return zlib.decompress(data)
+    return compression.zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+@pytest.mark.parametrize('value, expected', [
+    (None, None), ('', None), ('None', None), (False, None), ('GZIP', 'gzip'), ('deflate', 'deflate')])
+def test_parse_compression(value, expected):
+    assert parse_compression(value) == expected
+
+
+def test_parse_unknown_compression():
+    with pytest.raises(ValueError, match='valid values are: gzip, deflate, zstd'):
+        parse_compression('br')
+
+
+def test_parse_zstd_compression_without_zstandard(monkeypatch):
+    monkeypatch.setattr(compression, 'zstandard', None)
+    monkeypatch.setattr(compression, 'zstd', None)
+    with pytest.raises(AssertionError, match='zstandard module not installed'):
+        parse_compression('zstd')
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'deflate'])
+def test_compress_bytes(encoding):
+    compressed = compress_bytes(BODY, encoding)
+    assert len(compressed) < len(BODY)
+    assert decompress(compressed, encoding) == BODY
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'deflate'])
+@pytest.mark.parametrize('size', [1, 1000, -1])
+def test_compressed_stream_of_file(encoding, size):
+    stream = CompressedStream(io.BytesIO(BODY), encoding, chunk_size=4096)
+    chunks = []
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    assert decompress(b''.join(chunks), encoding) == BODY
+    assert stream.read_bytes == len(BODY)
+    assert stream.sent_bytes == len(b''.join(chunks))
+
+
+def test_compressed_stream_of_iterable():
+    stream = CompressedStream(iter([b'abc', 'déf', b'']), 'gzip')
+    assert decompress(stream.read(), 'gzip') == 'abcdéf'.encode('utf-8')
+
+
+def test_compressed_stream_of_text_file(tmp_path):
+    path = tmp_path / 'body.txt'
+    path.write_text('caffè latte\n' * 1000, encoding='utf-8')
+    with open(str(path), encoding='utf-8') as file:
+        stream = CompressedStream(file, 'gzip', chunk_size=100)
+        assert decompress(stream.read(), 'gzip') == ('caffè latte\n' * 1000).encode('utf-8')
+
+
+def test_compressed_stream_is_a_file_descriptor_for_logging():
+    stream = CompressedStream(io.BytesIO(BODY), 'gzip')
+    assert isinstance(stream, io.IOBase)
+    assert repr(stream).startswith('<gzip compressed stream of')
+
+
+def test_zstd_compression():
+    pytest.importorskip('zstandard')
+    assert decompress(compress_bytes(BODY, 'zstd'), 'zstd') == BODY
+    assert decompress(CompressedStream(io.BytesIO(BODY), 'zstd').read(), 'zstd') == BODY
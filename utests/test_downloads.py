@@ -0,0 +1,223 @@
+import hashlib
+import io
+import os
+
+import pytest
+import requests
+from urllib3.response import HTTPResponse
+
+from RequestsLibrary import RequestsLibrary
+from RequestsLibrary.downloads import (
+    RANGES_STATE_SUFFIX,
+    download_ranges_to_file,
+    download_to_file,
+    parse_hash_algorithms,
+    split_ranges,
+    supports_ranges,
+)
+from RequestsLibrary.exceptions import InvalidResponse
+from utests import mock
+
+BODY = b'0123456789' * 1000
+
+
+def build_streamed_response(chunks):
+    response = mock.MagicMock()
+    response.status_code = 200
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+def test_download_to_file_hashes_while_writing(tmp_path):
+    path = str(tmp_path / 'sub' / 'body.bin')
+    response = build_streamed_response([BODY[:4000], BODY[4000:]])
+    result = download_to_file(response, path)
+    with open(path, 'rb') as file:
+        assert file.read() == BODY
+    assert result.size == len(BODY)
+    assert result.sha256 == hashlib.sha256(BODY).hexdigest()
+    assert result.md5 == hashlib.md5(BODY).hexdigest()
+    assert result.status_code == 200
+    response.close.assert_called_once_with()
+
+
+def test_download_to_file_without_hashing(tmp_path):
+    path = str(tmp_path / 'body.bin')
+    result = download_to_file(build_streamed_response([BODY]), path, '')
+    assert result.hashes == {}
+    assert result.sha256 is None
+
+
+def test_download_to_file_failure_removes_partial_file(tmp_path):
+    def broken_body():
+        yield BODY
+        raise IOError('connection reset')
+
+    path = str(tmp_path / 'body.bin')
+    response = build_streamed_response(broken_body())
+    with pytest.raises(IOError):
+        download_to_file(response, path)
+    assert os.listdir(str(tmp_path)) == []
+    response.close.assert_called_once_with()
+
+
+def test_download_to_file_invalid_algorithm_closes_response(tmp_path):
+    response = build_streamed_response([BODY])
+    with pytest.raises(ValueError, match="Unknown hash algorithm 'sha0'"):
+        download_to_file(response, str(tmp_path / 'body.bin'), 'sha0')
+    assert os.listdir(str(tmp_path)) == []
+    response.close.assert_called_once_with()
+
+
+def test_download_file_on_session_invalid_algorithm_sends_nothing(tmp_path):
+    library = RequestsLibrary()
+    session = library.create_session('alias', 'http://mocking.rules')
+    session.request = mock.MagicMock()
+    with pytest.raises(ValueError, match='Unknown hash algorithm'):
+        library.download_file_on_session('alias', '/export', str(tmp_path / 'export.zip'), 'sha0')
+    session.request.assert_not_called()
+
+
+def test_parse_hash_algorithms():
+    assert parse_hash_algorithms(None) == ['sha256', 'md5']
+    assert parse_hash_algorithms(' SHA1, sha512 ') == ['sha1', 'sha512']
+    assert parse_hash_algorithms(['sha256']) == ['sha256']
+    with pytest.raises(ValueError):
+        parse_hash_algorithms('not-a-hash')
+
+
+def build_ranges_response(headers=None):
+    response = mock.MagicMock()
+    response.status_code = 200
+    response.url = 'http://mocking.rules/bytes'
+    response.headers = {'Accept-Ranges': 'bytes', 'Content-Length': str(len(BODY)), 'ETag': '"v1"'}
+    response.headers.update(headers or {})
+    return response
+
+
+def build_range_fetcher(fail_ranges=(), status_code=206):
+    fetched = []
+
+    def fetch_range(first, last):
+        fetched.append((first, last))
+        if first in fail_ranges:
+            raise IOError('connection reset')
+        response = build_streamed_response([BODY[first:last + 1]] if status_code == 206 else [BODY])
+        response.status_code = status_code
+        return response
+
+    fetch_range.fetched = fetched
+    return fetch_range
+
+
+def test_split_ranges():
+    assert split_ranges(10, 4) == [[0, 3], [4, 7], [8, 9]]
+    assert split_ranges(8, 4) == [[0, 3], [4, 7]]
+
+
+def test_supports_ranges():
+    assert supports_ranges(build_ranges_response())
+    assert not supports_ranges(build_ranges_response({'Accept-Ranges': 'none'}))
+    assert not supports_ranges(build_ranges_response({'Content-Length': ''}))
+    assert not supports_ranges(build_ranges_response({'Content-Encoding': 'gzip'}))
+
+
+def test_download_ranges_to_file(tmp_path):
+    path = str(tmp_path / 'body.bin')
+    fetch_range = build_range_fetcher()
+    result = download_ranges_to_file(build_ranges_response(), path, fetch_range, 3, range_size=3000)
+    with open(path, 'rb') as file:
+        assert file.read() == BODY
+    assert sorted(fetch_range.fetched) == [(0, 2999), (3000, 5999), (6000, 8999), (9000, 9999)]
+    assert result.size == len(BODY)
+    assert result.sha256 == hashlib.sha256(BODY).hexdigest()
+    assert os.listdir(str(tmp_path)) == ['body.bin']
+
+
+def test_download_ranges_to_file_resumes_after_failure(tmp_path):
+    path = str(tmp_path / 'body.bin')
+    with pytest.raises(IOError):
+        download_ranges_to_file(
+            build_ranges_response(), path, build_range_fetcher(fail_ranges=(3000,)), 1, range_size=3000
+        )
+    assert not os.path.exists(path)
+    assert os.path.exists(path + RANGES_STATE_SUFFIX)
+
+    fetch_range = build_range_fetcher()
+    # a different number of connections keeps the ranges of the first attempt
+    result = download_ranges_to_file(build_ranges_response(), path, fetch_range, 4)
+    assert (0, 2999) not in fetch_range.fetched
+    assert (3000, 5999) in fetch_range.fetched
+    assert result.resumed_bytes == 3000
+    with open(path, 'rb') as file:
+        assert file.read() == BODY
+    assert not os.path.exists(path + RANGES_STATE_SUFFIX)
+
+
+def test_download_ranges_to_file_restarts_when_resource_changed(tmp_path):
+    path = str(tmp_path / 'body.bin')
+    with pytest.raises(IOError):
+        download_ranges_to_file(
+            build_ranges_response(), path, build_range_fetcher(fail_ranges=(3000,)), 1, range_size=3000
+        )
+    fetch_range = build_range_fetcher()
+    result = download_ranges_to_file(
+        build_ranges_response({'ETag': '"v2"'}), path, fetch_range, 2, range_size=3000
+    )
+    assert (0, 2999) in fetch_range.fetched
+    assert result.resumed_bytes == 0
+
+
+def test_download_ranges_to_file_fails_when_range_is_ignored(tmp_path):
+    path = str(tmp_path / 'body.bin')
+    with pytest.raises(InvalidResponse):
+        download_ranges_to_file(
+            build_ranges_response(), path, build_range_fetcher(status_code=200), 2, range_size=3000
+        )
+
+
+def test_range_fetcher_applies_library_timeout_and_cookies():
+    library = RequestsLibrary()
+    session = library.create_session('alias', 'http://mocking.rules', timeout=5, cookies={'sid': '1'})
+    session.request = mock.MagicMock()
+    fetch_range = library._range_fetcher(session, build_ranges_response(), {'stream': True, 'headers': {'X': '1'}})
+    fetch_range(0, 99)
+    session.request.assert_called_once_with(
+        'GET', 'http://mocking.rules/bytes', headers={'X': '1', 'If-Range': '"v1"', 'Range': 'bytes=0-99'},
+        stream=True, timeout=5.0, cookies={'sid': '1'})
+    fetch_range = library._range_fetcher(session, build_ranges_response(), {'timeout': 1, 'cookies': {}})
+    fetch_range(0, 99)
+    assert session.request.call_args[1]['timeout'] == 1.0
+    assert session.request.call_args[1]['cookies'] == {}
+
+
+def test_parallel_download_with_library_options(tmp_path):
+    library = RequestsLibrary()
+    session = library.create_session('alias', 'http://mocking.rules')
+
+    def send(method, url, headers=None, **kwargs):
+        response = requests.Response()
+        response.url = url
+        response.request = requests.Request(method, url).prepare()
+        if headers and 'Range' in headers:
+            first, last = (int(position) for position in headers['Range'][6:].split('-'))
+            body = BODY[first:last + 1]
+            response.status_code = 206
+        else:
+            body = BODY
+            response.status_code = 200
+        response.headers = requests.structures.CaseInsensitiveDict(
+            {'Accept-Ranges': 'bytes', 'Content-Length': str(len(body)), 'ETag': '"v1"'})
+        response.raw = HTTPResponse(io.BytesIO(body), preload_content=False)
+        return response
+
+    session.request = mock.MagicMock(side_effect=send)
+    path = str(tmp_path / 'body.bin')
+    result = library.download_file_on_session(
+        'alias', '/bytes', path, connections=4, max_response_bytes=len(BODY), spill_threshold=100,
+        compress_request=None)
+    assert result.connections > 1
+    assert result.sha256 == hashlib.sha256(BODY).hexdigest()
+    for call in session.request.call_args_list[1:]:
+        assert 'max_response_bytes' not in call[1]
+        assert 'spill_threshold' not in call[1]
@@ -0,0 +1,111 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from RequestsLibrary import RequestsLibrary
+from RequestsLibrary.hedging import parse_hedge_after
+
+
+class SlowFirstHandler(BaseHTTPRequestHandler):
+    """Answers the first request after ``server.delay`` seconds and the next ones at once."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def _answer(self):
+        with self.server.lock:
+            number = len(self.server.requests)
+            self.server.requests.append((self.command, self.client_address))
+        if number == 0:
+            time.sleep(self.server.delay)
+        body = ('%s' % number).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _answer
+
+    def handle(self):
+        try:
+            super(SlowFirstHandler, self).handle()
+        except OSError:
+            # connection of a cancelled request
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(local_server):
+    server = local_server(SlowFirstHandler)
+    server.daemon_threads = True
+    server.delay = 2
+    server.lock = threading.Lock()
+    server.requests = []
+    return server
+
+
+@pytest.mark.parametrize('value, seconds', [(None, None), ('', None), ('none', None), ('0.2', 0.2), (1, 1.0)])
+def test_parse_hedge_after(value, seconds):
+    assert parse_hedge_after(value) == seconds
+
+
+@pytest.mark.parametrize('value', ['soon', '-1'])
+def test_parse_invalid_hedge_after(value):
+    with pytest.raises(ValueError, match='hedge_after must be a'):
+        parse_hedge_after(value)
+
+
+def test_slow_request_is_hedged(server):
+    library = RequestsLibrary()
+    library.create_session('alias', server.url, hedge_after='0.1', max_retries=3, backoff_factor=1)
+    start = time.monotonic()
+    response = library.get_on_session('alias', '/slow')
+    assert time.monotonic() - start < server.delay
+    assert response.text == '1'
+    # the duplicate is sent on another connection and the cancelled request is not retried
+    time.sleep(0.2)
+    assert len(server.requests) == 2
+    assert server.requests[0][1] != server.requests[1][1]
+    assert library.get_session_statistics('alias')['hedging'] == {
+        'requests': 1, 'hedged': 1, 'hedge_wins': 1, 'budget_exhausted': 0, 'hedge_rate': 1.0}
+    # nor is it counted as a retry
+    assert library.get_session_statistics('alias')['retries']['retries'] == 0
+
+
+def test_fast_request_is_not_hedged(server):
+    server.delay = 0
+    library = RequestsLibrary()
+    library.create_session('alias', server.url, hedge_after=1)
+    assert library.get_on_session('alias', '/fast').text == '0'
+    assert len(server.requests) == 1
+    assert library.get_session_statistics('alias')['hedging']['hedged'] == 0
+
+
+def test_non_idempotent_request_is_not_hedged(server):
+    server.delay = 0.3
+    library = RequestsLibrary()
+    library.create_session('alias', server.url, hedge_after=0.05)
+    assert library.post_on_session('alias', '/orders', data='order').text == '0'
+    assert len(server.requests) == 1
+    assert library.get_session_statistics('alias')['hedging']['requests'] == 0
+
+
+def test_hedging_budget(server):
+    server.delay = 0.3
+    library = RequestsLibrary()
+    session = library.create_session('alias', server.url, hedge_after=0.05)
+    session.hedger.budget.ratio = session.hedger.budget.min_retries = 0
+    assert library.get_on_session('alias', '/slow').text == '0'
+    stats = library.get_session_statistics('alias')['hedging']
+    assert (stats['hedged'], stats['budget_exhausted'], stats['hedge_rate']) == (0, 1, 0.0)
+
+
+def test_session_without_hedging():
+    library = RequestsLibrary()
+    session = library.create_session('alias', 'http://mocking.rules')
+    assert session.hedger is None
+    assert 'hedging' not in library.get_session_statistics('alias')
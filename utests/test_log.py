@@ -4,7 +4,13 @@ import pytest
 
 from requests import Request
 
-from RequestsLibrary.log import format_data_to_log_string, log_request, log_response
+from RequestsLibrary.log import (
+    format_data_to_log_string,
+    format_request_body,
+    log_request,
+    log_response,
+)
+from RequestsLibrary.responses import LibraryResponse
 from utests import SCRIPT_DIR
 from utests import mock
 
@@ -163,6 +169,34 @@ def test_log_response(mocked_logger):
                                                   "body=%s \n " % response.text)
 
 
+@mock.patch('RequestsLibrary.log.logger')
+def test_log_response_without_body(mocked_logger):
+    response = mock.MagicMock()
+    response.url = 'http://mock.rulezz'
+    response.request.method = 'GET'
+    response.status_code = 200
+    response.reason = 'OK'
+    response.headers = {'Content-Type': 'application/json'}
+    type(response).text = mock.PropertyMock(side_effect=AssertionError('body must not be read'))
+    log_response(response, log_body=False)
+    assert mocked_logger.info.call_args[0][0].endswith("body=<streamed, not logged> \n ")
+
+
+@mock.patch('RequestsLibrary.log.logger')
+def test_log_response_spilled_body(mocked_logger, tmp_path):
+    response = LibraryResponse()
+    response.url = 'http://mock.rulezz'
+    response.request = Request('GET', response.url).prepare()
+    response.status_code = 200
+    response.reason = 'OK'
+    with open(str(tmp_path / 'body'), 'w+b') as file:
+        file.write(b'x' * 100)
+        response.spill(file)
+        log_response(response)
+    assert mocked_logger.info.call_args[0][0].endswith(
+        "body=<100 bytes spilled to a temporary file, not logged> \n ")
+
+
 def test_format_data_to_log_string_truncated_1():
     data = ''
     for i in range(0, 10000):
@@ -218,3 +252,11 @@ def test_format_data_truncate_info_level(mocked_logger):
     mocked_logger.DEBUG = 10
     truncated = format_data_to_log_string(data)
     assert truncated == data[:10000] + '... (set the log level to DEBUG or TRACE to see the full content)'
+
+
+def test_format_request_body_of_compressed_body():
+    request = Request('POST', 'http://mock.rulezz', data=b'\x1f\x8b\x08\x00',
+                      headers={'Content-Encoding': 'gzip'}).prepare()
+    assert format_request_body(request) == '<gzip compressed body, 4 bytes>'
+    request = Request('POST', 'http://mock.rulezz', data='plain').prepare()
+    assert format_request_body(request) == 'plain'
@@ -0,0 +1,45 @@
+import pytest
+
+from RequestsLibrary import memo
+from RequestsLibrary.memo import ResponseMemo, parse_ttl
+
+
+@pytest.mark.parametrize('value, expected', [(None, None), ('', None), ('None', None), ('30', 30), (0.5, 0.5)])
+def test_parse_ttl(value, expected):
+    assert parse_ttl(value) == expected
+
+
+@pytest.mark.parametrize('value', ['soon', '-1'])
+def test_parse_invalid_ttl(value):
+    with pytest.raises(ValueError, match='cache_ttl must be a'):
+        parse_ttl(value)
+
+
+def test_memo_key_ignores_header_case_and_order():
+    first = ResponseMemo.key('alias', 'http://mocking.rules/?a=1', {'Accept': '*/*', 'X-Tenant': 'a'})
+    second = ResponseMemo.key('alias', 'http://mocking.rules/?a=1', {'x-tenant': 'a', 'accept': '*/*'})
+    assert first == second
+
+
+def test_memo_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(memo.time, 'monotonic', lambda: now[0])
+    responses = ResponseMemo()
+    responses.set('key', 'response', 10)
+    now[0] = 104.0
+    assert responses.get('key') == ('response', 6)
+    now[0] = 110.0
+    assert responses.get('key') == (None, 0)
+    assert len(responses) == 0
+
+
+def test_memo_evicts_least_recently_used():
+    responses = ResponseMemo(max_entries=2)
+    responses.set('a', 'first', 60)
+    responses.set('b', 'second', 60)
+    responses.get('a')
+    responses.set('c', 'third', 60)
+    assert responses.get('b') == (None, 0)
+    assert responses.get('a')[0] == 'first'
+    responses.clear()
+    assert len(responses) == 0
@@ -0,0 +1,75 @@
+import io
+
+import pytest
+import requests
+
+from RequestsLibrary.multipart import StreamingMultipartEncoder
+from utests import mock
+
+DATA = {'field': 'value', 'many': ['1', '2'], 'skipped': None}
+
+
+def build_files():
+    return [
+        ('plain', io.BytesIO(b'0123456789' * 1000)),
+        ('named', ('name.txt', io.BytesIO(b'text'), 'text/plain', {'X-Part': '1'})),
+        ('inline', ('inline.txt', 'inline content')),
+    ]
+
+
+def read_all(encoder, size):
+    chunks = []
+    while True:
+        chunk = encoder.read(size)
+        if not chunk:
+            return b''.join(chunks)
+        chunks.append(chunk)
+
+
+@pytest.mark.parametrize('size', [1, 100, 8192, -1])
+def test_body_is_the_same_as_requests_one(size):
+    with mock.patch('urllib3.filepost.choose_boundary', return_value='boundary'):
+        expected = requests.Request('POST', 'http://mocking.rules', data=DATA, files=build_files()).prepare()
+    encoder = StreamingMultipartEncoder(DATA, build_files(), boundary='boundary')
+    assert encoder.content_type == expected.headers['Content-Type']
+    assert len(encoder) == int(expected.headers['Content-Length'])
+    assert read_all(encoder, size) == expected.body
+
+
+def test_request_is_sent_with_content_length():
+    encoder = StreamingMultipartEncoder(DATA, build_files())
+    request = requests.Request('POST', 'http://mocking.rules', data=encoder).prepare()
+    assert request.headers['Content-Length'] == str(len(encoder))
+    assert 'Transfer-Encoding' not in request.headers
+
+
+def test_rewind_sends_the_body_again():
+    encoder = StreamingMultipartEncoder(DATA, build_files())
+    first = read_all(encoder, 1000)
+    encoder.seek(0)
+    assert read_all(encoder, 333) == first
+    with pytest.raises(io.UnsupportedOperation):
+        encoder.seek(10)
+
+
+def test_shorter_file_fails():
+    file = io.BytesIO(b'12345')
+    encoder = StreamingMultipartEncoder(files={'file': file})
+    file.truncate(2)
+    with pytest.raises(IOError, match='shorter than its expected 5 bytes'):
+        read_all(encoder, 100)
+
+
+def test_string_data_is_not_supported():
+    with pytest.raises(ValueError):
+        StreamingMultipartEncoder('data', {'file': io.BytesIO(b'')})
+
+
+@mock.patch('RequestsLibrary.multipart.logger')
+def test_progress_and_throughput_are_logged(mocked_logger):
+    encoder = StreamingMultipartEncoder(files={'file': io.BytesIO(b'x' * 10000)})
+    read_all(encoder, 1000)
+    assert mocked_logger.debug.call_count == 10
+    assert mocked_logger.debug.call_args[0][0].startswith('Uploaded 100%')
+    mocked_logger.info.assert_called_once()
+    assert 'in 1 parts' in mocked_logger.info.call_args[0][0]
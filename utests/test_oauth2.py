@@ -0,0 +1,169 @@
+import os
+import stat
+import threading
+
+import pytest
+import requests
+
+from RequestsLibrary import RequestsLibrary, oauth2
+from RequestsLibrary.exceptions import OAuth2TokenError
+from RequestsLibrary.oauth2 import DiskTokenStore, OAuth2ClientCredentials, Token
+
+TOKEN_URL = 'http://mocking.rules/oauth/token'
+
+
+class FakeTokenEndpoint(object):
+    """Replaces the token requests, issuing numbered tokens valid for ``expires_in`` seconds."""
+
+    def __init__(self, monkeypatch):
+        self.requests = []
+        self.expires_in = 3600
+        self.status = 200
+        monkeypatch.setattr(oauth2.requests, 'post', self.post)
+
+    def post(self, url, **kwargs):
+        self.requests.append(kwargs)
+        response = requests.Response()
+        response.status_code = self.status
+        if self.status == 200:
+            response._content = (
+                '{"access_token": "token-%s", "expires_in": %s}' % (len(self.requests), self.expires_in)
+            ).encode('utf-8')
+        else:
+            response._content = b'{"error": "invalid_client"}'
+        return response
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    oauth2.clear_tokens()
+    yield FakeTokenEndpoint(monkeypatch)
+    oauth2.clear_tokens()
+
+
+@pytest.mark.parametrize('expires_in, refresh_after', [
+    (3600, 3540),
+    (300, 270),
+    (0, 0),
+])
+def test_token_is_refreshed_before_expiry(expires_in, refresh_after):
+    token = Token.from_response({'access_token': 'abc', 'expires_in': expires_in}, now=1000)
+    assert token.refresh_at == 1000 + refresh_after
+    assert not token.is_valid(now=1000 + refresh_after)
+
+
+def test_token_without_expiry_is_always_valid():
+    assert Token.from_response({'access_token': 'abc'}).is_valid()
+
+
+def test_token_is_shared_by_the_same_client(endpoint):
+    first = OAuth2ClientCredentials(TOKEN_URL, 'client', 'secret', scope=['read', 'write'])
+    second = OAuth2ClientCredentials(TOKEN_URL, 'client', 'secret', scope='read write')
+    other = OAuth2ClientCredentials(TOKEN_URL, 'other', 'secret', scope='read write')
+    assert first.token() == second.token() == 'token-1'
+    assert other.token() == 'token-2'
+    assert endpoint.requests[0]['data'] == {'grant_type': 'client_credentials', 'scope': 'read write'}
+    assert endpoint.requests[0]['auth'] == ('client', 'secret')
+
+
+def test_token_is_not_shared_with_other_token_params(endpoint):
+    first = OAuth2ClientCredentials(TOKEN_URL, 'client', 'secret', token_params={'audience': 'orders'})
+    second = OAuth2ClientCredentials(TOKEN_URL, 'client', 'secret', token_params={'audience': 'billing'})
+    same = OAuth2ClientCredentials(TOKEN_URL, 'client', 'secret', token_params={'audience': 'orders'})
+    body = OAuth2ClientCredentials(TOKEN_URL, 'client', 'secret', token_params={'audience': 'orders'},
+                                   client_auth='body')
+    assert first.token() == same.token() == 'token-1'
+    assert second.token() == 'token-2'
+    assert body.token() == 'token-3'
+
+
+def test_token_is_fetched_once_by_concurrent_requests(endpoint):
+    auth = OAuth2ClientCredentials(TOKEN_URL, 'client', 'secret')
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(auth.token())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert tokens == ['token-1'] * 8
+    assert len(endpoint.requests) == 1
+
+
+def test_expired_and_rejected_tokens_are_refreshed(endpoint):
+    endpoint.expires_in = 0
+    auth = OAuth2ClientCredentials(TOKEN_URL, 'client', 'secret')
+    assert auth.token() == 'token-1'
+    assert auth.token() == 'token-2'
+    endpoint.expires_in = 3600
+    assert auth.token() == 'token-3'
+    assert auth.token(rejected='token-1') == 'token-3'
+    assert auth.token(rejected='token-3') == 'token-4'
+
+
+def test_client_credentials_in_body(endpoint):
+    auth = OAuth2ClientCredentials(
+        TOKEN_URL, 'client', 'secret', token_params={'audience': 'api'}, client_auth='BODY')
+    auth.token()
+    assert endpoint.requests[0]['auth'] is None
+    assert endpoint.requests[0]['data'] == {
+        'grant_type': 'client_credentials', 'audience': 'api', 'client_id': 'client', 'client_secret': 'secret'}
+
+
+def test_unknown_client_auth():
+    with pytest.raises(ValueError, match='valid values are: basic, body'):
+        OAuth2ClientCredentials(TOKEN_URL, 'client', 'secret', client_auth='jwt')
+
+
+def test_token_endpoint_error(endpoint):
+    endpoint.status = 401
+    with pytest.raises(OAuth2TokenError, match='client client from .* failed: 401'):
+        OAuth2ClientCredentials(TOKEN_URL, 'client', 'wrong').token()
+
+
+def test_disk_store_shares_token_between_processes(endpoint, tmp_path):
+    auth = OAuth2ClientCredentials(TOKEN_URL, 'client', 'secret', cache_dir=str(tmp_path))
+    assert auth.token() == 'token-1'
+    # another process starts with an empty memory cache
+    oauth2.clear_tokens()
+    assert OAuth2ClientCredentials(TOKEN_URL, 'client', 'secret', cache_dir=str(tmp_path)).token() == 'token-1'
+    assert len(endpoint.requests) == 1
+    path = os.path.join(str(tmp_path), auth.key + '.json')
+    if os.name == 'posix':
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_disk_store_ignores_invalid_file(tmp_path):
+    store = DiskTokenStore(str(tmp_path))
+    with open(os.path.join(str(tmp_path), 'key.json'), 'w') as file:
+        file.write('{')
+    assert store.get('key') is None
+
+
+def test_rejected_request_is_sent_again_with_new_token(endpoint, monkeypatch):
+    sent = []
+
+    def send(adapter, request, **kwargs):
+        sent.append(request.headers['Authorization'])
+        response = requests.Response()
+        response.status_code = 401 if len(sent) == 1 else 200
+        response._content = b''
+        response.request = request
+        response.connection = adapter
+        return response
+
+    monkeypatch.setattr(requests.adapters.HTTPAdapter, 'send', send)
+    session = requests.Session()
+    session.auth = OAuth2ClientCredentials(TOKEN_URL, 'client', 'secret')
+    response = session.get('http://mocking.rules/protected')
+    assert response.status_code == 200
+    assert sent == ['Bearer token-1', 'Bearer token-2']
+    assert [r.status_code for r in response.history] == [401]
+
+
+def test_create_oauth2_session(endpoint):
+    session = RequestsLibrary().create_oauth2_session(
+        'alias', 'http://mocking.rules', TOKEN_URL, 'client', 'secret', verify='True', timeout='5')
+    assert isinstance(session.auth, OAuth2ClientCredentials)
+    session.auth.token()
+    assert endpoint.requests[0]['verify'] is True
+    assert endpoint.requests[0]['timeout'] == 5.0
@@ -0,0 +1,124 @@
+import json
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from RequestsLibrary import RequestsLibrary
+from RequestsLibrary.polling import PollBackoff, PollCondition
+from RequestsLibrary.responses import LibraryResponse
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def response(status=200, body=None):
+    resp = LibraryResponse()
+    resp.status_code = status
+    resp._content = json.dumps(body).encode('utf-8') if body is not None else b''
+    return resp
+
+
+def test_poll_delays_grow_up_to_max_interval(monkeypatch):
+    monkeypatch.setattr('RequestsLibrary.polling.random.uniform', lambda low, high: high)
+    clock = FakeClock()
+    delays = PollBackoff(timeout=100, interval=1, max_interval=5, backoff=2, clock=clock)
+    assert [delays.next_delay() for _ in range(5)] == [1, 2, 4, 5, 5]
+
+
+def test_poll_delays_have_jitter():
+    delays = PollBackoff(timeout=100, interval=1, max_interval=1, clock=FakeClock())
+    for _ in range(20):
+        assert 0.5 <= delays.next_delay() <= 1
+
+
+def test_poll_delays_end_at_deadline():
+    clock = FakeClock()
+    delays = PollBackoff(timeout=10, interval=8, max_interval=8, clock=clock)
+    clock.now = 9.5
+    assert delays.next_delay() == 0.5
+    clock.now = 10
+    assert delays.next_delay() is None
+    assert delays.elapsed == 10
+
+
+def test_poll_options_are_robot_times():
+    delays = PollBackoff.from_options('1 min', '500ms', '2s', '1.5')
+    assert (delays.deadline - delays.start, delays.interval, delays.max_interval, delays.backoff) == (60, 0.5, 2, 1.5)
+
+
+@pytest.mark.parametrize('condition, resp, matches', [
+    (PollCondition(), response(200), True),
+    (PollCondition(), response(404), False),
+    (PollCondition(status='200, 404'), response(404), True),
+    (PollCondition(status=201), response(200), False),
+    (PollCondition(json_path='$.state'), response(200, {'state': None}), True),
+    (PollCondition(json_path='$.state'), response(200, {}), False),
+    (PollCondition(json_path='$.state'), response(500, {'state': 'done'}), False),
+    (PollCondition(json_path='$.state', expected_value='done'), response(200, {'state': 'done'}), True),
+    (PollCondition(json_path='$.count', expected_value='3'), response(200, {'count': 3}), True),
+    (PollCondition(json_path='$.ready', expected_value='true'), response(200, {'ready': True}), True),
+    (PollCondition(json_path='$.state', expected_value='done'), response(200), False),
+])
+def test_poll_condition(condition, resp, matches):
+    assert condition.matches(resp) is matches
+
+
+def test_poll_condition_description():
+    condition = PollCondition(status='200', json_path='$.state', expected_value='done')
+    assert str(condition) == "status in 200 and $.state == 'done'"
+    assert condition.describe(response(200, {})) == 'status 200, $.state not found'
+
+
+class JobHandler(BaseHTTPRequestHandler):
+    """Job that is done after three requests, answering If-None-Match with 304 while it runs."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get('If-None-Match'))
+        state = 'done' if len(self.server.requests) >= 3 else 'running'
+        etag = '"%s"' % state
+        body = b'' if self.headers.get('If-None-Match') == etag else json.dumps({'state': state}).encode()
+        self.send_response(304 if not body else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(local_server):
+    server = local_server(JobHandler)
+    server.requests = []
+    return server
+
+
+def test_poll_sends_previous_etag(server, monkeypatch):
+    logged = []
+    monkeypatch.setattr('RequestsLibrary.log.log_response', lambda *args: logged.append(args[0]))
+    library = RequestsLibrary()
+    library.create_session('alias', server.url)
+    resp = library.poll_on_session_until(
+        'alias', '/job', json_path='$.state', expected_value='done', poll_interval=0.01)
+    assert resp.json() == {'state': 'done'}
+    assert server.requests == [None, '"running"', '"running"']
+    assert logged == [resp]
+    assert library.last_response is resp
+
+
+def test_poll_fails_after_timeout(server):
+    library = RequestsLibrary()
+    library.create_session('alias', server.url)
+    with pytest.raises(AssertionError, match=r"Condition status in 201 not met after \d+ attempts"):
+        library.poll_on_session_until('alias', '/job', status=201, poll_interval=0.05, poll_timeout=0.2)
+    # the last attempts are answered 304, the last response is the last full one
+    assert server.requests[-1] == '"done"'
+    assert library.last_response.status_code == 200
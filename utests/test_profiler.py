@@ -0,0 +1,76 @@
+import os
+
+from RequestsLibrary import RequestsLibrary
+from RequestsLibrary.profiler import LibraryProfiler
+from utests import mock
+
+
+def build_mocked_session_common_request(profile=False, profile_dir=None):
+    keywords = RequestsLibrary(profile=profile, profile_dir=profile_dir)
+    session = keywords.create_session('alias', 'http://mocking.rules')
+    # this prevents a real network call from being executed
+    session.request = mock.MagicMock()
+    return session, keywords
+
+
+def test_profiler_disabled_collects_nothing():
+    profiler = LibraryProfiler()
+    with profiler.measure('merge_url'):
+        pass
+    assert profiler.get_stats()['phases'] == {}
+
+
+def test_profiler_splits_network_from_library_overhead():
+    profiler = LibraryProfiler()
+    profiler.start()
+    profiler.add('request', 0.5)
+    profiler.add('log_response', 0.25)
+    profiler.add('log_response', 0.25)
+    stats = profiler.get_stats()
+    assert stats['network_ms'] == 500
+    assert stats['library_overhead_ms'] == 500
+    assert stats['phases']['log_response'] == {'calls': 2, 'total_ms': 500, 'mean_ms': 250}
+
+
+def test_profiler_start_resets_stats():
+    profiler = LibraryProfiler()
+    profiler.start()
+    profiler.add('request', 0.5)
+    profiler.start()
+    assert profiler.get_stats()['phases'] == {}
+
+
+def test_common_request_not_profiled_by_default():
+    session, keywords = build_mocked_session_common_request()
+    keywords._common_request('get', session, '/')
+    assert keywords._profiler.get_stats()['requests'] == 0
+
+
+@mock.patch('RequestsLibrary.RequestsKeywords.log')
+def test_common_request_profiled_with_import_option(mocked_log):
+    session, keywords = build_mocked_session_common_request(profile=True)
+    keywords._common_request('get', session, '/')
+    stats = keywords.stop_library_profiling()
+    assert stats['requests'] == 1
+    for phase in ('merge_url', 'request', 'log_request', 'print_debug', 'log_response', 'close_files'):
+        assert stats['phases'][phase]['calls'] == 1
+
+
+@mock.patch('RequestsLibrary.RequestsKeywords.log')
+def test_common_request_dumps_cprofile_stats(mocked_log, tmp_path):
+    session, keywords = build_mocked_session_common_request()
+    keywords.start_library_profiling(str(tmp_path))
+    keywords._common_request('get', session, '/')
+    keywords._common_request('post', session, '/')
+    keywords.stop_library_profiling()
+    assert sorted(os.listdir(str(tmp_path))) == ['0001-GET.prof', '0002-POST.prof']
+
+
+def test_check_status_is_profiled():
+    keywords = RequestsLibrary()
+    keywords.start_library_profiling()
+    response = mock.MagicMock()
+    with mock.patch.object(keywords, '_assert_status') as mocked_assert:
+        keywords._check_status('200', response)
+        mocked_assert.assert_called_with('200', response, None)
+    assert keywords._profiler.get_stats()['phases']['check_status']['calls'] == 1
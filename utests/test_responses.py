@@ -0,0 +1,103 @@
+import json
+
+import pytest
+from requests import HTTPError, Request, Response
+
+from RequestsLibrary import RequestsLibrary
+from RequestsLibrary.exceptions import InvalidResponse
+from RequestsLibrary.responses import (
+    LibraryResponse,
+    ResponseSnapshot,
+    parse_response_retention,
+    retain_response,
+)
+from utests import mock
+
+
+def build_json_response(body):
+    response = Response()
+    response._content = json.dumps(body).encode('utf-8')
+    response.encoding = 'utf-8'
+    response.status_code = 200
+    return LibraryResponse.wrap(response)
+
+
+def test_wrap_keeps_response_instance():
+    response = build_json_response({'a': 1})
+    assert isinstance(response, LibraryResponse)
+    assert isinstance(response, Response)
+
+
+def test_wrap_ignores_other_objects():
+    response = mock.MagicMock()
+    assert LibraryResponse.wrap(response) is response
+    assert not isinstance(response, LibraryResponse)
+
+
+def test_json_is_parsed_only_once():
+    response = build_json_response({'a': [1, 2]})
+    with mock.patch('requests.models.complexjson.loads', wraps=json.loads) as mocked_loads:
+        first = response.json()
+        second = response.json()
+    assert first == {'a': [1, 2]}
+    assert first is second
+    assert mocked_loads.call_count == 1
+
+
+def test_json_with_arguments_is_not_cached():
+    response = build_json_response({'a': 1.5})
+    assert response.json(parse_float=str) == {'a': '1.5'}
+    assert response.json() == {'a': 1.5}
+
+
+def build_full_response(status_code=200):
+    response = build_json_response({'big': 'x' * 1000})
+    response.status_code = status_code
+    response.reason = 'OK' if status_code == 200 else 'Not Found'
+    response.url = 'http://mocking.rules/big'
+    response.headers['Content-Type'] = 'application/json'
+    response.request = Request('POST', response.url, data='body').prepare()
+    response.history = [build_json_response({})]
+    return response
+
+
+def test_snapshot_drops_body_and_history():
+    snapshot = ResponseSnapshot.of(build_full_response())
+    assert snapshot.status_code == 200
+    assert snapshot.headers['Content-Type'] == 'application/json'
+    assert snapshot.request.method == 'POST'
+    assert snapshot.request.body is None
+    assert snapshot.content is None
+    assert snapshot.text == ''
+    assert snapshot.history == []
+
+
+def test_retain_response():
+    response = build_full_response()
+    assert retain_response(response, 'full') is response
+    assert isinstance(retain_response(response, 'headers-only'), ResponseSnapshot)
+    assert retain_response(response, 'none') is None
+
+
+def test_parse_response_retention():
+    assert parse_response_retention(None) == 'full'
+    assert parse_response_retention('Headers-Only') == 'headers-only'
+    with pytest.raises(ValueError):
+        parse_response_retention('body-only')
+
+
+def test_status_assertions_work_on_snapshots():
+    keywords = RequestsLibrary(response_retention='headers-only')
+    keywords.last_response = retain_response(build_full_response(), keywords._response_retention)
+    keywords.status_should_be('200')
+    keywords.request_should_be_successful()
+    keywords.last_response = retain_response(build_full_response(404), keywords._response_retention)
+    with pytest.raises(HTTPError):
+        keywords.request_should_be_successful()
+
+
+def test_status_assertions_without_retained_response():
+    keywords = RequestsLibrary(response_retention='none')
+    with pytest.raises(InvalidResponse, match='response_retention=none'):
+        keywords.status_should_be('200')
+    keywords.status_should_be('200', build_full_response())
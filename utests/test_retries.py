@@ -0,0 +1,106 @@
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+from requests.exceptions import RetryError
+
+from RequestsLibrary import RequestsLibrary
+from RequestsLibrary.log import format_retries
+from RequestsLibrary.responses import LibraryResponse
+from RequestsLibrary.retries import RetryBudget, parse_retry_budget
+
+
+class QueuedHandler(BaseHTTPRequestHandler):
+    """Answers with the queued statuses and headers, the last one is repeated."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        responses = self.server.responses
+        status, headers = responses.pop(0) if len(responses) > 1 else responses[0]
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(local_server):
+    server = local_server(QueuedHandler)
+    server.responses = [(200, {})]
+    return server
+
+
+@pytest.mark.parametrize('value, ratio', [
+    (None, None),
+    ('none', None),
+    ('0.1', 0.1),
+    ('10%', 0.1),
+    (0.25, 0.25),
+])
+def test_parse_retry_budget(value, ratio):
+    assert parse_retry_budget(value) == ratio
+
+
+@pytest.mark.parametrize('value', ['ten', '150%', '-0.1'])
+def test_parse_invalid_retry_budget(value):
+    with pytest.raises(ValueError, match='retry_budget must be'):
+        parse_retry_budget(value)
+
+
+def test_retry_budget_window():
+    budget = RetryBudget(0.2, min_retries=1, window=10)
+    for _ in range(10):
+        budget.record_request(now=0)
+    assert budget.acquire(now=1)
+    assert budget.acquire(now=1)
+    assert not budget.acquire(now=1)
+    # the requests and retries of the window are forgotten, the minimum is allowed again
+    assert budget.acquire(now=11)
+    assert not budget.acquire(now=11)
+
+
+def test_retried_requests_are_counted(server):
+    server.responses = [(503, {}), (503, {}), (200, {})]
+    library = RequestsLibrary()
+    library.create_session('alias', server.url, max_retries=3, backoff_factor=0.01, retry_status_list=[503])
+    response = library.get_on_session('alias', '/flaky?page=1')
+    assert (response.status_code, response.retries) == (200, 2)
+    assert response.retry_seconds > 0
+    stats = library.get_session_statistics('alias')['retries']
+    assert (stats['requests'], stats['retried_requests'], stats['recovered_requests'], stats['retries']) == (1, 1, 1, 2)
+    assert stats['endpoints']['GET /flaky']['retries'] == 2
+    assert stats['sleep_seconds'] == pytest.approx(response.retry_seconds, abs=0.001)
+
+
+def test_retry_after_is_honoured(server, monkeypatch):
+    slept = []
+    monkeypatch.setattr('urllib3.util.retry.time.sleep', slept.append)
+    server.responses = [(429, {'Retry-After': '3'}), (200, {})]
+    library = RequestsLibrary()
+    library.create_session('alias', server.url, max_retries=1)
+    assert library.get_on_session('alias', '/limited').retries == 1
+    assert slept == [3.0]
+
+
+def test_retry_budget_stops_retries(server):
+    server.responses = [(503, {})]
+    library = RequestsLibrary()
+    session = library.create_session(
+        'alias', server.url, max_retries=3, retry_status_list=[503], retry_budget='0%')
+    session.retry_stats.budget.min_retries = 0
+    with pytest.raises(RetryError, match='retry budget exhausted'):
+        library.get_on_session('alias', '/down')
+    stats = library.get_session_statistics('alias')['retries']
+    assert (stats['retries'], stats['budget_exhausted']) == (0, 1)
+
+
+def test_format_retries():
+    response = LibraryResponse()
+    assert format_retries(response) == ''
+    response.retries = 2
+    response.retry_seconds = 0.5
+    assert format_retries(response) == 'retries=2 (slept 0.500 s) \n '
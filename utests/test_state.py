@@ -0,0 +1,73 @@
+import json
+import os
+import stat
+import time
+
+import pytest
+import requests
+
+from RequestsLibrary import RequestsLibrary
+from RequestsLibrary.state import apply_session_state, load_state, save_state, session_state
+
+
+def build_session():
+    session = requests.Session()
+    session.url = 'http://mocking.rules'
+    session.headers['Authorization'] = 'Bearer abc'
+    session.auth = requests.auth.HTTPBasicAuth('user', 'passwd')
+    session.params = {'tenant': 'a'}
+    session.verify = '/path/to/ca.pem'
+    session.cookies.set('sso', 'ticket', domain='mocking.rules', path='/', rest={'HttpOnly': None})
+    session.cookies.set('old', 'value', domain='mocking.rules', expires=int(time.time()) - 10)
+    return session
+
+
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / 'state' / 'session.json')
+    save_state(path, session_state(build_session()))
+    restored = apply_session_state(requests.Session(), load_state(path))
+    assert restored.url == 'http://mocking.rules'
+    assert restored.headers['Authorization'] == 'Bearer abc'
+    assert (restored.auth.username, restored.auth.password) == ('user', 'passwd')
+    assert restored.params == {'tenant': 'a'}
+    assert restored.verify == '/path/to/ca.pem'
+    assert restored.cookies.get_dict() == {'sso': 'ticket'}
+    cookie = next(iter(restored.cookies))
+    assert (cookie.domain, cookie.path, cookie.has_nonstandard_attr('HttpOnly')) == ('mocking.rules', '/', True)
+    if os.name == 'posix':
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_state_merges_into_session_headers():
+    session = requests.Session()
+    session.headers['X-Worker'] = '2'
+    apply_session_state(session, session_state(build_session()))
+    assert session.headers['X-Worker'] == '2'
+    assert session.headers['Authorization'] == 'Bearer abc'
+
+
+def test_state_skips_stateful_authentication():
+    session = requests.Session()
+    session.auth = requests.auth.HTTPDigestAuth('user', 'passwd')
+    assert session_state(session)['auth'] is None
+
+
+def test_unsupported_state_version():
+    with pytest.raises(ValueError, match='Unsupported session state version 2'):
+        apply_session_state(requests.Session(), {'version': 2})
+
+
+def test_restore_session_state_creates_missing_session(tmp_path):
+    path = str(tmp_path / 'session.json')
+    library = RequestsLibrary()
+    session = library.create_session('login', 'http://mocking.rules', headers={'X-Token': 'abc'})
+    session.cookies.set('sso', 'ticket')
+    library.save_session_state('login', path)
+    assert json.loads(open(path).read())['headers']['X-Token'] == 'abc'
+
+    other = RequestsLibrary()
+    restored = other.restore_session_state('restored', path)
+    assert other.session_exists('restored')
+    assert restored.url == 'http://mocking.rules'
+    assert restored.headers['X-Token'] == 'abc'
+    assert restored.cookies.get_dict() == {'sso': 'ticket'}
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from RequestsLibrary.exceptions import InvalidJsonPath, JsonPathNotFound
+from RequestsLibrary.streaming import iter_json_items
+
+DOCUMENT = {
+    'meta': {'skipped': [1, 2, {'tricky': '],}"'}], 'total': 4},
+    'data': {'items': [{'id': 1, 'name': 'café'}, 12345, 'text', None, True, -1.5e3]},
+}
+
+
+def chunked(document, size):
+    raw = json.dumps(document).encode('utf-8')
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+@pytest.mark.parametrize('size', [1, 2, 7, 64, 100000])
+def test_iter_json_items_with_any_chunk_size(size):
+    items = list(iter_json_items(chunked(DOCUMENT, size), '$.data.items'))
+    assert items == DOCUMENT['data']['items']
+
+
+def test_iter_json_items_top_level_array():
+    assert list(iter_json_items([b' [ 1, ', b'2 ,3] '])) == [1, 2, 3]
+
+
+def test_iter_json_items_empty_array():
+    assert list(iter_json_items([b'[]'])) == []
+
+
+def test_iter_json_items_with_index_and_wildcard():
+    document = {'pages': [{'items': [1]}, {'items': [2, 3]}]}
+    assert list(iter_json_items(chunked(document, 3), '$.pages[1].items[*]')) == [2, 3]
+
+
+def test_iter_json_items_is_lazy():
+    items = iter_json_items(iter([b'[1, 2, ', b'{"broken']))
+    assert next(items) == 1
+    assert next(items) == 2
+    with pytest.raises(ValueError):
+        next(items)
+
+
+@pytest.mark.parametrize('path', ['$.missing', '$.meta.skipped[3]', '$.meta', '$.meta.total', '$[0]'])
+def test_iter_json_items_not_found(path):
+    with pytest.raises(JsonPathNotFound):
+        list(iter_json_items(chunked(DOCUMENT, 5), path))
+
+
+def test_iter_json_items_wildcard_in_the_middle():
+    with pytest.raises(InvalidJsonPath):
+        list(iter_json_items(chunked(DOCUMENT, 5), '$.data[*].id'))
+
+
+def test_iter_json_items_truncated_document():
+    with pytest.raises(ValueError):
+        list(iter_json_items([b'[1, 2']))
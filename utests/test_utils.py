@@ -4,7 +4,20 @@ import pytest
 from requests import Session
 
 from RequestsLibrary import RequestsLibrary
-from RequestsLibrary.utils import is_file_descriptor, merge_headers
+from RequestsLibrary.exceptions import InvalidJsonPath, JsonPathNotFound
+from RequestsLibrary.utils import (
+    format_data_according_to_header,
+    get_json_path_value,
+    is_disabled,
+    is_file_descriptor,
+    is_json,
+    json_dumps,
+    json_loads,
+    json_pretty_print,
+    merge_headers,
+    parse_byte_size,
+    set_json_backend,
+)
 from utests import SCRIPT_DIR
 from utests import mock
 
@@ -72,3 +85,89 @@ def test_warn_that_url_is_missing(mocked_logger, mocked_keywords):
     except TypeError:
         pass
     mocked_logger.warn.assert_called()
+
+
+JSON_DATA = {'user': {'name': 'robot', 'first name': 'rf'},
+             'items': [{'id': 1}, {'id': 2}, {'id': 3}]}
+
+
+@pytest.mark.parametrize('path,expected', [
+    ('$', JSON_DATA),
+    ('$.user.name', 'robot'),
+    ("$['user']['first name']", 'rf'),
+    ('$["user"].name', 'robot'),
+    ('user.name', 'robot'),
+    ('$.items[0].id', 1),
+    ('$.items[-1].id', 3),
+    ('$.items[*].id', [1, 2, 3]),
+    ('$.user.*', ['robot', 'rf']),
+    ('$.items[*].missing', []),
+])
+def test_get_json_path_value(path, expected):
+    assert get_json_path_value(JSON_DATA, path) == expected
+
+
+@pytest.mark.parametrize('path', ['$.user.surname', '$.items[3]', '$.user[0]', '$.items.id'])
+def test_get_json_path_value_not_found(path):
+    with pytest.raises(JsonPathNotFound):
+        get_json_path_value(JSON_DATA, path)
+
+
+@pytest.mark.parametrize('path', ['$.user..name', '$.items[a]', '$.items[0'])
+def test_get_json_path_value_invalid_path(path):
+    with pytest.raises(InvalidJsonPath):
+        get_json_path_value(JSON_DATA, path)
+
+
+def test_set_json_backend_invalid():
+    with pytest.raises(ValueError):
+        set_json_backend('simplejson')
+
+
+@mock.patch('RequestsLibrary.utils.orjson', None)
+@mock.patch('RequestsLibrary.utils.logger')
+def test_set_json_backend_falls_back_when_orjson_missing(mocked_logger):
+    assert set_json_backend('orjson') == 'json'
+    mocked_logger.warn.assert_called()
+    assert set_json_backend('auto') == 'json'
+
+
+def test_json_backend_orjson(orjson_backend):
+    assert orjson_backend == 'orjson'
+    assert json_loads(b'{"a": [1, 2]}') == {'a': [1, 2]}
+    assert json_dumps({'a': 1}) == '{"a":1}'
+    assert json_dumps({'a': 1}, as_bytes=True) == b'{"a":1}'
+    assert is_json('{"a": 1}') is True
+    assert is_json({'a': 1}) is False
+
+
+def test_json_backend_orjson_falls_back_for_unsupported_data(orjson_backend):
+    assert json_dumps({1: 'a'}) == '{"1": "a"}'
+
+
+def test_json_pretty_print_is_the_same_with_orjson(orjson_backend):
+    assert json_pretty_print('{"b": 1, "a": [1]}') == '{\n    "a": [\n        1\n    ],\n    "b": 1\n}'
+
+
+@pytest.mark.parametrize('value, disabled', [
+    (None, True), ('', True), (' none ', True), ('NONE', True), (0, False), ('0', False), (False, False),
+])
+def test_is_disabled(value, disabled):
+    assert is_disabled(value) == disabled
+
+
+def test_parse_byte_size():
+    assert parse_byte_size(None, 'size') is None
+    assert parse_byte_size('None', 'size') is None
+    assert parse_byte_size('1024', 'size') == 1024
+    assert parse_byte_size(0, 'size') == 0
+    with pytest.raises(ValueError, match="max_response_bytes must be an integer, got '1kb'"):
+        parse_byte_size('1kb', 'max_response_bytes')
+    with pytest.raises(ValueError):
+        parse_byte_size(-1, 'size')
+
+
+def test_format_data_according_to_header_keeps_compressed_body():
+    session = Session()
+    headers = {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+    assert format_data_according_to_header(session, b'\x1f\x8b\x08', headers) == b'\x1f\x8b\x08'